@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""Benchmark cold start of the bot entry points: import time and time to the first network request.
+
+Every run starts a fresh interpreter, like a cron tick does. The first
+network call (DNS lookup or connect) is intercepted and aborted, so no
+credentials or network access are needed. Deduplication uses a throwaway
+SQLite file unless --backend mongodb is given.
+
+Run with:
+    poetry run python scripts/bench_startup.py --runs 5
+"""
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Entry point name -> module and class whose run() the entry point script calls
+ENTRY_POINTS = {
+    'discord': ('src.bots.discord', 'DiscordBot'),
+    'telegram': ('src.bots.telegram', 'TelegramBot'),
+    'pipeline': ('src.bots.pipeline', 'DeliveryPipeline'),
+}
+
+# Settings that let the bots start without real credentials
+PLACEHOLDER_ENV = {
+    'REDDIT_CLIENT_ID': 'bench',
+    'REDDIT_CLIENT_SECRET': 'bench',
+    'REDDIT_USER_AGENT': 'reddit_bot startup benchmark',
+    'SUB_NAMES': 'python',
+    'DISCORD_WEBHOOK_URL': 'https://discord.com/api/webhooks/0/bench',
+    'TELEGRAM_TOKEN': '123456:bench',
+    'TELEGRAM_CHAT_ID': '1',
+    'MONGO_USER': 'bench',
+    'MONGO_PASSWORD': 'bench',
+    'MONGO_URI': 'bench.mongodb.net',
+    'MONGO_DB_NAME': 'bench',
+}
+
+class FirstRequest(BaseException):
+    """Raised at the first network call to end the run. Not an Exception, so no handler swallows it."""
+
+def intercept_network(state):
+    """Record the time of the first network call and abort it."""
+    import socket
+    
+    def abort(*args, **kwargs):
+        state.setdefault('first_request', time.perf_counter())
+        raise FirstRequest()
+    
+    socket.getaddrinfo = abort
+    socket.socket.connect = abort
+    socket.socket.sendto = abort
+
+def run_child(name):
+    """Import one entry point, run it until its first network call and print the timings as JSON."""
+    import importlib
+    import logging
+    
+    logging.disable(logging.CRITICAL)
+    module_name, class_name = ENTRY_POINTS[name]
+    state = {}
+    
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+    
+    intercept_network(state)
+    try:
+        getattr(module, class_name)().run()
+    except FirstRequest:
+        pass
+    
+    first_request = state.get('first_request')
+    print(json.dumps({
+        'import_ms': (imported - start) * 1000,
+        'first_request_ms': (first_request - start) * 1000 if first_request else None,
+        'modules': len(sys.modules),
+    }))
+
+def measure(name, env):
+    """Run one entry point in a fresh interpreter and get its timings and total process time."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, __file__, '--child', name], env=env, capture_output=True, text=True)
+    total_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{result.stderr}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_ms'] = total_ms
+    return timings
+
+def median(values):
+    """Get the median of the values that were measured."""
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else float('nan')
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters started per entry point")
+    parser.add_argument('--backend', choices=['sqlite', 'mongodb'], default='sqlite', help="dedup backend to start")
+    parser.add_argument('--entry-points', nargs='+', choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument('--child', choices=list(ENTRY_POINTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_child(args.child)
+        return
+    
+    with tempfile.TemporaryDirectory() as directory:
+        env = {**PLACEHOLDER_ENV, **os.environ, 'DEDUP_BACKEND': args.backend}
+        env['SQLITE_PATH'] = os.path.join(directory, 'bench.db')
+        
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        print(f"Interpreter start:  {(time.perf_counter() - start) * 1000:.0f} ms")
+        print(f"{'entry point':<12} {'import':>10} {'1st request':>12} {'process':>10} {'modules':>8}")
+        
+        for name in args.entry_points:
+            runs = [measure(name, env) for _ in range(args.runs)]
+            print(
+                f"{name:<12} {median(run['import_ms'] for run in runs):>7.0f} ms "
+                f"{median(run['first_request_ms'] for run in runs):>9.0f} ms "
+                f"{median(run['process_ms'] for run in runs):>7.0f} ms "
+                f"{median(run['modules'] for run in runs):>8.0f}"
+            )
+
+if __name__ == "__main__":
+    main()
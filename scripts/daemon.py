@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""Script to run the delivery pipeline as a long-running daemon."""
+import sys
+import os
+import signal
+import logging
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.bots.pipeline import DeliveryPipeline
+from src.utils.env import load_env
+
+# Load environment variables
+load_env()
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def handle_sigterm(signum, frame):
+    """Stop the daemon cleanly when the service manager terminates it."""
+    raise KeyboardInterrupt
+
+def main():
+    """Run the delivery daemon."""
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    pipeline = DeliveryPipeline()
+    pipeline.run_forever()
+
+if __name__ == "__main__":
+    main()
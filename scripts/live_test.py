@@ -134,8 +134,9 @@ class LiveTester:
             # Create a mock MongoDB service to avoid actual DB operations
             from unittest.mock import MagicMock
             mock_mongo_service = MagicMock()
-            mock_mongo_service.check_post_exists.return_value = False
-            mock_mongo_service.cleanup_collection.return_value = None
+            mock_mongo_service.get_checkpoint.return_value = None  # No checkpoint, fetch the newest posts
+            mock_mongo_service.claim_posts.side_effect = lambda post_ids, collection_name: list(post_ids)
+            mock_mongo_service.set_checkpoint.return_value = None
             
             # Create the Reddit service with the mock MongoDB service
             reddit_service = RedditService()
@@ -164,7 +165,7 @@ class LiveTester:
             self._check_env_vars(required_vars)
             
             # Import here to avoid errors if modules are missing
-            from src.services.mongodb import MongoDBService
+            from src.services.mongodb import MongoDBService, CHECKPOINT_COLLECTION
             
             # Create MongoDB service
             logger.info("Connecting to MongoDB...")
@@ -172,27 +173,36 @@ class LiveTester:
             
             # Test collection access with a test collection
             test_collection = "test_collection"
+            test_subreddit = "live_test"
             logger.info(f"Testing collection access: {test_collection}")
             
-            # Test insert
-            test_id = f"test_{datetime.now().timestamp()}"
-            logger.info(f"Inserting test document with ID: {test_id}")
-            mongo_service.insert_post(test_id, test_collection)
-            
-            # Test exists check
-            logger.info(f"Checking if document exists...")
-            exists = mongo_service.check_post_exists(test_id, test_collection)
-            if not exists:
-                raise ValueError(f"Document with ID {test_id} was not found after insertion")
-            
-            # Test cleanup
-            logger.info(f"Testing collection cleanup...")
-            mongo_service.cleanup_collection(test_collection, max_documents=0)  # Remove all documents
-            
-            # Verify cleanup
-            exists = mongo_service.check_post_exists(test_id, test_collection)
-            if exists:
-                logger.warning(f"Document with ID {test_id} still exists after cleanup")
+            try:
+                # Test claiming, the first claim of an ID wins and later claims get nothing
+                test_id = f"test_{datetime.now().timestamp()}"
+                logger.info(f"Claiming test post ID: {test_id}")
+                claimed = mongo_service.claim_posts([test_id], test_collection)
+                if claimed != [test_id]:
+                    raise ValueError(f"Post ID {test_id} was not claimed")
+                if mongo_service.claim_posts([test_id], test_collection):
+                    raise ValueError(f"Post ID {test_id} was claimed twice")
+                
+                # Test exists check
+                logger.info(f"Checking if document exists...")
+                if not mongo_service.check_post_exists(test_id, test_collection):
+                    raise ValueError(f"Document with ID {test_id} was not found after claiming")
+                
+                # Test checkpoints
+                logger.info(f"Testing checkpoint for r/{test_subreddit}...")
+                created_utc = datetime.now().timestamp()
+                mongo_service.set_checkpoint(test_subreddit, "t3_test", created_utc)
+                checkpoint = mongo_service.get_checkpoint(test_subreddit)
+                if not checkpoint or checkpoint["fullname"] != "t3_test" or checkpoint["created_utc"] != created_utc:
+                    raise ValueError(f"Checkpoint for r/{test_subreddit} was not stored: {checkpoint}")
+            finally:
+                # Remove the test documents
+                logger.info(f"Cleaning up test documents...")
+                mongo_service.db[test_collection].drop()
+                mongo_service.db[CHECKPOINT_COLLECTION].delete_one({"subreddit": test_subreddit})
             
             logger.info("\033[1;32m✓ MongoDB test passed!\033[0m")
             self.results["mongodb"] = True
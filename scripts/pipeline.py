@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+"""Script to run the delivery pipeline for all configured bots."""
+import sys
+import os
+import logging
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.bots.pipeline import DeliveryPipeline
+from src.utils.env import load_env
+
+# Load environment variables
+load_env()
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Run the delivery pipeline."""
+    pipeline = DeliveryPipeline()
+    pipeline.run()
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
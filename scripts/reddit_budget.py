@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+"""Script to print the Reddit API budget shared by the bots on this host, as JSON metrics."""
+import sys
+import os
+import json
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.env import load_env
+from src.utils.ratelimit import SharedRateBudget
+
+# Load environment variables
+load_env()
+
+def main():
+    """Print the requests remaining, seconds until the window resets and seconds between requests."""
+    budget = SharedRateBudget.from_env(os.environ.get("REDDIT_CLIENT_ID") or '')
+    try:
+        print(json.dumps(budget.snapshot()))
+    finally:
+        budget.close()
+
+if __name__ == "__main__":
+    main()
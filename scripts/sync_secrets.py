@@ -3,15 +3,15 @@
 import sys
 import os
 import logging
-from dotenv import load_dotenv
 
 # Add parent directory to path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.utils.env import load_env
 from src.utils.github import sync_github_secrets
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Set up logging
 logging.basicConfig(
@@ -1,76 +1,159 @@
 """Discord bot for sending Reddit posts to a channel."""
-from discord_webhook import DiscordWebhook, DiscordEmbed
+import requests
 import logging
+import asyncio
 import os
-from typing import Dict, Any, List
-from dotenv import load_dotenv
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
 
+from src.bots.render import DISCORD_EMBED, get_renderer
+from src.bots.sink import SinkCapabilities
+from src.services.post import Post
 from src.services.reddit import RedditService
+from src.utils.env import load_env
+from src.utils.http import get_http_session
+from src.utils.lazy import lazy_import
+from src.utils.ratelimit import WebhookRateLimiter
+from src.utils.timefmt import get_age_formatter
+
+# Only needed once there is something to send, most runs find no new posts
+discord_webhook = lazy_import("discord_webhook")
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
+# Discord accepts at most 10 embeds and 6000 embed characters per message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# Times a rate limited message is retried before it is reported as failed
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Seconds to wait for Discord to answer a webhook request
+WEBHOOK_TIMEOUT = 10
+
+def embed_size(embed: Dict[str, Any]) -> int:
+    """Count the characters of an embed that Discord adds up against the per-message limit."""
+    size = len(embed.get('title') or '') + len(embed.get('description') or '')
+    for field in embed.get('fields') or []:
+        size += len(str(field.get('name') or '')) + len(str(field.get('value') or ''))
+    if embed.get('footer'):
+        size += len(embed['footer'].get('text') or '')
+    if embed.get('author'):
+        size += len(embed['author'].get('name') or '')
+    return size
+
 class DiscordBot:
     """Discord bot for sending Reddit posts to a channel."""
     
-    def __init__(self):
-        """Initialize the Discord bot."""
-        self.webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
+    # One send_batch call fills one webhook message
+    capabilities = SinkCapabilities(max_batch_size=MAX_EMBEDS_PER_MESSAGE)
+    
+    def __init__(self, reddit_service: Optional[RedditService] = None, webhook_url: Optional[str] = None,
+                 session: Optional[requests.Session] = None):
+        """Initialize the Discord bot, defaulting to the DISCORD_WEBHOOK_URL webhook and the shared HTTP session."""
+        self.webhook_url = webhook_url or os.environ.get('DISCORD_WEBHOOK_URL')
         
         if not self.webhook_url:
             raise ValueError("Discord webhook URL is not configured")
         
-        self.reddit_service = RedditService()
+        self.reddit_service = reddit_service or RedditService()
+        self.rate_limiter = WebhookRateLimiter()
+        self.session = session or get_http_session()
+        self.age_formatter = get_age_formatter()
+        self.renderer = get_renderer()
     
-    def create_embed(self, post: Dict[str, Any]) -> DiscordEmbed:
-        """Create a Discord embed from a post."""
+    def create_embed(self, post: Union[Post, Dict[str, Any]], now: Optional[float] = None) -> Dict[str, Any]:
+        """Create the Discord embed of a post, with its age as of `now` (the current time by default)."""
         try:
-            subreddit = post.get('subreddit', 'Unknown')
-            title = post.get('title', 'No Title')
-            posted_ago = post.get('posted_ago', 'Unknown')
-            url = post.get('url', '#')
-            text = post.get('selftext', '')
-            flair = post.get('flair', 'No Flair')
-            
-            embed = DiscordEmbed(
-                title=f"New Post from r/{subreddit} [{flair}]",
-                description=title,
-                color='03b2f8'
-            )
-            
-            embed.add_embed_field(name="Posted", value=posted_ago)
-            embed.add_embed_field(name="URL", value=url)
-            
-            if text and text != 'Null':
-                # Truncate long text
-                text = text[:997] + "..." if len(text) > 1000 else text
-                embed.add_embed_field(name="Content", value=text, inline=False)
-            
-            return embed
+            return self.renderer.render(post, DISCORD_EMBED, self.age_formatter.render(post, now))
         
         except Exception as e:
             logger.error(f"Failed to create Discord embed: {str(e)}")
             raise
     
-    def send_post(self, post: Dict[str, Any]) -> None:
-        """Send a post to Discord using webhooks."""
+    def _execute_batch(self, posts: List[Dict[str, Any]], embeds: List[Dict[str, Any]]) -> bool:
+        """Send a batch of embeds in a single webhook message. Returns True if it was delivered."""
+        webhook = discord_webhook.DiscordWebhook(url=self.webhook_url)
+        for embed in embeds:
+            webhook.add_embed(embed)
+        payload = webhook.json
+        
+        # Post the message over the pooled session, pacing and retrying it from Discord's rate limit headers
+        for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.wait()
+            response = self.session.post(self.webhook_url, json=payload, timeout=WEBHOOK_TIMEOUT)
+            retry_after = self.rate_limiter.update(response)
+            if retry_after is None:
+                break
+            logger.warning(f"Discord webhook rate limited, retrying in {retry_after:.2f}s")
+        
+        if response.status_code not in (200, 204):
+            logger.error(f"Discord webhook failed with status {response.status_code}")
+            return False
+        
+        for post in posts:
+            logger.info(f"Sent post '{post.get('title', 'Unknown')}' to Discord channel")
+        return True
+    
+    def send_post(self, post: Dict[str, Any]) -> bool:
+        """Send a post to Discord using webhooks. Returns True if it was delivered."""
         try:
-            webhook = DiscordWebhook(url=self.webhook_url)
             embed = self.create_embed(post)
-            webhook.add_embed(embed)
-            
-            # Execute the webhook
-            response = webhook.execute()
-            
-            if response.status_code not in (200, 204):
-                logger.error(f"Discord webhook failed with status {response.status_code}")
-            else:
-                logger.info(f"Sent post '{post.get('title', 'Unknown')}' to Discord channel")
+            return self._execute_batch([post], [embed])
         
         except Exception as e:
             logger.error(f"Failed to send post to Discord: {str(e)}")
+            return False
+    
+    def pack_batches(self, posts: List[Dict[str, Any]]) -> List[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Group posts into messages of up to 10 embeds within Discord's total embed size."""
+        batches = []
+        batch_posts, batch_embeds, batch_size = [], [], 0
+        
+        # Render every age in the batch against the same clock reading
+        now = time.time()
+        for post in posts:
+            try:
+                embed = self.create_embed(post, now)
+            except Exception:
+                # create_embed already logged the error, the post is reported as not delivered
+                continue
+            
+            size = embed_size(embed)
+            if batch_embeds and (
+                len(batch_embeds) >= MAX_EMBEDS_PER_MESSAGE or batch_size + size > MAX_EMBED_CHARS_PER_MESSAGE
+            ):
+                batches.append((batch_posts, batch_embeds))
+                batch_posts, batch_embeds, batch_size = [], [], 0
+            
+            batch_posts.append(post)
+            batch_embeds.append(embed)
+            batch_size += size
+        
+        if batch_embeds:
+            batches.append((batch_posts, batch_embeds))
+        return batches
+    
+    def send_posts(self, posts: List[Dict[str, Any]]) -> List[str]:
+        """Send posts to Discord, packed into as few webhook messages as possible.
+        
+        Returns the IDs of the delivered posts.
+        """
+        delivered = []
+        for batch_posts, batch_embeds in self.pack_batches(posts):
+            try:
+                if self._execute_batch(batch_posts, batch_embeds):
+                    delivered.extend(post.get('id') for post in batch_posts)
+            except Exception as e:
+                logger.error(f"Failed to send {len(batch_posts)} posts to Discord: {str(e)}")
+        return delivered
+    
+    async def send_batch(self, posts: List[Union[Post, Dict[str, Any]]]) -> List[str]:
+        """Send posts to Discord from a worker thread, so the webhook calls don't block the event loop."""
+        return await asyncio.to_thread(self.send_posts, posts)
     
     def process_posts(self) -> None:
         """Process and send all posts to Discord."""
@@ -86,9 +169,7 @@ class DiscordBot:
             logger.info(f"Sending {total_posts} posts to Discord")
             
             # Process each post
-            for posts in filtered_posts:
-                for post in posts:
-                    self.send_post(post)
+            self.send_posts([post for posts in filtered_posts for post in posts])
         
         except Exception as e:
             logger.error(f"Error processing posts for Discord: {str(e)}")
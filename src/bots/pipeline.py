@@ -0,0 +1,323 @@
+"""Delivery pipeline that fetches Reddit posts once and sends them to every bot."""
+import asyncio
+import logging
+import os
+from typing import Dict, Any, List, Optional
+
+from src.services.reddit import RedditService
+from src.services.outbox import OutboxService
+from src.services.sqlite import SQLiteService, SQLiteOutboxService
+from src.bots.discord import DiscordBot
+from src.bots.sink import Sink, batches
+from src.bots.telegram import TelegramBot
+from src.bots.webhook import WebhookSink
+from src.utils.env import load_env
+from src.utils.routing import RoutingTable
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before reopening the subreddit stream after an error
+DEFAULT_STREAM_RETRY_SECONDS = 30
+
+# Seconds a daemon sink worker sleeps between outbox polls when nothing new is enqueued
+DEFAULT_OUTBOX_POLL_SECONDS = 5
+
+class DeliveryPipeline:
+    """Fetch and deduplicate posts once per run, then fan them out to all sinks."""
+    
+    def __init__(self, reddit_service: Optional[RedditService] = None, sinks: Optional[Dict[str, Sink]] = None,
+                 routing_table: Optional[RoutingTable] = None, outbox: Optional[OutboxService] = None):
+        """Initialize the pipeline with a shared Reddit service and the configured sinks.
+        
+        If ROUTES_FILE points to a routing config, its destinations become
+        the sinks and each post only goes to the destinations its route
+        matches. Otherwise every post goes to every configured bot.
+        
+        Posts go through the durable outbox, kept in the MongoDB or SQLite
+        dedup store, unless OUTBOX_ENABLED is false, in which case they are
+        sent directly and failures are not retried.
+        """
+        self.reddit_service = reddit_service or RedditService()
+        routes_file = os.getenv('ROUTES_FILE')
+        self.routing_table = routing_table or (RoutingTable.from_file(routes_file) if routes_file else None)
+        self.sinks = sinks if sinks is not None else self._create_sinks()
+        
+        if not self.sinks:
+            raise ValueError("No delivery sinks are configured")
+        
+        self._outbox = outbox
+        self._create_outbox_on_use = outbox is None and os.getenv('OUTBOX_ENABLED', 'true').lower() != 'false'
+        self._outbox_events: Dict[str, asyncio.Event] = {}
+        self._sink_queues: Dict[str, asyncio.Queue] = {}
+    
+    @property
+    def outbox(self) -> Optional[OutboxService]:
+        """Get the delivery outbox, creating it on first use so startup doesn't connect to MongoDB."""
+        if self._create_outbox_on_use:
+            # The outbox lives in the dedup store behind the seen ID cache
+            store = self.reddit_service.mongo_service.store
+            db = getattr(store, 'db', None)
+            if isinstance(store, SQLiteService):
+                self._outbox = SQLiteOutboxService(store)
+            elif db is not None:
+                self._outbox = OutboxService(db)
+            else:
+                logger.warning("The dedup store has no outbox, sending posts directly")
+            # Only settled once created, a connection error is raised again on the next use
+            self._create_outbox_on_use = False
+        return self._outbox
+    
+    def _create_sinks(self) -> Dict[str, Sink]:
+        """Create a sink for every routed destination, or every bot that has credentials configured."""
+        sinks = {}
+        if self.routing_table:
+            for name, destination in self.routing_table.destinations.items():
+                sinks[name] = self._create_destination_sink(destination)
+            return sinks
+        
+        if os.environ.get('DISCORD_WEBHOOK_URL'):
+            sinks['discord'] = DiscordBot(reddit_service=self.reddit_service)
+        if os.environ.get('TELEGRAM_TOKEN'):
+            sinks['telegram'] = TelegramBot(reddit_service=self.reddit_service)
+        if os.environ.get('WEBHOOK_URL'):
+            sinks['webhook'] = WebhookSink()
+        return sinks
+    
+    def _create_destination_sink(self, destination: Dict[str, Any]) -> Sink:
+        """Create the sink for one routing destination.
+        
+        Secrets can be given inline or, preferably, as the name of an
+        environment variable through the matching *_env key.
+        """
+        def setting(key: str) -> Optional[str]:
+            return destination.get(key) or os.environ.get(destination.get(f"{key}_env", ""))
+        
+        if destination["type"] == "discord":
+            return DiscordBot(reddit_service=self.reddit_service, webhook_url=setting("webhook_url"))
+        if destination["type"] == "webhook":
+            return WebhookSink(webhook_url=setting("webhook_url"), payload_format=destination.get("format"))
+        return TelegramBot(reddit_service=self.reddit_service, token=setting("token"), chat_id=setting("chat_id"))
+    
+    async def _deliver_to_sink(self, name: str, sink: Sink, posts: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Deliver posts to one sink in batches of the size it accepts and return its delivery state."""
+        delivered = []
+        try:
+            for batch in batches(posts, sink.capabilities):
+                delivered.extend(await sink.send_batch(batch))
+        except Exception as e:
+            logger.error(f"Sink {name} failed: {str(e)}")
+        
+        delivered_ids = set(delivered)
+        state = {
+            "sent": [post.get('id') for post in posts if post.get('id') in delivered_ids],
+            "failed": [post.get('id') for post in posts if post.get('id') not in delivered_ids]
+        }
+        logger.info(f"Sink {name}: {len(state['sent'])} sent, {len(state['failed'])} failed")
+        return state
+    
+    def route_posts(self, posts: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Split posts into the list each sink should receive."""
+        if not self.routing_table:
+            return {name: posts for name in self.sinks}
+        
+        routed = {name: [] for name in self.sinks}
+        for post in posts:
+            destinations = self.routing_table.route(post)
+            if not destinations:
+                logger.debug(f"No route for post {post.get('id')} in r/{post.get('subreddit')}")
+            for name in destinations:
+                routed[name].append(post)
+        return routed
+    
+    async def deliver(self, posts: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[str]]]:
+        """Send posts to all sinks concurrently and return the delivery state per sink."""
+        routed = {name: sink_posts for name, sink_posts in self.route_posts(posts).items() if sink_posts}
+        names = list(routed)
+        states = await asyncio.gather(*(
+            self._deliver_to_sink(name, self.sinks[name], routed[name]) for name in names
+        ))
+        return dict(zip(names, states))
+    
+    def dispatch(self, posts: List[Dict[str, Any]]) -> None:
+        """Hand posts to the queue of every sink they are routed to, without waiting for their delivery."""
+        for name, sink_posts in self.route_posts(posts).items():
+            if sink_posts:
+                self._sink_queues[name].put_nowait(sink_posts)
+    
+    async def _queue_worker(self, name: str, sink: Sink) -> None:
+        """Deliver the batches handed to one sink, one after the other."""
+        queue = self._sink_queues[name]
+        while True:
+            posts = await queue.get()
+            try:
+                await self._deliver_to_sink(name, sink, posts)
+            finally:
+                queue.task_done()
+    
+    async def enqueue(self, posts: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[str]]]:
+        """Add posts to the outbox of every sink they are routed to and wake the sink workers.
+        
+        The posts are claimed already, so posts a sink's outbox can't take
+        are sent to it directly instead of being dropped. Returns the
+        delivery state of those direct sends per sink.
+        """
+        direct = {}
+        for name, sink_posts in self.route_posts(posts).items():
+            if not sink_posts:
+                continue
+            try:
+                await asyncio.to_thread(self.outbox.enqueue, name, sink_posts)
+            except Exception as e:
+                logger.error(f"Could not enqueue posts for {name}, delivering them directly: {str(e)}")
+                direct[name] = await self._deliver_to_sink(name, self.sinks[name], sink_posts)
+                continue
+            if name in self._outbox_events:
+                self._outbox_events[name].set()
+        return direct
+    
+    async def drain_sink(self, name: str, sink: Sink) -> Dict[str, List[str]]:
+        """Deliver every due outbox item of one sink, acking successes and scheduling retries for failures."""
+        sent, failed = [], []
+        while True:
+            try:
+                items = await asyncio.to_thread(self.outbox.claim, name)
+            except Exception as e:
+                logger.error(f"Could not claim outbox items for {name}: {str(e)}")
+                break
+            if not items:
+                break
+            
+            state = await self._deliver_to_sink(name, sink, [item["post"] for item in items])
+            sent_ids, failed_ids = set(state["sent"]), set(state["failed"])
+            try:
+                await asyncio.to_thread(self.outbox.ack, name, [item for item in items if item["post_id"] in sent_ids])
+                await asyncio.to_thread(self.outbox.nack, name, [item for item in items if item["post_id"] in failed_ids],
+                                        f"{name} did not deliver the post")
+            except Exception as e:
+                # Unacked items are retried once their lease expires
+                logger.error(f"Could not update outbox items for {name}: {str(e)}")
+                break
+            sent.extend(state["sent"])
+            failed.extend(state["failed"])
+        return {"sent": sent, "failed": failed}
+    
+    async def drain(self) -> Dict[str, Dict[str, List[str]]]:
+        """Drain the outbox of every sink concurrently and return the delivery state per sink."""
+        names = list(self.sinks)
+        states = await asyncio.gather(*(self.drain_sink(name, self.sinks[name]) for name in names))
+        return {name: state for name, state in zip(names, states) if state["sent"] or state["failed"]}
+    
+    async def _sink_worker(self, name: str, sink: Sink) -> None:
+        """Drain one sink's outbox whenever posts are enqueued for it, or every poll interval for retries."""
+        poll_seconds = float(os.getenv('OUTBOX_POLL_SECONDS', DEFAULT_OUTBOX_POLL_SECONDS))
+        event = self._outbox_events[name]
+        while True:
+            event.clear()
+            await self.drain_sink(name, sink)
+            try:
+                await asyncio.wait_for(event.wait(), poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def process_posts(self) -> Dict[str, Dict[str, List[str]]]:
+        """Fetch new posts once and deliver them to every sink."""
+        try:
+            # Open the outbox before any post is claimed, so a MongoDB error can't strand claimed posts
+            outbox = await asyncio.to_thread(lambda: self.outbox)
+            
+            # Fetching is blocking, keep it off the event loop
+            filtered_posts = await asyncio.to_thread(self.reddit_service.get_all_posts)
+            posts = [post for sub_posts in filtered_posts for post in sub_posts]
+            
+            if outbox:
+                # Retries of earlier failures are drained along with the new posts
+                direct = await self.enqueue(posts)
+                logger.info(f"Enqueued {len(posts)} new posts, draining outbox to {', '.join(self.sinks)}")
+                states = await self.drain()
+                for name, state in direct.items():
+                    drained = states.get(name, {"sent": [], "failed": []})
+                    states[name] = {key: state[key] + drained[key] for key in ("sent", "failed")}
+                return states
+            
+            if not posts:
+                logger.info("No new posts to deliver")
+                return {}
+            
+            logger.info(f"Delivering {len(posts)} posts to {', '.join(self.sinks)}")
+            return await self.deliver(posts)
+        
+        except Exception as e:
+            logger.error(f"Error processing posts in pipeline: {str(e)}")
+            return {}
+    
+    async def stream_posts(self) -> None:
+        """Deliver posts continuously as they are submitted, until the stream ends.
+        
+        Each sink has its own worker task, fed from the outbox or, without
+        it, from an in-memory queue. Streamed posts are only handed over
+        here, so a slow or failing sink neither holds up fetching nor the
+        other sinks.
+        """
+        if self.outbox:
+            self._outbox_events = {name: asyncio.Event() for name in self.sinks}
+            workers = [asyncio.create_task(self._sink_worker(name, sink)) for name, sink in self.sinks.items()]
+        else:
+            self._sink_queues = {name: asyncio.Queue() for name in self.sinks}
+            workers = [asyncio.create_task(self._queue_worker(name, sink)) for name, sink in self.sinks.items()]
+        try:
+            await self._consume_stream()
+            
+            # Let every sink finish the posts it was handed before stopping
+            await asyncio.gather(*(queue.join() for queue in self._sink_queues.values()))
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def _consume_stream(self) -> None:
+        """Read batches from the subreddit stream and hand them to the sinks, reopening it after errors."""
+        retry_seconds = float(os.getenv('STREAM_RETRY_SECONDS', DEFAULT_STREAM_RETRY_SECONDS))
+        stream = self.reddit_service.stream_posts()
+        
+        while True:
+            try:
+                # Polling the stream blocks, keep it off the event loop
+                posts = await asyncio.to_thread(next, stream, None)
+            except Exception as e:
+                logger.error(f"Subreddit stream failed, reopening in {retry_seconds:.0f}s: {str(e)}")
+                await asyncio.sleep(retry_seconds)
+                stream = self.reddit_service.stream_posts()
+                continue
+            
+            if posts is None:
+                logger.info("Subreddit stream ended")
+                return
+            
+            if posts and self.outbox:
+                await self.enqueue(posts)
+            elif posts:
+                logger.info(f"Delivering {len(posts)} posts to {', '.join(self.sinks)}")
+                self.dispatch(posts)
+    
+    def run_forever(self) -> None:
+        """Run the delivery pipeline as a long-running daemon."""
+        try:
+            logger.info("Starting delivery daemon")
+            asyncio.run(self.stream_posts())
+        
+        except KeyboardInterrupt:
+            logger.info("Delivery daemon stopped")
+    
+    def run(self) -> None:
+        """Run the delivery pipeline once."""
+        try:
+            logger.info("Starting delivery pipeline")
+            asyncio.run(self.process_posts())
+            logger.info("Delivery pipeline completed successfully")
+        
+        except Exception as e:
+            logger.error(f"Delivery pipeline failed: {str(e)}")
+            raise
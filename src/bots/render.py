@@ -0,0 +1,125 @@
+"""Message rendering shared by the bots, cached per post and output format."""
+import html
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+from src.services.post import Post
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Output formats a post can be rendered to
+DISCORD_EMBED = "discord_embed"
+TELEGRAM_MARKDOWN_V2 = "telegram_markdown_v2"
+TELEGRAM_HTML = "telegram_html"
+SLACK_MRKDWN = "slack_mrkdwn"
+
+# Rendered posts kept when RENDER_CACHE_SIZE is not set
+DEFAULT_RENDER_CACHE_SIZE = 1000
+
+# Characters of a post's body shown in a Discord embed, within Discord's 1024 per field
+MAX_DISCORD_CONTENT_CHARS = 1000
+
+# Characters of a post's body included in a Telegram or Slack message
+MAX_TELEGRAM_TEXT_CHARS = 3000
+MAX_SLACK_TEXT_CHARS = 3000
+
+# Embed color of new posts
+DISCORD_EMBED_COLOR = 0x03b2f8
+
+# Characters Telegram's MarkdownV2 requires to be escaped outside of entities
+_MARKDOWN_V2_ESCAPES = str.maketrans({char: f"\\{char}" for char in "\\_*[]()~`>#+-=|{}.!"})
+
+def escape_markdown_v2(text: str) -> str:
+    """Escape text for Telegram's MarkdownV2 parse mode."""
+    return text.translate(_MARKDOWN_V2_ESCAPES)
+
+def escape_html(text: str) -> str:
+    """Escape text for Telegram's HTML parse mode."""
+    return html.escape(text, quote=False)
+
+def escape_slack(text: str) -> str:
+    """Escape the control characters of Slack's mrkdwn, which are the same three as HTML's."""
+    return html.escape(text, quote=False)
+
+# Escaping of the age filled into each text format's template
+_AGE_ESCAPES = {TELEGRAM_MARKDOWN_V2: escape_markdown_v2, TELEGRAM_HTML: escape_html, SLACK_MRKDWN: escape_slack}
+
+class MessageRenderer:
+    """Renders posts into the payload of each output format.
+    
+    Everything except the post's age is rendered once per post and format
+    and kept in an LRU cache, so a post sent to several destinations of
+    the same format is formatted, truncated and escaped only once. The age
+    changes between sends and is filled into the cached template each time.
+    Posts without an ID are rendered without caching.
+    """
+    
+    def __init__(self, maxsize: Optional[int] = None):
+        """Create a renderer caching up to `maxsize` rendered posts, or RENDER_CACHE_SIZE."""
+        self.cache = LRUCache(maxsize or int(os.getenv('RENDER_CACHE_SIZE', DEFAULT_RENDER_CACHE_SIZE)))
+    
+    def render(self, post: Union[Post, Dict[str, Any]], output_format: str, posted_ago: str) -> Any:
+        """Render a post in an output format with its age.
+        
+        Returns the embed dict for DISCORD_EMBED and the message text for
+        the Telegram and Slack formats.
+        """
+        key = (post.get('id'), output_format)
+        template = self.cache.get(key) if key[0] else None
+        if template is None:
+            template = self._render_template(Post.coerce(post), output_format)
+            if key[0]:
+                self.cache.put(key, template)
+        
+        if output_format == DISCORD_EMBED:
+            embed, fields = template
+            return {**embed, "fields": [{"name": "Posted", "value": posted_ago, "inline": True}, *fields]}
+        
+        head, tail = template
+        return head + _AGE_ESCAPES[output_format](posted_ago) + tail
+    
+    def _render_template(self, post: Post, output_format: str) -> Tuple[Any, Any]:
+        """Render everything of a post but its age, as the parts before and after it."""
+        subreddit = post.subreddit or 'Unknown'
+        flair = post.flair or 'No Flair'
+        title = post.title or 'No Title'
+        
+        if output_format == DISCORD_EMBED:
+            fields = [{"name": "URL", "value": post.url or '#', "inline": True}]
+            text = post.excerpt(MAX_DISCORD_CONTENT_CHARS)
+            if text and text != 'Null':
+                fields.append({"name": "Content", "value": text, "inline": False})
+            embed = {"title": f"New Post from r/{subreddit} [{flair}]", "description": title, "color": DISCORD_EMBED_COLOR}
+            return embed, tuple(fields)
+        
+        url = post.url or 'No URL'
+        if output_format == SLACK_MRKDWN:
+            escape = escape_slack
+            text = post.excerpt(MAX_SLACK_TEXT_CHARS)
+            head = f"*New Post from r/{escape(subreddit)}* [{escape(flair)}]\n*Title:* {escape(title)}\n*Posted:* "
+            return head, f"\n*URL:* {escape(url)}\n\n{escape(text)}"
+        
+        text = post.excerpt(MAX_TELEGRAM_TEXT_CHARS)
+        if output_format == TELEGRAM_HTML:
+            escape = escape_html
+            head = f"<b>New Post from r/{escape(subreddit)}</b> [{escape(flair)}]\n<b>Title:</b> {escape(title)}\n<b>Posted:</b> "
+            return head, f"\n<b>URL:</b> {escape(url)}\n\n{escape(text)}"
+        if output_format == TELEGRAM_MARKDOWN_V2:
+            escape = escape_markdown_v2
+            head = f"*New Post from r/{escape(subreddit)}* \\[{escape(flair)}\\]\n*Title:* {escape(title)}\n*Posted:* "
+            return head, f"\n*URL:* {escape(url)}\n\n{escape(text)}"
+        raise ValueError(f"Unknown output format '{output_format}'")
+
+_renderer: Optional[MessageRenderer] = None
+_renderer_lock = threading.Lock()
+
+def get_renderer() -> MessageRenderer:
+    """Get the renderer shared by every bot in the process, so all destinations reuse its cache."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = MessageRenderer()
+        return _renderer
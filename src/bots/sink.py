@@ -0,0 +1,30 @@
+"""Delivery sink interface shared by the bots."""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Protocol, Sequence, Union
+
+from src.services.post import Post
+
+@dataclass(frozen=True)
+class SinkCapabilities:
+    """What a sink accepts per call, so the dispatcher can size batches for it.
+    
+    Sinks keep their messages within the destination's length limit and
+    pace their own sends, so batch size is all the dispatcher needs.
+    """
+    
+    # Posts handed to one send_batch call
+    max_batch_size: int
+
+class Sink(Protocol):
+    """A destination the delivery pipeline sends posts to."""
+    
+    capabilities: SinkCapabilities
+    
+    async def send_batch(self, posts: Sequence[Union[Post, Dict[str, Any]]]) -> List[str]:
+        """Send posts and return the IDs of the delivered ones."""
+
+def batches(posts: Sequence[Any], capabilities: SinkCapabilities) -> Iterator[Sequence[Any]]:
+    """Split posts into batches a sink accepts in one send_batch call."""
+    size = max(1, capabilities.max_batch_size)
+    for start in range(0, len(posts), size):
+        yield posts[start:start + size]
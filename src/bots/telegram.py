@@ -1,70 +1,179 @@
 """Telegram bot for sending Reddit posts to a channel."""
-from telegram import Bot
 import asyncio
 import logging
 import os
-from typing import Dict, Any, List
-from dotenv import load_dotenv
+import time
+from datetime import timedelta
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union
 
+from src.bots.render import TELEGRAM_HTML, TELEGRAM_MARKDOWN_V2, get_renderer
+from src.bots.sink import SinkCapabilities
+from src.services.post import Post
 from src.services.reddit import RedditService
+from src.utils.env import load_env
+from src.utils.lazy import lazy_import
+from src.utils.ratelimit import AsyncTokenBucket
+from src.utils.timefmt import get_age_formatter
+
+if TYPE_CHECKING:
+    from telegram.error import RetryAfter
+    from src.services.async_reddit import AsyncRedditService
+
+# python-telegram-bot and asyncpraw are slow to import, load them when they are first used
+telegram = lazy_import("telegram")
+telegram_error = lazy_import("telegram.error")
+async_reddit = lazy_import("src.services.async_reddit")
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
+# Telegram allows about 30 messages per second per bot and 20 per minute per group
+DEFAULT_GLOBAL_RATE_PER_SECOND = 30
+DEFAULT_CHAT_RATE_PER_MINUTE = 20
+DEFAULT_CHAT_BURST = 5
+
+# Messages sent at the same time, and retries after a RetryAfter before giving up
+DEFAULT_MAX_IN_FLIGHT = 10
+MAX_RETRY_AFTER_ATTEMPTS = 5
+
+# Parse modes selectable with TELEGRAM_PARSE_MODE and the format their messages are rendered in
+PARSE_MODE_FORMATS = {"MarkdownV2": TELEGRAM_MARKDOWN_V2, "HTML": TELEGRAM_HTML}
+DEFAULT_PARSE_MODE = "MarkdownV2"
+
+# Bots sharing a token share its global limit, whichever chat they send to
+_global_buckets: Dict[str, AsyncTokenBucket] = {}
+
+def get_global_bucket(token: str) -> AsyncTokenBucket:
+    """Get the token bucket for a bot token's global message limit."""
+    if token not in _global_buckets:
+        rate = float(os.getenv('TELEGRAM_GLOBAL_RATE_PER_SECOND', DEFAULT_GLOBAL_RATE_PER_SECOND))
+        _global_buckets[token] = AsyncTokenBucket(rate=rate, capacity=rate)
+    return _global_buckets[token]
+
+def retry_after_seconds(error: 'RetryAfter') -> float:
+    """Get the delay of a RetryAfter error, which is an int or a timedelta depending on the library version."""
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
 class TelegramBot:
     """Telegram bot for sending Reddit posts to a channel."""
     
-    def __init__(self):
-        """Initialize the Telegram bot."""
-        self.token = os.environ.get('TELEGRAM_TOKEN')
-        self.chat_id = os.environ.get('TELEGRAM_CHAT_ID', os.environ.get('TELEGRAM_CHAT'))
+    def __init__(self, reddit_service: Optional[Union['AsyncRedditService', RedditService]] = None,
+                 token: Optional[str] = None, chat_id: Optional[str] = None):
+        """Initialize the Telegram bot, defaulting to the TELEGRAM_TOKEN bot and TELEGRAM_CHAT_ID chat.
+        
+        Without a reddit_service the bot fetches through AsyncRedditService,
+        so fetching never blocks its event loop. A sync RedditService, as
+        shared by the delivery pipeline, is run in a worker thread instead.
+        """
+        self.token = token or os.environ.get('TELEGRAM_TOKEN')
+        self.chat_id = chat_id or os.environ.get('TELEGRAM_CHAT_ID', os.environ.get('TELEGRAM_CHAT'))
         
         if not self.token:
             raise ValueError("Telegram bot token is not configured")
         if not self.chat_id:
             raise ValueError("Telegram chat ID is not configured")
         
-        self.bot = Bot(token=self.token)
-        self.reddit_service = RedditService()
+        self.reddit_service = reddit_service or async_reddit.AsyncRedditService()
+        
+        # Pace sends to the real limits instead of a fixed delay
+        chat_rate = float(os.getenv('TELEGRAM_CHAT_RATE_PER_MINUTE', DEFAULT_CHAT_RATE_PER_MINUTE)) / 60
+        self.chat_bucket = AsyncTokenBucket(rate=chat_rate, capacity=float(os.getenv('TELEGRAM_CHAT_BURST', DEFAULT_CHAT_BURST)))
+        self.global_bucket = get_global_bucket(self.token)
+        self.max_in_flight = max(1, int(os.getenv('TELEGRAM_MAX_IN_FLIGHT', DEFAULT_MAX_IN_FLIGHT)))
+        self.age_formatter = get_age_formatter()
+        self.renderer = get_renderer()
+        
+        self.parse_mode = os.getenv('TELEGRAM_PARSE_MODE', DEFAULT_PARSE_MODE)
+        if self.parse_mode not in PARSE_MODE_FORMATS:
+            raise ValueError(f"Unknown TELEGRAM_PARSE_MODE '{self.parse_mode}', expected one of {', '.join(PARSE_MODE_FORMATS)}")
+        
+        # Each batch is sent concurrently, up to max_in_flight messages at once
+        self.capabilities = SinkCapabilities(max_batch_size=self.max_in_flight)
+    
+    @cached_property
+    def bot(self):
+        """Get the Telegram API client, creating it when the first message is sent."""
+        return telegram.Bot(token=self.token)
     
-    async def send_post(self, post: Dict[str, Any]) -> None:
-        """Send a post to Telegram channel."""
+    async def send_post(self, post: Union[Post, Dict[str, Any]], now: Optional[float] = None) -> bool:
+        """Send a post to Telegram channel, with its age as of `now` (the current time by default).
+        
+        Returns True if it was delivered.
+        """
         try:
-            subreddit = post.get('subreddit', 'Unknown')
-            title = post.get('title', 'No Title')
-            posted_ago = post.get('posted_ago', 'Unknown')
-            url = post.get('url', 'No URL')
-            text = post.get('selftext', '')
-            flair = post.get('flair', 'No Flair')
+            title = post.get('title') or 'No Title'
+            message = self.renderer.render(post, PARSE_MODE_FORMATS[self.parse_mode], self.age_formatter.render(post, now))
             
-            # Format the message
-            message = f"""
-*New Post from r/{subreddit}* [{flair}]
-*Title:* {title}
-*Posted:* {posted_ago}
-*URL:* {url}
-
-{text[:3000] + '...' if len(text) > 3000 else text}
-            """
-            
-            await self.bot.send_message(
-                chat_id=self.chat_id, 
-                text=message,
-                parse_mode="Markdown",
-                disable_web_page_preview=False
-            )
+            for _ in range(MAX_RETRY_AFTER_ATTEMPTS + 1):
+                # Take the chat's token first so a slow chat doesn't hold global capacity
+                await self.chat_bucket.acquire()
+                await self.global_bucket.acquire()
+                try:
+                    await self.bot.send_message(
+                        chat_id=self.chat_id, 
+                        text=message,
+                        parse_mode=self.parse_mode,
+                        disable_web_page_preview=False
+                    )
+                    break
+                except telegram_error.RetryAfter as e:
+                    delay = retry_after_seconds(e)
+                    logger.warning(f"Telegram flood control, retrying in {delay:.0f}s")
+                    self.chat_bucket.pause(delay)
+            else:
+                logger.error(f"Gave up sending post '{title}' to Telegram after repeated flood control")
+                return False
             
             logger.info(f"Sent post '{title}' to Telegram channel")
+            return True
         
         except Exception as e:
             logger.error(f"Failed to send post to Telegram: {str(e)}")
+            return False
+    
+    async def send_posts(self, posts: List[Dict[str, Any]]) -> List[str]:
+        """Send posts to Telegram concurrently and return the IDs of the delivered ones.
+        
+        Up to max_in_flight messages are sent at once; the chat and global
+        token buckets decide when each one may go out.
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        
+        # Render every age in the batch against the same clock reading
+        now = time.time()
+        
+        async def send(post: Dict[str, Any]) -> bool:
+            async with semaphore:
+                return await self.send_post(post, now)
+        
+        results = await asyncio.gather(*(send(post) for post in posts))
+        return [post.get('id') for post, delivered in zip(posts, results) if delivered]
+    
+    async def send_batch(self, posts: List[Union[Post, Dict[str, Any]]]) -> List[str]:
+        """Send posts to Telegram and return the IDs of the delivered ones."""
+        return await self.send_posts(posts)
+    
+    async def get_all_posts(self) -> List[List[Dict[str, Any]]]:
+        """Fetch new posts with the Reddit service without blocking the event loop."""
+        if asyncio.iscoroutinefunction(self.reddit_service.get_all_posts):
+            return await self.reddit_service.get_all_posts()
+        return await asyncio.to_thread(self.reddit_service.get_all_posts)
+    
+    async def close(self) -> None:
+        """Close the Reddit service's connections if it is asynchronous."""
+        if asyncio.iscoroutinefunction(getattr(self.reddit_service, 'close', None)):
+            await self.reddit_service.close()
     
     async def process_posts(self) -> None:
         """Process and send all posts to Telegram."""
         try:
-            filtered_posts = self.reddit_service.get_all_posts()
+            filtered_posts = await self.get_all_posts()
             
             # Count total posts
             total_posts = sum(len(posts) for posts in filtered_posts)
@@ -75,15 +184,18 @@ class TelegramBot:
             logger.info(f"Sending {total_posts} posts to Telegram")
             
             # Process each post
-            for posts in filtered_posts:
-                for post in posts:
-                    await self.send_post(post)
-                    # Add a delay between posts to avoid rate limiting
-                    await asyncio.sleep(1)
+            await self.send_posts([post for posts in filtered_posts for post in posts])
         
         except Exception as e:
             logger.error(f"Error processing posts for Telegram: {str(e)}")
     
+    async def _process_posts_and_close(self) -> None:
+        """Process all posts, then close the Reddit service's connections."""
+        try:
+            await self.process_posts()
+        finally:
+            await self.close()
+    
     def run(self) -> None:
         """Run the Telegram bot."""
         try:
@@ -91,7 +203,7 @@ class TelegramBot:
             
             # Create and run the event loop
             loop = asyncio.get_event_loop()
-            loop.run_until_complete(self.process_posts())
+            loop.run_until_complete(self._process_posts_and_close())
             
             logger.info("Telegram bot completed successfully")
         
@@ -0,0 +1,108 @@
+"""Generic webhook sink for Slack-compatible incoming webhooks."""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+
+from src.bots.render import SLACK_MRKDWN, get_renderer
+from src.bots.sink import SinkCapabilities
+from src.services.post import Post
+from src.utils.env import load_env
+from src.utils.http import get_http_session
+from src.utils.ratelimit import AsyncTokenBucket
+from src.utils.timefmt import get_age_formatter
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Payload formats selectable with WEBHOOK_FORMAT: Slack's {"text": ...} or the post's fields with the text
+PAYLOAD_FORMATS = ("slack", "json")
+
+# Slack allows about one message per second per incoming webhook
+DEFAULT_WEBHOOK_RATE_PER_SECOND = 1
+
+# Posts per send_batch call
+WEBHOOK_BATCH_SIZE = 10
+
+# Times a rate limited message is retried before it is reported as failed
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Seconds to wait for the webhook to answer
+WEBHOOK_TIMEOUT = 10
+
+class WebhookSink:
+    """Sends each post as one message to an incoming webhook.
+    
+    The message is Slack mrkdwn, so Slack, Mattermost, Rocket.Chat and
+    other Slack-compatible webhooks can take it as it is. With the json
+    payload format the post's fields are sent along with the text for
+    webhooks of your own.
+    """
+    
+    def __init__(self, webhook_url: Optional[str] = None, payload_format: Optional[str] = None,
+                 session: Optional[requests.Session] = None):
+        """Initialize the sink, defaulting to the WEBHOOK_URL webhook and WEBHOOK_FORMAT payloads."""
+        self.webhook_url = webhook_url or os.environ.get('WEBHOOK_URL')
+        if not self.webhook_url:
+            raise ValueError("Webhook URL is not configured")
+        
+        self.payload_format = payload_format or os.getenv('WEBHOOK_FORMAT', 'slack')
+        if self.payload_format not in PAYLOAD_FORMATS:
+            raise ValueError(f"Unknown WEBHOOK_FORMAT '{self.payload_format}', expected one of {', '.join(PAYLOAD_FORMATS)}")
+        
+        rate = float(os.getenv('WEBHOOK_RATE_PER_SECOND', DEFAULT_WEBHOOK_RATE_PER_SECOND))
+        self.bucket = AsyncTokenBucket(rate=rate)
+        self.session = session or get_http_session()
+        self.age_formatter = get_age_formatter()
+        self.renderer = get_renderer()
+        self.capabilities = SinkCapabilities(max_batch_size=WEBHOOK_BATCH_SIZE)
+    
+    def create_payload(self, post: Union[Post, Dict[str, Any]], now: Optional[float] = None) -> Dict[str, Any]:
+        """Create the webhook payload of a post, with its age as of `now` (the current time by default)."""
+        posted_ago = self.age_formatter.render(post, now)
+        text = self.renderer.render(post, SLACK_MRKDWN, posted_ago)
+        if self.payload_format == 'json':
+            return {**Post.coerce(post).to_dict(), "posted_ago": posted_ago, "text": text}
+        return {"text": text}
+    
+    async def send_post(self, post: Union[Post, Dict[str, Any]], now: Optional[float] = None) -> bool:
+        """Send a post to the webhook. Returns True if it was delivered."""
+        try:
+            payload = self.create_payload(post, now)
+            
+            for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+                await self.bucket.acquire()
+                response = await asyncio.to_thread(
+                    self.session.post, self.webhook_url, json=payload, timeout=WEBHOOK_TIMEOUT
+                )
+                if response.status_code != 429:
+                    break
+                retry_after = float(response.headers.get('Retry-After') or 1)
+                logger.warning(f"Webhook rate limited, retrying in {retry_after:.0f}s")
+                self.bucket.pause(retry_after)
+            
+            if not 200 <= response.status_code < 300:
+                logger.error(f"Webhook failed with status {response.status_code}")
+                return False
+            
+            logger.info(f"Sent post '{post.get('title', 'Unknown')}' to webhook")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to send post to webhook: {str(e)}")
+            return False
+    
+    async def send_batch(self, posts: List[Union[Post, Dict[str, Any]]]) -> List[str]:
+        """Send posts to the webhook in order and return the IDs of the delivered ones."""
+        # Render every age in the batch against the same clock reading
+        now = time.time()
+        delivered = []
+        for post in posts:
+            if await self.send_post(post, now):
+                delivered.append(post.get('id'))
+        return delivered
@@ -0,0 +1,209 @@
+"""Asyncio MongoDB service for deduplicating Reddit posts without blocking the event loop."""
+from pymongo import AsyncMongoClient, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+
+from src.services.mongodb import (
+    CHECKPOINT_COLLECTION,
+    DEFAULT_SEEN_TTL_DAYS,
+    INDEX_OPTIONS_CONFLICT,
+    build_connection_string,
+    is_duplicate_only,
+)
+from src.utils.env import load_env
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+class AsyncMongoDBService:
+    """Asyncio counterpart of MongoDBService for the fetch path, using PyMongo's async API.
+    
+    Stores the same documents in the same collections, so sync and async
+    runs deduplicate against each other.
+    """
+    
+    def __init__(self):
+        """Initialize the MongoDB client. It connects on first use."""
+        self.client = AsyncMongoClient(build_connection_string())
+        self.db = self.client[os.environ.get("MONGO_DB_NAME")]
+        self.seen_ttl_seconds = int(float(os.environ.get("SEEN_TTL_DAYS", DEFAULT_SEEN_TTL_DAYS)) * 86400)
+        self._indexed_collections = set()
+        self._index_lock = asyncio.Lock()
+        self._checkpoint_index_ready = False
+    
+    async def ping(self):
+        """Check the connection to MongoDB."""
+        try:
+            await self.client.admin.command('ping')
+            logger.info("Connected to MongoDB successfully")
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            raise
+    
+    async def close(self):
+        """Close the MongoDB client."""
+        await self.client.close()
+    
+    async def ensure_indexes(self, collection_name):
+        """Create the unique ID index and the seen_at TTL index on a collection."""
+        collection = self.db[collection_name]
+        try:
+            await collection.create_index("id", unique=True)
+            await collection.create_index("seen_at", expireAfterSeconds=self.seen_ttl_seconds)
+            logger.debug(f"Ensured indexes on collection {collection_name}")
+        except OperationFailure as e:
+            if e.code == INDEX_OPTIONS_CONFLICT:
+                await self.update_ttl(collection_name)
+            else:
+                # Existing duplicates; dedup still works without the index
+                logger.warning(f"Could not create indexes on collection {collection_name}: {e}")
+        self._indexed_collections.add(collection_name)
+    
+    async def update_ttl(self, collection_name):
+        """Change the expiry of an existing seen_at TTL index to SEEN_TTL_DAYS."""
+        try:
+            await self.db.command("collMod", collection_name, index={
+                "keyPattern": {"seen_at": 1},
+                "expireAfterSeconds": self.seen_ttl_seconds
+            })
+            logger.info(f"Changed the seen_at TTL of collection {collection_name} to {self.seen_ttl_seconds}s")
+        except OperationFailure as e:
+            logger.warning(f"SEEN_TTL_DAYS is ignored for collection {collection_name}, its seen_at index could not be changed: {e}")
+    
+    async def _get_collection(self, collection_name):
+        """Get a collection, creating its indexes on first use in this process."""
+        if collection_name not in self._indexed_collections:
+            async with self._index_lock:
+                if collection_name not in self._indexed_collections:
+                    await self.ensure_indexes(collection_name)
+        return self.db[collection_name]
+    
+    async def insert_post(self, post_id, collection_name):
+        """Insert a post ID into a collection."""
+        try:
+            collection = await self._get_collection(collection_name)
+            await collection.insert_one({"id": post_id, "seen_at": datetime.now(timezone.utc)})
+            logger.debug(f"Inserted post ID {post_id} into collection {collection_name}")
+        except DuplicateKeyError:
+            logger.debug(f"Post ID {post_id} already exists in collection {collection_name}")
+        except Exception as e:
+            logger.error(f"Failed to insert post {post_id}: {e}")
+            raise
+    
+    async def check_post_exists(self, post_id, collection_name):
+        """Check if a post ID exists in a collection."""
+        try:
+            collection = await self._get_collection(collection_name)
+            return bool(await collection.count_documents({"id": post_id}))
+        except Exception as e:
+            logger.error(f"Failed to check post {post_id}: {e}")
+            raise
+    
+    async def filter_unseen(self, post_ids, collection_name):
+        """Return the post IDs not yet stored in a collection, in their original order."""
+        if not post_ids:
+            return []
+        try:
+            collection = await self._get_collection(collection_name)
+            cursor = collection.find({"id": {"$in": list(post_ids)}}, {"id": 1, "_id": 0})
+            seen = {doc["id"] async for doc in cursor}
+            return [post_id for post_id in post_ids if post_id not in seen]
+        except Exception as e:
+            logger.error(f"Failed to check posts in collection {collection_name}: {e}")
+            raise
+    
+    async def mark_seen_many(self, post_ids, collection_name):
+        """Insert many post IDs into a collection with a single unordered write."""
+        if not post_ids:
+            return
+        try:
+            collection = await self._get_collection(collection_name)
+            seen_at = datetime.now(timezone.utc)
+            await collection.insert_many([{"id": post_id, "seen_at": seen_at} for post_id in post_ids], ordered=False)
+            logger.debug(f"Inserted {len(post_ids)} post IDs into collection {collection_name}")
+        except BulkWriteError as e:
+            # IDs stored by another run are fine, anything else is a real failure
+            if not is_duplicate_only(e):
+                logger.error(f"Failed to insert posts into collection {collection_name}: {e}")
+                raise
+        except Exception as e:
+            logger.error(f"Failed to insert posts into collection {collection_name}: {e}")
+            raise
+    
+    async def claim_posts(self, post_ids, collection_name):
+        """Atomically mark post IDs as seen and return only the ones this call claimed."""
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return []
+        try:
+            collection = await self._get_collection(collection_name)
+            seen_at = datetime.now(timezone.utc)
+            requests = [
+                UpdateOne({"id": post_id}, {"$setOnInsert": {"seen_at": seen_at}}, upsert=True)
+                for post_id in post_ids
+            ]
+            try:
+                result = await collection.bulk_write(requests, ordered=False)
+                upserted = set(result.upserted_ids)
+            except BulkWriteError as e:
+                # Two upserts racing on the unique index: the loser simply did not claim the ID
+                if not is_duplicate_only(e):
+                    raise
+                upserted = {entry["index"] for entry in e.details.get("upserted", [])}
+            
+            claimed = [post_id for index, post_id in enumerate(post_ids) if index in upserted]
+            logger.debug(f"Claimed {len(claimed)} of {len(post_ids)} post IDs in collection {collection_name}")
+            return claimed
+        except Exception as e:
+            logger.error(f"Failed to claim posts in collection {collection_name}: {e}")
+            raise
+    
+    async def recent_post_ids(self, collection_name, limit):
+        """Get the most recently seen post IDs of a collection, newest first."""
+        try:
+            collection = await self._get_collection(collection_name)
+            cursor = collection.find({}, {"id": 1, "_id": 0}).sort("seen_at", DESCENDING).limit(limit)
+            return [doc["id"] async for doc in cursor]
+        except Exception as e:
+            logger.error(f"Failed to read recent posts of collection {collection_name}: {e}")
+            raise
+    
+    async def _get_checkpoint_collection(self):
+        """Get the checkpoint collection, creating its unique subreddit index on first use."""
+        collection = self.db[CHECKPOINT_COLLECTION]
+        if not self._checkpoint_index_ready:
+            await collection.create_index("subreddit", unique=True)
+            self._checkpoint_index_ready = True
+        return collection
+    
+    async def get_checkpoint(self, subreddit_name):
+        """Get the last seen post fullname and created_utc for a subreddit, or None."""
+        try:
+            collection = await self._get_checkpoint_collection()
+            return await collection.find_one({"subreddit": subreddit_name}, {"_id": 0})
+        except Exception as e:
+            logger.error(f"Failed to read checkpoint for r/{subreddit_name}: {e}")
+            raise
+    
+    async def set_checkpoint(self, subreddit_name, fullname, created_utc):
+        """Store the newest fetched post of a subreddit as its checkpoint."""
+        try:
+            collection = await self._get_checkpoint_collection()
+            await collection.update_one(
+                {"subreddit": subreddit_name},
+                {"$set": {
+                    "fullname": fullname,
+                    "created_utc": created_utc,
+                    "checked_utc": datetime.now(timezone.utc).timestamp()
+                }},
+                upsert=True
+            )
+            logger.debug(f"Checkpoint for r/{subreddit_name} set to {fullname}")
+        except Exception as e:
+            logger.error(f"Failed to store checkpoint for r/{subreddit_name}: {e}")
+            raise
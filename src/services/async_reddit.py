@@ -0,0 +1,164 @@
+"""Asyncio Reddit service for fetching posts without blocking the event loop."""
+import asyncpraw
+import asyncprawcore
+import asyncio
+import logging
+import os
+from typing import Any, Callable, List, Optional
+
+from src.services.reddit import (
+    DEFAULT_FETCH_WORKERS,
+    DEFAULT_MULTIREDDIT_CHUNK_SIZE,
+    LISTING_PAGE_SIZE,
+    RedditService,
+)
+from src.services.seen_cache import SeenCache
+from src.services.store import create_async_store
+from src.utils.env import load_env
+from src.utils.ratelimit import SharedRateBudget, is_reddit_api_request
+from src.utils.steps import async_steps
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+class GovernedRequest:
+    """One Reddit request of AsyncGovernedRequestor, issued once the shared budget has a slot for it.
+    
+    asyncprawcore 2.x awaits Requestor.request for the response, while
+    later releases enter it as an async context manager. A governed
+    request supports both, so the requestor works with either version.
+    """
+    
+    def __init__(self, requestor: "AsyncGovernedRequestor", issue: Callable[..., Any], args: Any, kwargs: Any):
+        """Remember the request, issue being the parent requestor's request method."""
+        self.requestor = requestor
+        self.issue = issue
+        self.args = args
+        self.kwargs = kwargs
+        self.governed = is_reddit_api_request(requestor.oauth_url, args, kwargs)
+        self._context = None
+    
+    async def _wait_for_budget(self) -> None:
+        """Wait until the shared budget has a slot for an API request."""
+        if self.governed:
+            delay = self.requestor.budget.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+    
+    def _record(self, response: Any) -> Any:
+        """Record the rate limit headers of an API response."""
+        if self.governed:
+            self.requestor.budget.update(response.headers)
+        return response
+    
+    async def _send(self) -> Any:
+        """Issue the request the asyncprawcore 2.x way, awaiting its response."""
+        await self._wait_for_budget()
+        return self._record(await self.issue(*self.args, **self.kwargs))
+    
+    def __await__(self):
+        """Await the response."""
+        return self._send().__await__()
+    
+    async def __aenter__(self) -> Any:
+        """Issue the request the way later asyncprawcore releases do, entering its context."""
+        await self._wait_for_budget()
+        self._context = self.issue(*self.args, **self.kwargs)
+        return self._record(await self._context.__aenter__())
+    
+    async def __aexit__(self, *exc_info: Any) -> Any:
+        """Release the response."""
+        return await self._context.__aexit__(*exc_info)
+
+class AsyncGovernedRequestor(asyncprawcore.Requestor):
+    """asyncprawcore requestor that waits for a slot in the shared Reddit budget before each API request."""
+    
+    def __init__(self, *, budget: SharedRateBudget, **kwargs: Any):
+        """Initialize the requestor, taking the rest of its arguments from asyncpraw."""
+        super().__init__(**kwargs)
+        self.budget = budget
+    
+    def request(self, *args: Any, **kwargs: Any) -> GovernedRequest:
+        """Issue the request once the budget has a slot for it, and record its rate limit headers."""
+        return GovernedRequest(self, super().request, args, kwargs)
+
+class AsyncRedditService:
+    """Asyncio counterpart of RedditService built on asyncpraw and an awaitable dedup store.
+    
+    Fetching, deduplication and checkpointing run RedditService's own step
+    generators, with every Reddit and dedup store call awaited, so
+    subreddits are fetched concurrently on the event loop instead of on a
+    thread pool.
+    """
+    
+    # Formatting and filtering don't touch the network, share them with the sync service
+    calculate_time_difference = RedditService.calculate_time_difference
+    get_sub_names = RedditService.get_sub_names
+    _create_filter = RedditService._create_filter
+    filter_submissions = RedditService.filter_submissions
+    build_post = RedditService.build_post
+    rate_budget = RedditService.rate_budget
+    log_rate_budget = RedditService.log_rate_budget
+    
+    # Listing, claiming and checkpointing logic, awaiting each call the sync service makes
+    collect_new_posts = async_steps(RedditService.collect_new_posts)
+    fetch_since_checkpoint = async_steps(RedditService.fetch_since_checkpoint)
+    fetch_since_timestamp = async_steps(RedditService.fetch_since_timestamp)
+    fetch_new_submissions = async_steps(RedditService.fetch_new_submissions)
+    save_checkpoint = async_steps(RedditService.save_checkpoint)
+    get_filtered_posts = async_steps(RedditService.get_filtered_posts)
+    get_combined_posts = async_steps(RedditService.get_combined_posts)
+    get_all_posts = async_steps(RedditService.get_all_posts)
+    
+    def __init__(self):
+        """Initialize the Reddit client and the dedup store selected by DEDUP_BACKEND, behind the seen ID cache."""
+        self.reddit = self._create_client()
+        self.mongo_service = SeenCache(create_async_store(), asynchronous=True)
+        self.post_filter = self._create_filter()
+        self.fetch_workers = max(1, int(os.getenv('FETCH_WORKERS', DEFAULT_FETCH_WORKERS)))
+        self.fetch_mode = os.getenv('FETCH_MODE', 'per_subreddit').strip().lower()
+        self.multireddit_chunk_size = max(1, int(os.getenv('MULTIREDDIT_CHUNK_SIZE', DEFAULT_MULTIREDDIT_CHUNK_SIZE)))
+    
+    def _create_client(self):
+        """Create an asyncpraw Reddit client, pacing its requests against the shared budget."""
+        try:
+            governor = {}
+            if self.rate_budget is not None:
+                governor = {"requestor_class": AsyncGovernedRequestor,
+                            "requestor_kwargs": {"budget": self.rate_budget}}
+            reddit = asyncpraw.Reddit(
+                client_id=os.environ.get("REDDIT_CLIENT_ID"),
+                client_secret=os.environ.get("REDDIT_CLIENT_SECRET"),
+                user_agent=os.environ.get("REDDIT_USER_AGENT"),
+                **governor
+            )
+            logger.info("Connected to Reddit API")
+            return reddit
+        except Exception as e:
+            logger.error(f"Failed to create Reddit client: {e}")
+            raise
+    
+    async def close(self) -> None:
+        """Close the Reddit HTTP session and the dedup store."""
+        await self.reddit.close()
+        await self.mongo_service.close()
+    
+    async def fetch_page(self, listing_name: str, limit: int = LISTING_PAGE_SIZE, **params: Any) -> List[Any]:
+        """Fetch one page of a subreddit's new listing with a single request, as RedditService.fetch_page."""
+        return list(await self.reddit.get(f"r/{listing_name}/new", params={"limit": limit, **params}))
+    
+    async def fetch_by_fullname(self, fullname: str) -> Optional[Any]:
+        """Look up one submission by its fullname with a single request, as RedditService.fetch_by_fullname."""
+        return next(iter(await self.reddit.get("api/info", params={"id": fullname})), None)
+    
+    async def _map_concurrently(self, func, items: List[Any]) -> List[Any]:
+        """Await func for each item, at most fetch_workers at a time, keeping the input order."""
+        semaphore = asyncio.Semaphore(self.fetch_workers)
+        
+        async def run(item: Any) -> Any:
+            async with semaphore:
+                return await func(item)
+        
+        return list(await asyncio.gather(*(run(item) for item in items)))
@@ -1,35 +1,76 @@
 """MongoDB service for storing and retrieving Reddit posts."""
 import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import logging
 import os
-from dotenv import load_dotenv
+import threading
+from datetime import datetime, timezone
+
+from src.services.store import DEFAULT_SEEN_TTL_DAYS
+from src.utils.env import load_env
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
+# Collection holding the per-subreddit fetch checkpoints
+CHECKPOINT_COLLECTION = "_checkpoints"
+
+# MongoDB error code for a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
+# MongoDB error code for creating an index that exists with other options
+INDEX_OPTIONS_CONFLICT = 85
+
+def build_connection_string():
+    """Build the MongoDB connection string from the MONGO_* environment variables."""
+    mongo_user = os.environ.get("MONGO_USER")
+    mongo_pass = os.environ.get("MONGO_PASSWORD")
+    mongo_uri = os.environ.get("MONGO_URI")
+    mongo_db = os.environ.get("MONGO_DB_NAME")
+    
+    if not all([mongo_user, mongo_pass, mongo_uri, mongo_db]):
+        logger.warning("MongoDB credentials not fully configured")
+    
+    return f"mongodb+srv://{mongo_user}:{mongo_pass}@{mongo_uri}/?retryWrites=true&w=majority"
+
+def is_duplicate_only(error):
+    """Check whether a BulkWriteError only failed on unique index violations."""
+    errors = error.details.get("writeErrors", [])
+    return not error.details.get("writeConcernErrors") and all(e.get("code") == DUPLICATE_KEY_ERROR for e in errors)
+
 class MongoDBService:
     """Service for interacting with MongoDB."""
     
     def __init__(self):
-        """Initialize the MongoDB client."""
-        self.client = self._create_client()
-        self.db = self.client[os.environ.get("MONGO_DB_NAME")]
+        """Initialize the service. The client connects on first use."""
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.seen_ttl_seconds = int(float(os.environ.get("SEEN_TTL_DAYS", DEFAULT_SEEN_TTL_DAYS)) * 86400)
+        self._indexed_collections = set()
+        self._index_lock = threading.Lock()
+        self._checkpoint_index_ready = False
+    
+    @property
+    def client(self):
+        """Get the MongoDB client, connecting on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+    
+    @property
+    def db(self):
+        """Get the configured database."""
+        return self.client[os.environ.get("MONGO_DB_NAME")]
     
     def _create_client(self):
         """Create a MongoDB client."""
         try:
-            mongo_user = os.environ.get("MONGO_USER")
-            mongo_pass = os.environ.get("MONGO_PASSWORD")
-            mongo_uri = os.environ.get("MONGO_URI")
-            mongo_db = os.environ.get("MONGO_DB_NAME")
-            
-            if not all([mongo_user, mongo_pass, mongo_uri, mongo_db]):
-                logger.warning("MongoDB credentials not fully configured")
-                
-            srv = f"mongodb+srv://{mongo_user}:{mongo_pass}@{mongo_uri}/?retryWrites=true&w=majority"
-            client = pymongo.MongoClient(srv)
+            client = pymongo.MongoClient(build_connection_string())
             
             # Test connection
             client.admin.command('ping')
@@ -40,12 +81,48 @@ class MongoDBService:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
     
+    def ensure_indexes(self, collection_name):
+        """Create the unique ID index and the seen_at TTL index on a collection."""
+        collection = self.db[collection_name]
+        try:
+            collection.create_index("id", unique=True)
+            collection.create_index("seen_at", expireAfterSeconds=self.seen_ttl_seconds)
+            logger.debug(f"Ensured indexes on collection {collection_name}")
+        except OperationFailure as e:
+            if e.code == INDEX_OPTIONS_CONFLICT:
+                self.update_ttl(collection_name)
+            else:
+                # Existing duplicates; dedup still works without the index
+                logger.warning(f"Could not create indexes on collection {collection_name}: {e}")
+        self._indexed_collections.add(collection_name)
+    
+    def update_ttl(self, collection_name):
+        """Change the expiry of an existing seen_at TTL index to SEEN_TTL_DAYS."""
+        try:
+            self.db.command("collMod", collection_name, index={
+                "keyPattern": {"seen_at": 1},
+                "expireAfterSeconds": self.seen_ttl_seconds
+            })
+            logger.info(f"Changed the seen_at TTL of collection {collection_name} to {self.seen_ttl_seconds}s")
+        except OperationFailure as e:
+            logger.warning(f"SEEN_TTL_DAYS is ignored for collection {collection_name}, its seen_at index could not be changed: {e}")
+    
+    def _get_collection(self, collection_name):
+        """Get a collection, creating its indexes on first use in this process."""
+        if collection_name not in self._indexed_collections:
+            with self._index_lock:
+                if collection_name not in self._indexed_collections:
+                    self.ensure_indexes(collection_name)
+        return self.db[collection_name]
+    
     def insert_post(self, post_id, collection_name):
         """Insert a post ID into a collection."""
         try:
-            collection = self.db[collection_name]
-            collection.insert_one({"id": post_id})
+            collection = self._get_collection(collection_name)
+            collection.insert_one({"id": post_id, "seen_at": datetime.now(timezone.utc)})
             logger.debug(f"Inserted post ID {post_id} into collection {collection_name}")
+        except DuplicateKeyError:
+            logger.debug(f"Post ID {post_id} already exists in collection {collection_name}")
         except Exception as e:
             logger.error(f"Failed to insert post {post_id}: {e}")
             raise
@@ -53,15 +130,128 @@ class MongoDBService:
     def check_post_exists(self, post_id, collection_name):
         """Check if a post ID exists in a collection."""
         try:
-            collection = self.db[collection_name]
+            collection = self._get_collection(collection_name)
             id_count = collection.count_documents({"id": post_id})
             return bool(id_count)
         except Exception as e:
             logger.error(f"Failed to check post {post_id}: {e}")
             raise
     
+    def filter_unseen(self, post_ids, collection_name):
+        """Return the post IDs not yet stored in a collection, in their original order."""
+        if not post_ids:
+            return []
+        try:
+            collection = self._get_collection(collection_name)
+            cursor = collection.find({"id": {"$in": list(post_ids)}}, {"id": 1, "_id": 0})
+            seen = {doc["id"] for doc in cursor}
+            return [post_id for post_id in post_ids if post_id not in seen]
+        except Exception as e:
+            logger.error(f"Failed to check posts in collection {collection_name}: {e}")
+            raise
+    
+    def mark_seen_many(self, post_ids, collection_name):
+        """Insert many post IDs into a collection with a single unordered write."""
+        if not post_ids:
+            return
+        try:
+            collection = self._get_collection(collection_name)
+            seen_at = datetime.now(timezone.utc)
+            collection.insert_many([{"id": post_id, "seen_at": seen_at} for post_id in post_ids], ordered=False)
+            logger.debug(f"Inserted {len(post_ids)} post IDs into collection {collection_name}")
+        except BulkWriteError as e:
+            # IDs stored by another run are fine, anything else is a real failure
+            if not is_duplicate_only(e):
+                logger.error(f"Failed to insert posts into collection {collection_name}: {e}")
+                raise
+        except Exception as e:
+            logger.error(f"Failed to insert posts into collection {collection_name}: {e}")
+            raise
+    
+    def claim_posts(self, post_ids, collection_name):
+        """Atomically mark post IDs as seen and return only the ones this call claimed.
+        
+        Each ID is upserted in one unordered bulk write. An ID counts as
+        claimed only if this call inserted it, so overlapping runs never
+        both deliver the same post.
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return []
+        try:
+            collection = self._get_collection(collection_name)
+            seen_at = datetime.now(timezone.utc)
+            requests = [
+                UpdateOne({"id": post_id}, {"$setOnInsert": {"seen_at": seen_at}}, upsert=True)
+                for post_id in post_ids
+            ]
+            try:
+                result = collection.bulk_write(requests, ordered=False)
+                upserted = set(result.upserted_ids)
+            except BulkWriteError as e:
+                # Two upserts racing on the unique index: the loser simply did not claim the ID
+                if not is_duplicate_only(e):
+                    raise
+                upserted = {entry["index"] for entry in e.details.get("upserted", [])}
+            
+            claimed = [post_id for index, post_id in enumerate(post_ids) if index in upserted]
+            logger.debug(f"Claimed {len(claimed)} of {len(post_ids)} post IDs in collection {collection_name}")
+            return claimed
+        except Exception as e:
+            logger.error(f"Failed to claim posts in collection {collection_name}: {e}")
+            raise
+    
+    def recent_post_ids(self, collection_name, limit):
+        """Get the most recently seen post IDs of a collection, newest first."""
+        try:
+            collection = self._get_collection(collection_name)
+            cursor = collection.find({}, {"id": 1, "_id": 0}).sort("seen_at", pymongo.DESCENDING).limit(limit)
+            return [doc["id"] for doc in cursor]
+        except Exception as e:
+            logger.error(f"Failed to read recent posts of collection {collection_name}: {e}")
+            raise
+    
+    def _get_checkpoint_collection(self):
+        """Get the checkpoint collection, creating its unique subreddit index on first use."""
+        collection = self.db[CHECKPOINT_COLLECTION]
+        if not self._checkpoint_index_ready:
+            collection.create_index("subreddit", unique=True)
+            self._checkpoint_index_ready = True
+        return collection
+    
+    def get_checkpoint(self, subreddit_name):
+        """Get the last seen post fullname and created_utc for a subreddit, or None."""
+        try:
+            collection = self._get_checkpoint_collection()
+            return collection.find_one({"subreddit": subreddit_name}, {"_id": 0})
+        except Exception as e:
+            logger.error(f"Failed to read checkpoint for r/{subreddit_name}: {e}")
+            raise
+    
+    def set_checkpoint(self, subreddit_name, fullname, created_utc):
+        """Store the newest fetched post of a subreddit as its checkpoint."""
+        try:
+            collection = self._get_checkpoint_collection()
+            collection.update_one(
+                {"subreddit": subreddit_name},
+                {"$set": {
+                    "fullname": fullname,
+                    "created_utc": created_utc,
+                    "checked_utc": datetime.now(timezone.utc).timestamp()
+                }},
+                upsert=True
+            )
+            logger.debug(f"Checkpoint for r/{subreddit_name} set to {fullname}")
+        except Exception as e:
+            logger.error(f"Failed to store checkpoint for r/{subreddit_name}: {e}")
+            raise
+    
     def cleanup_collection(self, collection_name, max_documents=100):
-        """Delete all documents in a collection if it exceeds the max count."""
+        """Delete all documents in a collection if it exceeds the max count.
+        
+        Not used by the fetch path any more: the seen_at TTL index bounds
+        retention. Kept for manual maintenance of legacy collections.
+        """
         try:
             collection = self.db[collection_name]
             docs_count = collection.count_documents({})
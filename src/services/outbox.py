@@ -0,0 +1,201 @@
+"""Durable outbox of posts waiting to be delivered to each sink."""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List
+from uuid import uuid4
+
+from src.utils.env import load_env
+from src.utils.lazy import lazy_import
+
+# Only the delivery pipeline opens the outbox, don't load pymongo for other entry points
+pymongo = lazy_import("pymongo")
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Collection holding the outbox items of every sink
+OUTBOX_COLLECTION = "_outbox"
+
+# Outbox item states
+PENDING = "pending"
+INFLIGHT = "inflight"
+DONE = "done"
+DEAD = "dead"
+
+# Defaults for claiming and retrying outbox items
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_BACKOFF_SECONDS = 30
+DEFAULT_MAX_BACKOFF_SECONDS = 3600
+
+# How long delivered items are kept before MongoDB expires them
+DEFAULT_DONE_TTL_DAYS = 7
+
+class OutboxService:
+    """Queue of (sink, post) deliveries stored in MongoDB.
+    
+    Fetched posts are enqueued once per sink. A sink worker claims a batch,
+    which leases the items to it, and acks the posts it delivered. Failed
+    items are retried with exponential backoff until they run out of
+    attempts and are dead-lettered. Items whose lease expires, e.g. because
+    the worker crashed, become claimable again.
+    """
+    
+    def __init__(self, db):
+        """Initialize the outbox on a MongoDB database."""
+        self.collection = db[OUTBOX_COLLECTION]
+        self._load_settings()
+        self.ensure_indexes()
+    
+    def _load_settings(self):
+        """Read the claim, retry and expiry settings from the environment."""
+        self.batch_size = int(os.environ.get("OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        self.lease_seconds = float(os.environ.get("OUTBOX_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+        self.max_attempts = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+        self.backoff_seconds = float(os.environ.get("OUTBOX_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS))
+        self.max_backoff_seconds = float(os.environ.get("OUTBOX_MAX_BACKOFF_SECONDS", DEFAULT_MAX_BACKOFF_SECONDS))
+        self.done_ttl_seconds = int(float(os.environ.get("OUTBOX_DONE_TTL_DAYS", DEFAULT_DONE_TTL_DAYS)) * 86400)
+    
+    def ensure_indexes(self):
+        """Create the claim and lease indexes and the TTL index on delivered items."""
+        try:
+            self.collection.create_index([("sink", pymongo.ASCENDING), ("state", pymongo.ASCENDING), ("next_attempt_at", pymongo.ASCENDING)])
+            self.collection.create_index("lease", sparse=True)
+            self.collection.create_index("done_at", expireAfterSeconds=self.done_ttl_seconds)
+        except pymongo.errors.OperationFailure as e:
+            logger.warning(f"Could not create indexes on the outbox: {e}")
+    
+    @staticmethod
+    def _item_id(sink, post_id):
+        """Get the outbox document ID of a post for a sink."""
+        return f"{sink}:{post_id}"
+    
+    def backoff(self, attempts):
+        """Get the delay before retrying an item that has failed `attempts` times."""
+        return min(self.max_backoff_seconds, self.backoff_seconds * 2 ** max(0, attempts - 1))
+    
+    def enqueue(self, sink, posts):
+        """Add posts to a sink's queue. Posts already queued for the sink are left untouched."""
+        if not posts:
+            return
+        now = datetime.now(timezone.utc)
+        requests = [
+            pymongo.UpdateOne(
+                {"_id": self._item_id(sink, post["id"])},
+                {"$setOnInsert": {
+                    "sink": sink,
+                    "post_id": post["id"],
+                    "post": dict(post),
+                    "state": PENDING,
+                    "attempts": 0,
+                    "next_attempt_at": now,
+                    "created_at": now
+                }},
+                upsert=True
+            )
+            for post in posts
+        ]
+        try:
+            self.collection.bulk_write(requests, ordered=False)
+            logger.debug(f"Enqueued {len(posts)} posts for {sink}")
+        except Exception as e:
+            logger.error(f"Failed to enqueue posts for {sink}: {e}")
+            raise
+    
+    def claim(self, sink, limit=None):
+        """Lease up to `limit` due items of a sink and return them, oldest first.
+        
+        The due items are leased with one update that stamps them with a
+        new lease token and read back by that token, so a claim costs three
+        round trips however large the batch. The update only matches items
+        that are still due, so concurrent workers never receive the same
+        item while its lease is valid; a worker that loses the race for
+        some items just gets fewer.
+        """
+        limit = limit or self.batch_size
+        now = datetime.now(timezone.utc)
+        lease = uuid4().hex
+        due = {"sink": sink, "state": {"$in": [PENDING, INFLIGHT]}, "next_attempt_at": {"$lte": now}}
+        try:
+            cursor = self.collection.find(due, {"_id": 1}).sort("next_attempt_at", pymongo.ASCENDING).limit(limit)
+            item_ids = [doc["_id"] for doc in cursor]
+            if not item_ids:
+                return []
+            self.collection.update_many(
+                {**due, "_id": {"$in": item_ids}},
+                {
+                    "$set": {"state": INFLIGHT, "lease": lease, "next_attempt_at": now + timedelta(seconds=self.lease_seconds)},
+                    "$inc": {"attempts": 1}
+                }
+            )
+            claimed = {item["_id"]: item for item in self.collection.find({"lease": lease})}
+            return [claimed[item_id] for item_id in item_ids if item_id in claimed]
+        except Exception as e:
+            logger.error(f"Failed to claim outbox items for {sink}: {e}")
+            raise
+    
+    @staticmethod
+    def _lease_filter(item):
+        """Match a claimed item only while the claim that returned it still holds the lease.
+        
+        Every claim stamps a new lease token, so a worker whose lease ran
+        out can't update the item once another worker has re-claimed it.
+        """
+        return {"_id": item["_id"], "state": INFLIGHT, "lease": item["lease"]}
+    
+    def ack(self, sink, items):
+        """Mark claimed items of a sink that were delivered as done."""
+        if not items:
+            return
+        done_at = datetime.now(timezone.utc)
+        requests = [
+            pymongo.UpdateOne(self._lease_filter(item), {"$set": {"state": DONE, "done_at": done_at}})
+            for item in items
+        ]
+        try:
+            result = self.collection.bulk_write(requests, ordered=False)
+            if result.modified_count < len(items):
+                logger.warning(f"{len(items) - result.modified_count} outbox items for {sink} were re-claimed before their ack")
+        except Exception as e:
+            logger.error(f"Failed to ack outbox items for {sink}: {e}")
+            raise
+    
+    def nack(self, sink, items, error=None):
+        """Schedule failed claimed items for a retry, or dead-letter them once they are out of attempts."""
+        if not items:
+            return
+        now = datetime.now(timezone.utc)
+        requests = []
+        for item in items:
+            if item["attempts"] >= self.max_attempts:
+                logger.warning(f"Giving up on post {item['post_id']} for {sink} after {item['attempts']} attempts")
+                update = {"state": DEAD, "last_error": error}
+            else:
+                retry_at = now + timedelta(seconds=self.backoff(item["attempts"]))
+                update = {"state": PENDING, "next_attempt_at": retry_at, "last_error": error}
+            requests.append(pymongo.UpdateOne(self._lease_filter(item), {"$set": update}))
+        try:
+            self.collection.bulk_write(requests, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to nack outbox items for {sink}: {e}")
+            raise
+    
+    def requeue_dead(self, sink):
+        """Give every dead-lettered item of a sink a fresh set of attempts. Returns the number requeued."""
+        result = self.collection.update_many(
+            {"sink": sink, "state": DEAD},
+            {"$set": {"state": PENDING, "attempts": 0, "next_attempt_at": datetime.now(timezone.utc)}}
+        )
+        return result.modified_count
+    
+    def counts(self, sink) -> Dict[str, Any]:
+        """Get the number of items of a sink in each state."""
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": {"sink": sink}},
+            {"$group": {"_id": "$state", "count": {"$sum": 1}}}
+        ]
+        return {doc["_id"]: doc["count"] for doc in self.collection.aggregate(pipeline)}
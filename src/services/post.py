@@ -0,0 +1,87 @@
+"""Post record passed from the Reddit services to the bots."""
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Union
+
+# Keys a post exposes through its dict interface
+POST_KEYS = ("id", "title", "url", "selftext", "subreddit", "flair", "created_utc")
+
+# Longest body excerpt any bot renders, raise it if a bot shows more of the body
+MAX_EXCERPT_CHARS = 3000
+
+@dataclass(frozen=True, slots=True)
+class Post(Mapping):
+    """A fetched Reddit post.
+    
+    The bots only show an excerpt of the body, so a post keeps just the
+    start of it and no reference to the submission, which would keep the
+    whole PRAW object alive. Posts also behave as read-only dicts with the
+    keys of the post dicts they replace, so code written for those keeps
+    working.
+    """
+    
+    id: str
+    title: str = ""
+    url: str = ""
+    subreddit: str = ""
+    flair: Optional[str] = None
+    created_utc: Optional[float] = None
+    # The start of the body, one character past the longest excerpt so excerpts can tell it was cut
+    selftext: str = ""
+    
+    @classmethod
+    def from_submission(cls, submission: Any, subreddit_name: str) -> "Post":
+        """Create a post from a PRAW or Async PRAW submission."""
+        return cls(
+            id=submission.id,
+            title=submission.title,
+            url=submission.url,
+            subreddit=subreddit_name,
+            flair=submission.link_flair_text,
+            created_utc=submission.created_utc,
+            selftext=(submission.selftext or "")[:MAX_EXCERPT_CHARS + 1]
+        )
+    
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Post":
+        """Create a post from a post dict, such as one stored in the outbox."""
+        return cls(
+            id=data.get("id", ""),
+            title=data.get("title", ""),
+            url=data.get("url", ""),
+            subreddit=data.get("subreddit", ""),
+            flair=data.get("flair"),
+            created_utc=data.get("created_utc"),
+            selftext=data.get("selftext") or ""
+        )
+    
+    @classmethod
+    def coerce(cls, post: Union["Post", Mapping]) -> "Post":
+        """Get a post as a Post, converting a post dict."""
+        return post if isinstance(post, Post) else cls.from_dict(post)
+    
+    def excerpt(self, limit: int) -> str:
+        """Get the body cut to at most `limit` characters, ending with "..." if it was cut.
+        
+        `limit` can be at most MAX_EXCERPT_CHARS, past that the kept body is already cut.
+        """
+        text = self.selftext
+        return text[:limit - 3] + "..." if len(text) > limit else text
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the post as a plain dict, with the kept start of the body."""
+        return {key: self[key] for key in POST_KEYS}
+    
+    def __getitem__(self, key: str) -> Any:
+        """Get a field by its post dict key."""
+        if key not in POST_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the post dict keys."""
+        return iter(POST_KEYS)
+    
+    def __len__(self) -> int:
+        """Get the number of post dict keys."""
+        return len(POST_KEYS)
@@ -1,35 +1,107 @@
 """Reddit service for fetching posts from subreddits."""
-import praw
-import pytz
-from datetime import datetime
+from functools import cached_property
 import logging
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Iterator, Optional
 import sys
-from dotenv import load_dotenv
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from src.services.mongodb import MongoDBService
+from src.services.post import Post
+from src.services.seen_cache import SeenCache
+from src.services.store import create_store
+from src.utils.env import load_env
+from src.utils.filters import FilterEngine
+from src.utils.lazy import lazy_import
+from src.utils.ratelimit import SharedRateBudget
+from src.utils.steps import Steps, sync_steps
+from src.utils.timefmt import get_age_formatter
+
+# praw takes a large share of startup time, import it when the client is first used
+praw = lazy_import("praw")
+reddit_governor = lazy_import("src.services.reddit_governor")
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
+# Default number of subreddits fetched in parallel
+DEFAULT_FETCH_WORKERS = 8
+
+# Posts fetched per listing request (Reddit's maximum) and pages read per run
+LISTING_PAGE_SIZE = 100
+MAX_CHECKPOINT_PAGES = 10
+
+# Posts fetched for a subreddit that has no checkpoint yet
+INITIAL_FETCH_LIMIT = 20
+
+# Subreddits combined into one r/a+b+c listing in combined fetch mode
+DEFAULT_MULTIREDDIT_CHUNK_SIZE = 25
+
 class RedditService:
-    """Service for interacting with Reddit API."""
+    """Service for interacting with Reddit API.
+    
+    Fetching, claiming and checkpointing are written once as step
+    generators that yield each Reddit and dedup store call, so
+    AsyncRedditService runs the same code with every call awaited.
+    A @sync_steps method is annotated as the generator it is written as,
+    calling a Steps[List[Post]] method returns the List[Post].
+    """
     
     def __init__(self):
-        """Initialize the Reddit client and MongoDB service."""
-        self.reddit = self._create_client()
-        self.mongo_service = MongoDBService()
+        """Initialize the dedup store, behind an in-process seen ID cache.
+        
+        DEDUP_BACKEND picks the store, MongoDB or a local SQLite file.
+        Neither the store nor the Reddit client connects before it is
+        first used.
+        """
+        self.mongo_service = SeenCache(create_store())
+        self.post_filter = self._create_filter()
+        self.fetch_workers = max(1, int(os.getenv('FETCH_WORKERS', DEFAULT_FETCH_WORKERS)))
+        self.fetch_mode = os.getenv('FETCH_MODE', 'per_subreddit').strip().lower()
+        self.multireddit_chunk_size = max(1, int(os.getenv('MULTIREDDIT_CHUNK_SIZE', DEFAULT_MULTIREDDIT_CHUNK_SIZE)))
+        self._clients = threading.local()
+    
+    @property
+    def reddit(self):
+        """Get the calling thread's Reddit client, creating it on first use.
+        
+        A praw client is not thread safe, its session, rate limit state and
+        token refresh are shared by every request. Each fetch worker thread
+        gets a client of its own, all pacing against the same shared budget.
+        """
+        client = getattr(self._clients, "reddit", None)
+        if client is None:
+            client = self._clients.reddit = self._create_client()
+        return client
+    
+    @cached_property
+    def rate_budget(self) -> Optional[SharedRateBudget]:
+        """Get the Reddit API budget shared with other processes, None if REDDIT_RATE_GOVERNOR is off."""
+        if os.getenv('REDDIT_RATE_GOVERNOR', 'true').lower() == 'false':
+            return None
+        return SharedRateBudget.from_env(os.environ.get("REDDIT_CLIENT_ID") or '')
+    
+    def log_rate_budget(self) -> None:
+        """Log the shared Reddit API budget left after a run."""
+        if self.rate_budget is None:
+            return
+        budget = self.rate_budget.snapshot()
+        logger.info(f"Reddit API budget: {budget['remaining']:.0f} requests remaining, resets in {budget['reset_in']:.0f}s")
     
     def _create_client(self):
-        """Create a Reddit client."""
+        """Create a Reddit client, pacing its requests against the shared budget."""
         try:
+            governor = {}
+            if self.rate_budget is not None:
+                governor = {"requestor_class": reddit_governor.GovernedRequestor,
+                            "requestor_kwargs": {"budget": self.rate_budget}}
             reddit = praw.Reddit(
                 client_id=os.environ.get("REDDIT_CLIENT_ID"),
                 client_secret=os.environ.get("REDDIT_CLIENT_SECRET"),
                 user_agent=os.environ.get("REDDIT_USER_AGENT"),
+                **governor
             )
             logger.info("Connected to Reddit API")
             return reddit
@@ -37,56 +109,139 @@ class RedditService:
             logger.error(f"Failed to create Reddit client: {e}")
             raise
     
-    def calculate_time_difference(self, utc_timestamp: float) -> str:
-        """Calculate time difference between post creation and now."""
-        utc_tz = pytz.utc
-        utc_dt = datetime.utcfromtimestamp(utc_timestamp).replace(tzinfo=utc_tz)
-        ist_tz = pytz.timezone("Asia/Kolkata")
-        ist_dt = utc_dt.astimezone(ist_tz)
-        now_dt = datetime.now(ist_tz)
-        total_seconds_passed = (now_dt - ist_dt).total_seconds()
-        minutes_passed = total_seconds_passed / 60
-
-        if minutes_passed >= 60:
-            hours_passed = minutes_passed / 60
-            return f"{hours_passed:.2f} hours (created {ist_dt.strftime('%Y/%m/%d-%H:%M')})"
+    def calculate_time_difference(self, utc_timestamp: float, now: Optional[float] = None) -> str:
+        """Calculate time difference between post creation and `now` (the current time by default)."""
+        return get_age_formatter().format(utc_timestamp, now)
+    
+    def get_sub_names(self) -> List[str]:
+        """Get the configured subreddit names from SUB_NAMES."""
+        return [name.strip() for name in os.getenv('SUB_NAMES', '').split(',') if name.strip()]
+    
+    def _create_filter(self) -> FilterEngine:
+        """Compile the post filter from FILTERS_FILE, or from the VALID_FLAIRS list if it isn't set."""
+        filters_file = os.getenv('FILTERS_FILE')
+        if filters_file:
+            return FilterEngine.from_file(filters_file)
+        return FilterEngine.from_flairs(os.getenv('VALID_FLAIRS', ''))
+    
+    def filter_submissions(self, submissions: Iterable[Any], subreddit_name: str) -> List[Any]:
+        """Keep the submissions that match the subreddit's filter rule."""
+        return self.post_filter.filter(submissions, subreddit_name)
+    
+    def build_post(self, post: Any, subreddit_name: str) -> Post:
+        """Build the post sent to the bots from a submission.
+        
+        The age is not part of the post, the bots render it from created_utc when sending.
+        """
+        return Post.from_submission(post, subreddit_name)
+    
+    @sync_steps
+    def collect_new_posts(self, submissions: Iterable[Any], subreddit_name: str) -> Steps[List[Post]]:
+        """Filter submissions, claim them and build post dicts for the new ones."""
+        candidates = self.filter_submissions(submissions, subreddit_name)
+        
+        # Claim the batch in one atomic write; posts claimed by an earlier or parallel run are skipped
+        claimed_ids = set((yield self.mongo_service.claim_posts([post.id for post in candidates], subreddit_name)))
+        
+        filtered_posts = []
+        for post in candidates:
+            if post.id not in claimed_ids:
+                continue
+            
+            # Add post data
+            filtered_posts.append(self.build_post(post, subreddit_name))
+            logger.debug(f"Found new post: {post.title}")
+        
+        return filtered_posts
+    
+    def fetch_page(self, listing_name: str, limit: int = LISTING_PAGE_SIZE, **params: Any) -> List[Any]:
+        """Fetch one page of a subreddit's new listing with a single request, newest first.
+        
+        subreddit.new() would follow the page's 'after' cursor whenever a
+        page comes back short, sending a second request that is not needed
+        when paging forward with 'before'.
+        """
+        return list(self.reddit.get(f"r/{listing_name}/new", params={"limit": limit, **params}))
+    
+    def fetch_by_fullname(self, fullname: str) -> Optional[Any]:
+        """Look up one submission by its fullname with a single request, None if Reddit doesn't return it."""
+        return next(iter(self.reddit.get("api/info", params={"id": fullname})), None)
+    
+    @sync_steps
+    def fetch_since_checkpoint(self, subreddit_name: str, checkpoint: Dict[str, Any]) -> Steps[List[Any]]:
+        """Page forward from a checkpoint until caught up, returning the newer submissions newest first."""
+        submissions = []
+        before = checkpoint["fullname"]
+        for _ in range(MAX_CHECKPOINT_PAGES):
+            page = yield self.fetch_page(subreddit_name, before=before)
+            # Each page is newer than everything fetched so far
+            submissions = page + submissions
+            if len(page) < LISTING_PAGE_SIZE:
+                break
+            before = page[0].fullname
+        else:
+            logger.warning(f"r/{subreddit_name} has more than {len(submissions)} new posts, resuming next run")
+        return submissions
+    
+    @sync_steps
+    def fetch_since_timestamp(self, subreddit_name: str, created_utc: float) -> Steps[List[Any]]:
+        """Page back from the newest submission until reaching created_utc, returning the newer ones newest first."""
+        submissions = []
+        params = {}
+        for _ in range(MAX_CHECKPOINT_PAGES):
+            page = yield self.fetch_page(subreddit_name, **params)
+            newer = [post for post in page if post.created_utc > created_utc]
+            submissions += newer
+            if len(newer) < len(page) or len(page) < LISTING_PAGE_SIZE:
+                break
+            params = {"after": page[-1].fullname}
         else:
-            return f"{minutes_passed:.2f} minutes (created {ist_dt.strftime('%Y/%m/%d-%H:%M')})"
+            logger.warning(f"r/{subreddit_name} has more than {len(submissions)} posts since its checkpoint, older ones are skipped")
+        return submissions
+    
+    @sync_steps
+    def fetch_new_submissions(self, subreddit_name: str, initial_limit: int = INITIAL_FETCH_LIMIT) -> Steps[List[Any]]:
+        """Fetch the submissions posted since the subreddit's checkpoint.
+        
+        subreddit_name may also be a combined r/a+b+c listing, which then
+        gets its own checkpoint. The checkpoint is not advanced here, the
+        caller saves it once the submissions are claimed.
+        """
+        checkpoint = yield self.mongo_service.get_checkpoint(subreddit_name)
+        
+        if not checkpoint:
+            return (yield self.fetch_page(subreddit_name, limit=initial_limit))
+        
+        submissions = yield self.fetch_since_checkpoint(subreddit_name, checkpoint)
+        if submissions:
+            return submissions
+        
+        # 'before' also returns nothing once the checkpoint post is deleted or removed, so check it is still listed
+        anchor = yield self.fetch_by_fullname(checkpoint["fullname"])
+        if anchor is not None and getattr(anchor, "removed_by_category", None) is None:
+            return []
+        
+        logger.info(f"Checkpoint post of r/{subreddit_name} is gone, fetching by time instead")
+        return (yield self.fetch_since_timestamp(subreddit_name, checkpoint["created_utc"]))
+    
+    @sync_steps
+    def save_checkpoint(self, subreddit_name: str, submissions: List[Any]) -> Steps[None]:
+        """Advance a subreddit's checkpoint to the newest of the given submissions."""
+        if not submissions:
+            return
+        newest = max(submissions, key=lambda post: post.created_utc)
+        yield self.mongo_service.set_checkpoint(subreddit_name, newest.fullname, newest.created_utc)
     
-    def get_filtered_posts(self, subreddit_name: str) -> List[Dict[str, Any]]:
+    @sync_steps
+    def get_filtered_posts(self, subreddit_name: str) -> Steps[List[Post]]:
         """Get filtered posts from a subreddit."""
         try:
-            VALID_FLAIRS = os.getenv('VALID_FLAIRS', '').split(',')
-            subreddit = self.reddit.subreddit(subreddit_name)
+            submissions = yield self.fetch_new_submissions(subreddit_name)
+            filtered_posts = yield self.collect_new_posts(submissions, subreddit_name)
             
-            # Clean up old post IDs
-            self.mongo_service.cleanup_collection(subreddit_name)
+            # Only move past the submissions once they are claimed, a failed claim refetches them next run
+            yield self.save_checkpoint(subreddit_name, submissions)
             
-            filtered_posts = []
-            for post in subreddit.new(limit=20):
-                # If VALID_FLAIRS is empty or post flair matches
-                if not VALID_FLAIRS or VALID_FLAIRS[0] == '' or post.link_flair_text in VALID_FLAIRS:
-                    # Skip if post already exists
-                    if self.mongo_service.check_post_exists(post.id, subreddit_name):
-                        continue
-                    
-                    # Add post data
-                    posted_ago = self.calculate_time_difference(post.created_utc)
-                    post_dict = {
-                        "id": post.id,
-                        "posted_ago": posted_ago,
-                        "title": post.title,
-                        "url": post.url,
-                        "selftext": post.selftext,
-                        "subreddit": subreddit_name,
-                        "flair": post.link_flair_text
-                    }
-                    
-                    # Save post ID and add to results
-                    self.mongo_service.insert_post(post.id, subreddit_name)
-                    filtered_posts.append(post_dict)
-                    logger.debug(f"Found new post: {post.title}")
-                    
             logger.info(f"Found {len(filtered_posts)} new posts in r/{subreddit_name}")
             return filtered_posts
         
@@ -94,24 +249,122 @@ class RedditService:
             logger.error(f"Error getting posts from r/{subreddit_name}: {e}")
             return []
     
-    def get_all_posts(self) -> List[List[Dict[str, Any]]]:
-        """Get all filtered posts from configured subreddits."""
+    @sync_steps
+    def get_combined_posts(self, sub_names: List[str]) -> Steps[List[List[Post]]]:
+        """Get filtered posts for several subreddits from one combined r/a+b+c listing.
+        
+        Posts are split back per subreddit by post.subreddit and returned
+        as one list per name, in the order given.
+        """
+        listing_name = "+".join(sub_names)
         try:
-            # Get subreddit names
-            sub_names = os.getenv('SUB_NAMES', '').split(',')
-            if not sub_names or sub_names[0] == '':
-                logger.warning("No subreddits configured in SUB_NAMES")
-                return []
-                
-            # Get posts from each subreddit
+            submissions = yield self.fetch_new_submissions(listing_name, initial_limit=LISTING_PAGE_SIZE)
+            
+            # Map Reddit's display names back to the configured collection names
+            configured_names = {name.lower(): name for name in sub_names}
+            by_subreddit = {name: [] for name in sub_names}
+            for submission in submissions:
+                sub_name = configured_names.get(str(submission.subreddit).lower())
+                if sub_name:
+                    by_subreddit[sub_name].append(submission)
+            
             filtered_posts = []
             for sub_name in sub_names:
-                if sub_name.strip():  # Skip empty names
-                    posts = self.get_filtered_posts(sub_name)
-                    filtered_posts.append(posts)
-                
+                posts = yield self.collect_new_posts(by_subreddit[sub_name], sub_name)
+                logger.info(f"Found {len(posts)} new posts in r/{sub_name}")
+                filtered_posts.append(posts)
+            
+            yield self.save_checkpoint(listing_name, submissions)
             return filtered_posts
+        
+        except Exception as e:
+            logger.error(f"Error getting posts from r/{listing_name}: {e}")
+            return [[] for _ in sub_names]
+    
+    def stream_posts(self, pause_after: int = 0) -> Iterator[List[Post]]:
+        """Stream new posts from all configured subreddits as they are submitted.
+        
+        Reads a single combined r/a+b+c stream. Submissions are buffered
+        until the stream catches up, then claimed per subreddit and yielded
+        as one batch. An empty batch is yielded on every idle poll so the
+        caller keeps control of the loop.
+        """
+        sub_names = self.get_sub_names()
+        if not sub_names:
+            logger.warning("No subreddits configured in SUB_NAMES")
+            return
+        
+        # A long-running stream re-sees recent posts; answer those from memory
+        self.mongo_service.warm(sub_names)
+        
+        # Map Reddit's display names back to the configured collection names
+        configured_names = {name.lower(): name for name in sub_names}
+        subreddit = self.reddit.subreddit("+".join(sub_names))
+        
+        pending = {}
+        for submission in subreddit.stream.submissions(pause_after=pause_after):
+            if submission is not None:
+                sub_name = configured_names.get(str(submission.subreddit).lower())
+                if sub_name:
+                    pending.setdefault(sub_name, []).append(submission)
+                continue
+            
+            # The stream has caught up, deliver what arrived since the last pause
+            new_posts = []
+            for sub_name, submissions in pending.items():
+                posts = self.collect_new_posts(submissions, sub_name)
+                self.save_checkpoint(sub_name, submissions)
+                if posts:
+                    logger.info(f"Found {len(posts)} new posts in r/{sub_name}")
+                new_posts.extend(posts)
+            pending = {}
+            yield new_posts
+    
+    def _map_concurrently(self, func, items: List[Any]) -> List[Any]:
+        """Apply func to each item on the bounded fetch pool, keeping the input order."""
+        workers = min(self.fetch_workers, len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+        
+        # Each worker creates its own client, settle the budget they all share before they start
+        _ = self.rate_budget
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reddit-fetch") as executor:
+            return list(executor.map(func, items))
+    
+    @sync_steps
+    def get_all_posts(self) -> Steps[List[List[Post]]]:
+        """Get all filtered posts from configured subreddits.
+        
+        Subreddits are fetched concurrently on a bounded thread pool. Each
+        worker has its own praw client, and every client's requests are
+        paced against the X-Ratelimit budget shared with the other workers
+        and with other processes on the host. Results keep the order of
+        SUB_NAMES.
+        
+        With FETCH_MODE=combined, subreddits are fetched in chunks of
+        MULTIREDDIT_CHUNK_SIZE through r/a+b+c listings instead.
+        """
+        try:
+            # Get subreddit names
+            sub_names = self.get_sub_names()
+            if not sub_names:
+                logger.warning("No subreddits configured in SUB_NAMES")
+                return []
             
+            if self.fetch_mode == 'combined':
+                # One listing request per chunk of subreddits instead of one per subreddit
+                size = self.multireddit_chunk_size
+                chunks = [sub_names[i:i + size] for i in range(0, len(sub_names), size)]
+                chunk_posts = yield self._map_concurrently(self.get_combined_posts, chunks)
+                all_posts = [posts for chunk in chunk_posts for posts in chunk]
+            else:
+                # Get posts from each subreddit
+                all_posts = yield self._map_concurrently(self.get_filtered_posts, sub_names)
+            
+            self.log_rate_budget()
+            return all_posts
+        
         except Exception as e:
             logger.error(f"Error in get_all_posts: {e}")
             return [] 
\ No newline at end of file
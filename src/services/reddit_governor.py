@@ -0,0 +1,31 @@
+"""prawcore requestor that paces Reddit API requests against the budget shared across processes."""
+import logging
+import time
+from typing import Any
+
+import prawcore
+
+from src.utils.ratelimit import SharedRateBudget, is_reddit_api_request
+
+logger = logging.getLogger(__name__)
+
+class GovernedRequestor(prawcore.Requestor):
+    """prawcore requestor that waits for a slot in the shared Reddit budget before each API request."""
+    
+    def __init__(self, *, budget: SharedRateBudget, **kwargs: Any):
+        """Initialize the requestor, taking the rest of its arguments from praw."""
+        super().__init__(**kwargs)
+        self.budget = budget
+    
+    def request(self, *args: Any, **kwargs: Any):
+        """Issue the request once the budget has a slot for it, and record its rate limit headers."""
+        governed = is_reddit_api_request(self.oauth_url, args, kwargs)
+        if governed:
+            delay = self.budget.reserve()
+            if delay > 0:
+                time.sleep(delay)
+        
+        response = super().request(*args, **kwargs)
+        if governed:
+            self.budget.update(response.headers)
+        return response
@@ -0,0 +1,112 @@
+"""In-process cache of seen post IDs layered over the dedup store."""
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List
+
+from src.utils.cache import LRUCache
+from src.utils.env import load_env
+from src.utils.steps import Steps, run_steps, run_steps_async
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Seen post IDs remembered per subreddit collection
+DEFAULT_SEEN_CACHE_SIZE = 1000
+
+class SeenCache:
+    """Answer "already seen" for recently seen post IDs from memory, sending only misses to the store.
+    
+    Keeps one LRU of post IDs per collection. An ID is cached once the
+    store has recorded it as seen, whether this process claimed it or an
+    earlier run did, so repeat polls of the same listing stop hitting the
+    database. Every other store method is passed through unchanged.
+    
+    Over an awaitable store, pass asynchronous=True and await the cached
+    methods as well.
+    """
+    
+    def __init__(self, store: Any, size: int = None, asynchronous: bool = False):
+        """Wrap a dedup store, holding up to SEEN_CACHE_SIZE IDs per collection."""
+        self.store = store
+        self.size = size or int(os.getenv('SEEN_CACHE_SIZE', DEFAULT_SEEN_CACHE_SIZE))
+        self._caches: Dict[str, LRUCache] = {}
+        self._lock = threading.Lock()
+        self._run = run_steps_async if asynchronous else run_steps
+    
+    def __getattr__(self, name: str) -> Any:
+        """Pass everything that isn't cached through to the store."""
+        return getattr(self.store, name)
+    
+    def cache_for(self, collection_name: str) -> LRUCache:
+        """Get the LRU of a collection, creating it on first use."""
+        cache = self._caches.get(collection_name)
+        if cache is None:
+            with self._lock:
+                cache = self._caches.setdefault(collection_name, LRUCache(self.size))
+        return cache
+    
+    def _misses(self, post_ids: Iterable[str], collection_name: str) -> List[str]:
+        """Get the post IDs that are not cached as seen, in order and without duplicates."""
+        cache = self.cache_for(collection_name)
+        return [post_id for post_id in dict.fromkeys(post_ids) if cache.get(post_id) is None]
+    
+    def warm(self, collection_names: Iterable[str]) -> None:
+        """Load the most recently seen IDs of each collection from the store."""
+        return self._run(self._warm(collection_names))
+    
+    def _warm(self, collection_names: Iterable[str]) -> Steps[None]:
+        """Steps of warm, yielding each store call."""
+        for collection_name in collection_names:
+            cache = self.cache_for(collection_name)
+            # Oldest first, so the newest IDs end up most recently used
+            for post_id in reversed((yield self.store.recent_post_ids(collection_name, self.size))):
+                cache.put(post_id)
+            logger.debug(f"Warmed seen cache of {collection_name} with {len(cache)} post IDs")
+    
+    def claim_posts(self, post_ids: Iterable[str], collection_name: str) -> List[str]:
+        """Claim the post IDs that are not cached as seen; cached IDs are never claimable."""
+        return self._run(self._claim_posts(post_ids, collection_name))
+    
+    def _claim_posts(self, post_ids: Iterable[str], collection_name: str) -> Steps[List[str]]:
+        """Steps of claim_posts, yielding each store call."""
+        misses = self._misses(post_ids, collection_name)
+        if not misses:
+            return []
+        claimed = yield self.store.claim_posts(misses, collection_name)
+        
+        # Claimed or not, every miss is now recorded in the store as seen
+        cache = self.cache_for(collection_name)
+        for post_id in misses:
+            cache.put(post_id)
+        return claimed
+    
+    def filter_unseen(self, post_ids: List[str], collection_name: str) -> List[str]:
+        """Return the post IDs not yet seen, checking only cache misses against the store."""
+        return self._run(self._filter_unseen(post_ids, collection_name))
+    
+    def _filter_unseen(self, post_ids: List[str], collection_name: str) -> Steps[List[str]]:
+        """Steps of filter_unseen, yielding each store call."""
+        misses = self._misses(post_ids, collection_name)
+        if not misses:
+            return []
+        unseen = yield self.store.filter_unseen(misses, collection_name)
+        
+        # IDs the store already has are seen for good
+        cache = self.cache_for(collection_name)
+        for post_id in set(misses) - set(unseen):
+            cache.put(post_id)
+        return unseen
+    
+    def mark_seen_many(self, post_ids: List[str], collection_name: str) -> None:
+        """Mark post IDs as seen in the store and the cache."""
+        return self._run(self._mark_seen_many(post_ids, collection_name))
+    
+    def _mark_seen_many(self, post_ids: List[str], collection_name: str) -> Steps[None]:
+        """Steps of mark_seen_many, yielding each store call."""
+        yield self.store.mark_seen_many(post_ids, collection_name)
+        cache = self.cache_for(collection_name)
+        for post_id in post_ids:
+            cache.put(post_id)
@@ -0,0 +1,374 @@
+"""SQLite service for deduplicating Reddit posts in a local file."""
+import json
+import sqlite3
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any
+from uuid import uuid4
+
+from src.services.outbox import OutboxService, PENDING, INFLIGHT, DONE, DEAD
+from src.services.store import DEFAULT_SEEN_TTL_DAYS
+from src.utils.env import load_env
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Database file used when SQLITE_PATH is not set
+DEFAULT_SQLITE_PATH = "reddit_bot.db"
+
+# Seconds between deletions of expired seen post IDs
+PURGE_INTERVAL_SECONDS = 3600
+
+# Post IDs per query, below SQLite's bound parameter limit
+QUERY_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seen_by_age ON seen (collection, seen_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    subreddit TEXT PRIMARY KEY,
+    fullname TEXT NOT NULL,
+    created_utc REAL NOT NULL,
+    checked_utc REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    sink TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    post TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    lease TEXT,
+    last_error TEXT,
+    done_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (sink, state, next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_by_lease ON outbox (lease);
+"""
+
+# Columns of an outbox row, in the order they are selected
+OUTBOX_COLUMNS = ("id", "sink", "post_id", "post", "state", "attempts", "next_attempt_at", "lease")
+
+class SQLiteService:
+    """Dedup store with the operations of MongoDBService, kept in a local SQLite file.
+    
+    The database runs in WAL mode, so readers never wait on the writer and
+    several processes can share the file. Each claim is one immediate
+    transaction, so overlapping runs never both claim the same post.
+    Collections are a column of one table rather than separate tables, and
+    seen IDs older than SEEN_TTL_DAYS are purged periodically, like
+    MongoDB's TTL index does.
+    """
+    
+    def __init__(self, path=None):
+        """Open or create the database at `path`, or SQLITE_PATH."""
+        self.path = path or os.environ.get("SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        self.seen_ttl_seconds = int(float(os.environ.get("SEEN_TTL_DAYS", DEFAULT_SEEN_TTL_DAYS)) * 86400)
+        self._lock = threading.Lock()
+        self.connection = self._create_connection()
+        self._last_purge = 0.0
+        self.purge_expired()
+    
+    def _create_connection(self):
+        """Create the SQLite connection and schema."""
+        try:
+            # Autocommit mode, transactions are opened explicitly
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            logger.info(f"Opened SQLite dedup store at {self.path}")
+            return connection
+        except Exception as e:
+            logger.error(f"Failed to open SQLite database {self.path}: {e}")
+            raise
+    
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self.connection.close()
+    
+    def purge_expired(self):
+        """Delete seen post IDs older than SEEN_TTL_DAYS."""
+        cutoff = time.time() - self.seen_ttl_seconds
+        with self._lock:
+            deleted = self.connection.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,)).rowcount
+        self._last_purge = time.time()
+        if deleted:
+            logger.info(f"Purged {deleted} expired post IDs")
+    
+    def _purge_if_due(self):
+        """Purge expired IDs if the last purge was long enough ago."""
+        if time.time() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+    
+    def _seen_ids(self, post_ids, collection_name):
+        """Get the subset of post IDs stored in a collection."""
+        seen = set()
+        with self._lock:
+            for start in range(0, len(post_ids), QUERY_CHUNK_SIZE):
+                chunk = post_ids[start:start + QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.connection.execute(
+                    f"SELECT id FROM seen WHERE collection = ? AND id IN ({placeholders})",
+                    (collection_name, *chunk)
+                )
+                seen.update(row[0] for row in rows)
+        return seen
+    
+    def insert_post(self, post_id, collection_name):
+        """Insert a post ID into a collection."""
+        self.mark_seen_many([post_id], collection_name)
+    
+    def check_post_exists(self, post_id, collection_name):
+        """Check if a post ID exists in a collection."""
+        try:
+            return bool(self._seen_ids([post_id], collection_name))
+        except Exception as e:
+            logger.error(f"Failed to check post {post_id}: {e}")
+            raise
+    
+    def filter_unseen(self, post_ids, collection_name):
+        """Return the post IDs not yet stored in a collection, in their original order."""
+        if not post_ids:
+            return []
+        try:
+            seen = self._seen_ids(list(post_ids), collection_name)
+            return [post_id for post_id in post_ids if post_id not in seen]
+        except Exception as e:
+            logger.error(f"Failed to check posts in collection {collection_name}: {e}")
+            raise
+    
+    def mark_seen_many(self, post_ids, collection_name):
+        """Insert many post IDs into a collection, ignoring IDs already stored."""
+        if post_ids:
+            self.claim_posts(post_ids, collection_name)
+    
+    def claim_posts(self, post_ids, collection_name):
+        """Atomically mark post IDs as seen and return only the ones this call claimed."""
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return []
+        self._purge_if_due()
+        seen_at = time.time()
+        claimed = []
+        try:
+            with self._lock:
+                self.connection.execute("BEGIN IMMEDIATE")
+                try:
+                    for post_id in post_ids:
+                        cursor = self.connection.execute(
+                            "INSERT OR IGNORE INTO seen (collection, id, seen_at) VALUES (?, ?, ?)",
+                            (collection_name, post_id, seen_at)
+                        )
+                        if cursor.rowcount:
+                            claimed.append(post_id)
+                    self.connection.execute("COMMIT")
+                except Exception:
+                    self.connection.execute("ROLLBACK")
+                    raise
+            logger.debug(f"Claimed {len(claimed)} of {len(post_ids)} post IDs in collection {collection_name}")
+            return claimed
+        except Exception as e:
+            logger.error(f"Failed to claim posts in collection {collection_name}: {e}")
+            raise
+    
+    def recent_post_ids(self, collection_name, limit):
+        """Get the most recently seen post IDs of a collection, newest first."""
+        try:
+            with self._lock:
+                rows = self.connection.execute(
+                    "SELECT id FROM seen WHERE collection = ? ORDER BY seen_at DESC LIMIT ?",
+                    (collection_name, limit)
+                ).fetchall()
+            return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to read recent posts of collection {collection_name}: {e}")
+            raise
+    
+    def get_checkpoint(self, subreddit_name):
+        """Get the last seen post fullname and created_utc for a subreddit, or None."""
+        try:
+            with self._lock:
+                row = self.connection.execute(
+                    "SELECT fullname, created_utc, checked_utc FROM checkpoints WHERE subreddit = ?",
+                    (subreddit_name,)
+                ).fetchone()
+            if row is None:
+                return None
+            return {"subreddit": subreddit_name, "fullname": row[0], "created_utc": row[1], "checked_utc": row[2]}
+        except Exception as e:
+            logger.error(f"Failed to read checkpoint for r/{subreddit_name}: {e}")
+            raise
+    
+    def set_checkpoint(self, subreddit_name, fullname, created_utc):
+        """Store the newest fetched post of a subreddit as its checkpoint."""
+        try:
+            with self._lock:
+                self.connection.execute(
+                    "INSERT INTO checkpoints (subreddit, fullname, created_utc, checked_utc) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (subreddit) DO UPDATE SET fullname = excluded.fullname, "
+                    "created_utc = excluded.created_utc, checked_utc = excluded.checked_utc",
+                    (subreddit_name, fullname, created_utc, datetime.now(timezone.utc).timestamp())
+                )
+            logger.debug(f"Checkpoint for r/{subreddit_name} set to {fullname}")
+        except Exception as e:
+            logger.error(f"Failed to store checkpoint for r/{subreddit_name}: {e}")
+            raise
+
+class SQLiteOutboxService(OutboxService):
+    """Outbox with the operations of OutboxService, kept in the SQLite dedup file.
+    
+    Items live in a table of the dedup store's database and share its
+    connection. A claim is one immediate transaction, so overlapping runs
+    never lease the same item, and delivered items older than
+    OUTBOX_DONE_TTL_DAYS are purged periodically.
+    """
+    
+    def __init__(self, store: SQLiteService):
+        """Initialize the outbox on the database of a SQLite dedup store."""
+        self.store = store
+        self._load_settings()
+        self._last_purge = 0.0
+        self.ensure_indexes()
+    
+    def ensure_indexes(self):
+        """Purge expired delivered items, the table and its indexes are part of the store's schema."""
+        self.purge_done()
+    
+    def purge_done(self):
+        """Delete delivered items older than OUTBOX_DONE_TTL_DAYS."""
+        cutoff = time.time() - self.done_ttl_seconds
+        with self.store._lock:
+            deleted = self.store.connection.execute(
+                "DELETE FROM outbox WHERE state = ? AND done_at < ?", (DONE, cutoff)
+            ).rowcount
+        self._last_purge = time.time()
+        if deleted:
+            logger.info(f"Purged {deleted} delivered outbox items")
+    
+    def enqueue(self, sink, posts):
+        """Add posts to a sink's queue. Posts already queued for the sink are left untouched."""
+        if not posts:
+            return
+        now = time.time()
+        rows = [
+            (self._item_id(sink, post["id"]), sink, post["id"], json.dumps(dict(post)), PENDING, now, now)
+            for post in posts
+        ]
+        try:
+            with self.store._lock:
+                self.store.connection.executemany(
+                    "INSERT OR IGNORE INTO outbox (id, sink, post_id, post, state, attempts, next_attempt_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                    rows
+                )
+            logger.debug(f"Enqueued {len(posts)} posts for {sink}")
+        except Exception as e:
+            logger.error(f"Failed to enqueue posts for {sink}: {e}")
+            raise
+    
+    def claim(self, sink, limit=None):
+        """Lease up to `limit` due items of a sink and return them, oldest first."""
+        if time.time() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self.purge_done()
+        limit = limit or self.batch_size
+        now = time.time()
+        lease = uuid4().hex
+        try:
+            with self.store._lock:
+                self.store.connection.execute("BEGIN IMMEDIATE")
+                try:
+                    self.store.connection.execute(
+                        "UPDATE outbox SET state = ?, lease = ?, next_attempt_at = ?, attempts = attempts + 1 "
+                        "WHERE id IN (SELECT id FROM outbox WHERE sink = ? AND state IN (?, ?) AND next_attempt_at <= ? "
+                        "ORDER BY next_attempt_at LIMIT ?)",
+                        (INFLIGHT, lease, now + self.lease_seconds, sink, PENDING, INFLIGHT, now, limit)
+                    )
+                    rows = self.store.connection.execute(
+                        f"SELECT {', '.join(OUTBOX_COLUMNS)} FROM outbox WHERE lease = ? ORDER BY created_at",
+                        (lease,)
+                    ).fetchall()
+                    self.store.connection.execute("COMMIT")
+                except Exception:
+                    self.store.connection.execute("ROLLBACK")
+                    raise
+            return [self._item(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to claim outbox items for {sink}: {e}")
+            raise
+    
+    @staticmethod
+    def _item(row) -> Dict[str, Any]:
+        """Turn an outbox row into an item shaped like the MongoDB outbox documents."""
+        item = dict(zip(OUTBOX_COLUMNS, row))
+        item["_id"] = item.pop("id")
+        item["post"] = json.loads(item["post"])
+        return item
+    
+    def ack(self, sink, items):
+        """Mark claimed items of a sink that were delivered as done."""
+        if not items:
+            return
+        done_at = time.time()
+        try:
+            with self.store._lock:
+                modified = self.store.connection.executemany(
+                    "UPDATE outbox SET state = ?, done_at = ? WHERE id = ? AND state = ? AND lease = ?",
+                    [(DONE, done_at, item["_id"], INFLIGHT, item["lease"]) for item in items]
+                ).rowcount
+            if modified < len(items):
+                logger.warning(f"{len(items) - modified} outbox items for {sink} were re-claimed before their ack")
+        except Exception as e:
+            logger.error(f"Failed to ack outbox items for {sink}: {e}")
+            raise
+    
+    def nack(self, sink, items, error=None):
+        """Schedule failed claimed items for a retry, or dead-letter them once they are out of attempts."""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for item in items:
+            if item["attempts"] >= self.max_attempts:
+                logger.warning(f"Giving up on post {item['post_id']} for {sink} after {item['attempts']} attempts")
+                rows.append((DEAD, item["next_attempt_at"], error, item["_id"], INFLIGHT, item["lease"]))
+            else:
+                rows.append((PENDING, now + self.backoff(item["attempts"]), error, item["_id"], INFLIGHT, item["lease"]))
+        try:
+            with self.store._lock:
+                self.store.connection.executemany(
+                    "UPDATE outbox SET state = ?, next_attempt_at = ?, last_error = ? WHERE id = ? AND state = ? AND lease = ?",
+                    rows
+                )
+        except Exception as e:
+            logger.error(f"Failed to nack outbox items for {sink}: {e}")
+            raise
+    
+    def requeue_dead(self, sink):
+        """Give every dead-lettered item of a sink a fresh set of attempts. Returns the number requeued."""
+        with self.store._lock:
+            return self.store.connection.execute(
+                "UPDATE outbox SET state = ?, attempts = 0, next_attempt_at = ? WHERE sink = ? AND state = ?",
+                (PENDING, time.time(), sink, DEAD)
+            ).rowcount
+    
+    def counts(self, sink) -> Dict[str, Any]:
+        """Get the number of items of a sink in each state."""
+        with self.store._lock:
+            rows = self.store.connection.execute(
+                "SELECT state, COUNT(*) FROM outbox WHERE sink = ? GROUP BY state", (sink,)
+            ).fetchall()
+        return dict(rows)
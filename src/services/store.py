@@ -0,0 +1,89 @@
+"""Dedup store interface and the factory that picks its backend."""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Protocol
+
+from src.utils.env import load_env
+from src.utils.lazy import lazy_import
+
+# Backends are imported only when selected, so SQLite runs never load pymongo
+async_mongodb = lazy_import("src.services.async_mongodb")
+mongodb = lazy_import("src.services.mongodb")
+sqlite = lazy_import("src.services.sqlite")
+
+# Load environment variables
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Dedup backends selectable with DEDUP_BACKEND
+DEDUP_BACKENDS = ("mongodb", "sqlite")
+
+# How long a seen post ID is remembered before the store expires it
+DEFAULT_SEEN_TTL_DAYS = 30
+
+class DedupStore(Protocol):
+    """Operations the Reddit services need from a store of seen post IDs and checkpoints.
+    
+    The stores of create_async_store() offer the same methods as coroutines.
+    """
+    
+    def claim_posts(self, post_ids: List[str], collection_name: str) -> List[str]:
+        """Atomically mark post IDs as seen and return only the ones this call claimed."""
+    
+    def filter_unseen(self, post_ids: List[str], collection_name: str) -> List[str]:
+        """Return the post IDs not yet stored in a collection, in their original order."""
+    
+    def mark_seen_many(self, post_ids: List[str], collection_name: str) -> None:
+        """Insert many post IDs into a collection."""
+    
+    def insert_post(self, post_id: str, collection_name: str) -> None:
+        """Insert a post ID into a collection."""
+    
+    def check_post_exists(self, post_id: str, collection_name: str) -> bool:
+        """Check if a post ID exists in a collection."""
+    
+    def recent_post_ids(self, collection_name: str, limit: int) -> List[str]:
+        """Get the most recently seen post IDs of a collection, newest first."""
+    
+    def get_checkpoint(self, subreddit_name: str) -> Optional[Dict[str, Any]]:
+        """Get the last seen post fullname and created_utc for a subreddit, or None."""
+    
+    def set_checkpoint(self, subreddit_name: str, fullname: str, created_utc: float) -> None:
+        """Store the newest fetched post of a subreddit as its checkpoint."""
+
+def get_backend() -> str:
+    """Get the configured dedup backend, validating DEDUP_BACKEND."""
+    backend = os.getenv('DEDUP_BACKEND', 'mongodb').strip().lower()
+    if backend not in DEDUP_BACKENDS:
+        raise ValueError(f"Unknown DEDUP_BACKEND '{backend}', expected one of {', '.join(DEDUP_BACKENDS)}")
+    return backend
+
+def create_store() -> DedupStore:
+    """Create the dedup store selected by DEDUP_BACKEND (mongodb by default)."""
+    if get_backend() == 'sqlite':
+        return sqlite.SQLiteService()
+    return mongodb.MongoDBService()
+
+class ThreadedStore:
+    """Awaitable wrapper running a blocking dedup store's methods on a worker thread."""
+    
+    def __init__(self, store: DedupStore):
+        """Wrap a blocking dedup store."""
+        self.store = store
+    
+    def __getattr__(self, name: str) -> Any:
+        """Get a coroutine function calling the store method in a thread."""
+        method = getattr(self.store, name)
+        
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+        
+        return call
+
+def create_async_store():
+    """Create the awaitable dedup store selected by DEDUP_BACKEND for the asyncio services."""
+    if get_backend() == 'sqlite':
+        return ThreadedStore(sqlite.SQLiteService())
+    return async_mongodb.AsyncMongoDBService()
@@ -0,0 +1,11 @@
+"""Loading of the .env file shared by every module."""
+from dotenv import load_dotenv
+
+_loaded = False
+
+def load_env() -> None:
+    """Load the .env file into the environment, once per process."""
+    global _loaded
+    if not _loaded:
+        load_dotenv()
+        _loaded = True
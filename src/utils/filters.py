@@ -0,0 +1,152 @@
+"""Post filter rules compiled once into predicates over flair, title and selftext."""
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keys of a condition rule and of the boolean combinations
+CONDITION_KEYS = ("flairs", "flair_prefixes", "flair_regex", "title_regex", "selftext_regex", "keywords")
+COMBINATION_KEYS = ("any", "all", "not")
+
+# The casefolded flair, the title and the selftext of a post, extracted once per post
+Fields = Tuple[str, str, str]
+Predicate = Callable[[Fields], bool]
+
+def _casefold(value: Any) -> str:
+    """Normalise a flair for exact and prefix matching."""
+    return str(value).strip().casefold() if value is not None else ""
+
+def _as_list(value: Any) -> List[str]:
+    """Accept a single pattern or a list of them."""
+    return [value] if isinstance(value, str) else list(value)
+
+def _alternation(patterns: Iterable[str]) -> "re.Pattern[str]":
+    """Compile patterns into one case-insensitive regex that matches if any of them does."""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+def _is_word_char(char: str) -> bool:
+    """Check whether a character is part of a word, like \\w in a regex."""
+    return char.isalnum() or char == "_"
+
+def _contains_word(pattern: "re.Pattern[str]", text: str) -> bool:
+    """Check whether a literal pattern occurs in the text as a whole word.
+    
+    Word boundaries are checked on the few candidate matches instead of
+    with lookarounds, which would keep the regex engine from scanning
+    for the literals quickly.
+    """
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if not (start and _is_word_char(text[start - 1])) and not (end < len(text) and _is_word_char(text[end])):
+            return True
+    return False
+
+def _match_all(fields: Fields) -> bool:
+    """Match every post."""
+    return True
+
+class FilterEngine:
+    """Per-subreddit post filters, compiled when loaded.
+    
+    A rule is either a condition or a boolean combination of rules:
+        
+        {"flairs": ["Help"], "title_regex": "^\\[release\\]"}   all keys must match
+        {"any": [rule, ...]}, {"all": [rule, ...]}, {"not": rule}
+    
+    Exact flairs become a set lookup and flair prefixes a single
+    startswith call. All patterns of one key are compiled into one
+    alternation, so each condition costs at most one regex search per
+    field. All matching ignores case. Subreddits without a rule of their
+    own use the default rule, and a missing rule keeps every post.
+    """
+    
+    def __init__(self, default: Optional[Dict[str, Any]] = None, subreddits: Optional[Dict[str, Any]] = None):
+        """Compile the default rule and the per-subreddit rules."""
+        self._default = self.compile(default)
+        self._rules: Dict[str, Predicate] = {
+            _casefold(name): self.compile(rule) for name, rule in (subreddits or {}).items()
+        }
+        logger.info(f"Compiled post filters for {len(self._rules)} subreddits")
+    
+    @classmethod
+    def from_file(cls, path: str) -> "FilterEngine":
+        """Load filter rules from a JSON file with a "default" rule and a "subreddits" mapping."""
+        with open(path, encoding="utf-8") as config_file:
+            config = json.load(config_file)
+        return cls(config.get("default"), config.get("subreddits"))
+    
+    @classmethod
+    def from_flairs(cls, flairs: str) -> "FilterEngine":
+        """Create the filter from a comma separated flair list, keeping every post if it is empty."""
+        names = [name.strip() for name in flairs.split(",") if name.strip()]
+        return cls({"flairs": names} if names else None)
+    
+    @classmethod
+    def compile(cls, rule: Optional[Dict[str, Any]]) -> Predicate:
+        """Compile a rule into a predicate over post fields."""
+        if not rule:
+            return _match_all
+        if not isinstance(rule, dict):
+            raise ValueError(f"Filter rule must be an object, got {rule!r}")
+        
+        unknown = set(rule) - set(CONDITION_KEYS) - set(COMBINATION_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown filter rule keys: {', '.join(sorted(unknown))}")
+        
+        predicates = [cls._compile_condition(key, rule[key]) for key in CONDITION_KEYS if key in rule]
+        if "any" in rule:
+            options = [cls.compile(option) for option in rule["any"]]
+            predicates.append(lambda fields: any(option(fields) for option in options))
+        if "all" in rule:
+            predicates.extend(cls.compile(option) for option in rule["all"])
+        if "not" in rule:
+            negated = cls.compile(rule["not"])
+            predicates.append(lambda fields: not negated(fields))
+        
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda fields: all(predicate(fields) for predicate in predicates)
+    
+    @staticmethod
+    def _compile_condition(key: str, value: Any) -> Predicate:
+        """Compile one condition of a rule."""
+        if key == "flairs":
+            flairs = frozenset(_casefold(flair) for flair in _as_list(value))
+            return lambda fields: fields[0] in flairs
+        if key == "flair_prefixes":
+            prefixes = tuple(_casefold(prefix) for prefix in _as_list(value))
+            return lambda fields: fields[0].startswith(prefixes)
+        if key == "keywords":
+            # Longest first, so a keyword isn't hidden by a shorter one it starts with
+            keywords = sorted({_casefold(word) for word in _as_list(value)}, key=len, reverse=True)
+            words = re.compile("|".join(re.escape(word) for word in keywords))
+            return lambda fields: _contains_word(words, fields[1].casefold()) or _contains_word(words, fields[2].casefold())
+        
+        field = {"flair_regex": 0, "title_regex": 1, "selftext_regex": 2}[key]
+        try:
+            pattern = _alternation(_as_list(value))
+        except re.error as e:
+            raise ValueError(f"Invalid {key} {value!r}: {e}") from e
+        return lambda fields: pattern.search(fields[field]) is not None
+    
+    @staticmethod
+    def fields(submission: Any) -> Fields:
+        """Extract the matched fields of a submission."""
+        return (
+            _casefold(submission.link_flair_text),
+            submission.title or "",
+            submission.selftext or ""
+        )
+    
+    def rule_for(self, subreddit_name: str) -> Predicate:
+        """Get the compiled rule of a subreddit."""
+        return self._rules.get(_casefold(subreddit_name), self._default)
+    
+    def filter(self, submissions: Iterable[Any], subreddit_name: str) -> List[Any]:
+        """Keep the submissions that match the subreddit's rule."""
+        rule = self.rule_for(subreddit_name)
+        if rule is _match_all:
+            return list(submissions)
+        return [submission for submission in submissions if rule(self.fields(submission))]
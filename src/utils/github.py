@@ -4,10 +4,11 @@ import os
 import base64
 import logging
 from nacl import encoding, public
-from dotenv import load_dotenv
+
+from src.utils.env import load_env
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
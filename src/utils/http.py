@@ -0,0 +1,28 @@
+"""HTTP session shared by the webhook sinks."""
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Kept-alive connections per host in the shared HTTP session
+HTTP_POOL_SIZE = 10
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    """Get the HTTP session shared by every webhook sink in the process.
+    
+    The session keeps connections to discord.com and other webhook hosts
+    alive, so webhook calls after the first skip the TCP and TLS handshakes.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
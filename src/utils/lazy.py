@@ -0,0 +1,39 @@
+"""Deferred imports of heavy modules."""
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+class LazyModule:
+    """Stand-in for a module that is only imported when one of its attributes is first used.
+    
+    Attributes are looked up on the real module every time, so patching
+    the module itself still takes effect.
+    """
+    
+    def __init__(self, name: str):
+        """Remember the module to import."""
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+    
+    def _load(self) -> ModuleType:
+        """Import the module on first use."""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+    
+    def __getattr__(self, attribute: str) -> Any:
+        """Get an attribute of the imported module."""
+        return getattr(self._load(), attribute)
+    
+    def __repr__(self) -> str:
+        """Show the module name and whether it has been imported."""
+        state = "imported" if self._module is not None else "not imported"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name: str) -> LazyModule:
+    """Get a module that is imported on first attribute access."""
+    return LazyModule(name)
@@ -0,0 +1,260 @@
+"""Rate limiters that pace requests to the APIs the bots talk to."""
+import asyncio
+from contextlib import contextmanager
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # No flock on Windows, the Reddit budget is then only shared within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Delay used when Discord rate limits a request without saying for how long
+DEFAULT_RETRY_AFTER = 1.0
+
+# Reddit's OAuth budget until a response reports it: 1000 requests per 10 minute window
+DEFAULT_REDDIT_BUDGET = 1000
+DEFAULT_REDDIT_WINDOW_SECONDS = 600
+
+# Reddit requests sent back to back before the shared budget starts spacing them out
+DEFAULT_REDDIT_BURST = 10
+
+# Seconds two reset times may differ by and still belong to the same window (Reddit rounds the header)
+RESET_TOLERANCE = 2.0
+
+# Shared budget state file layout: requests remaining, window reset time, next even slot
+_BUDGET_STATE = struct.Struct("<3d")
+
+def _header_float(headers: Any, name: str) -> Optional[float]:
+    """Read a numeric header, returning None if it is missing or malformed."""
+    try:
+        value = headers.get(name)
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class WebhookRateLimiter:
+    """Schedule Discord webhook requests from the rate limit headers of previous responses.
+    
+    Requests go out immediately while the bucket has requests remaining.
+    Once X-RateLimit-Remaining reaches 0, the next request waits for
+    X-RateLimit-Reset-After. A 429 pushes the next request back by its
+    retry_after.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """Initialize the limiter with an injectable clock for testing."""
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+    
+    def wait(self) -> float:
+        """Block until the next request is allowed. Returns the time slept."""
+        with self._lock:
+            delay = self._next_request_at - self._clock()
+        if delay > 0:
+            logger.debug(f"Waiting {delay:.2f}s for the Discord rate limit to reset")
+            self._sleep(delay)
+            return delay
+        return 0.0
+    
+    def _retry_after(self, response: Any) -> float:
+        """Get the delay requested by a 429 response, in seconds."""
+        try:
+            retry_after = float(response.json().get("retry_after"))
+        except Exception:
+            retry_after = _header_float(response.headers, "Retry-After")
+            if retry_after is None:
+                retry_after = _header_float(response.headers, "X-RateLimit-Reset-After")
+        return retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+    
+    def update(self, response: Any) -> Optional[float]:
+        """Record the rate limit state of a response.
+        
+        Returns the retry delay if the request was rate limited, None otherwise.
+        """
+        now = self._clock()
+        
+        if response.status_code == 429:
+            retry_after = self._retry_after(response)
+            with self._lock:
+                self._next_request_at = max(self._next_request_at, now + retry_after)
+            return retry_after
+        
+        remaining = _header_float(response.headers, "X-RateLimit-Remaining")
+        reset_after = _header_float(response.headers, "X-RateLimit-Reset-After")
+        if remaining is not None and reset_after is not None and remaining <= 0:
+            with self._lock:
+                self._next_request_at = max(self._next_request_at, now + reset_after)
+        return None
+
+
+class AsyncTokenBucket:
+    """Token bucket for asyncio code: `rate` requests per second with bursts of up to `capacity`.
+    
+    Each acquire reserves a token up front, so concurrent callers queue
+    behind each other without a lock and are released at the bucket's
+    rate in FIFO order.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        """Initialize a full bucket with an injectable clock for testing."""
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, float(capacity))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated_at = clock()
+    
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    async def acquire(self) -> float:
+        """Wait for a token. Returns the time waited."""
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        
+        # A negative balance is the queue of callers ahead of us
+        delay = -self._tokens / self.rate
+        await self._sleep(delay)
+        return delay
+    
+    def pause(self, seconds: float) -> None:
+        """Hold back new acquisitions for `seconds`, e.g. after the server asked us to retry later."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+def is_reddit_api_request(oauth_url: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> bool:
+    """Check if a prawcore request goes to the OAuth API, the only requests counted against the budget."""
+    url = args[1] if len(args) > 1 else kwargs.get('url', '')
+    return str(url).startswith(oauth_url)
+
+class SharedRateBudget:
+    """Reddit API request budget shared by every process on the host through a locked state file.
+    
+    praw tracks the X-Ratelimit headers per client, so bots running side
+    by side each believe they have the whole budget. Here every request
+    first reserves a slot in the shared state: the remaining requests are
+    spread evenly over the time left in the window, letting up to `burst`
+    requests through back to back. The remaining/reset headers of each
+    response then correct the shared state.
+    """
+    
+    def __init__(self, path: str, budget: float = DEFAULT_REDDIT_BUDGET,
+                 window_seconds: float = DEFAULT_REDDIT_WINDOW_SECONDS, burst: int = DEFAULT_REDDIT_BURST,
+                 clock: Callable[[], float] = time.time):
+        """Open the state file at `path`, with an injectable wall clock for testing."""
+        self.path = path
+        self.budget = float(budget)
+        self.window_seconds = float(window_seconds)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    
+    @classmethod
+    def from_env(cls, client_id: str) -> "SharedRateBudget":
+        """Create the budget of a Reddit app, kept in REDDIT_RATE_STATE_DIR (the temp directory by default)."""
+        # Reddit's budget is per app, so processes using the same client ID share one file
+        digest = hashlib.sha256(client_id.encode()).hexdigest()[:16]
+        state_dir = os.getenv('REDDIT_RATE_STATE_DIR') or tempfile.gettempdir()
+        return cls(
+            os.path.join(state_dir, f"reddit_bot_ratelimit_{digest}.bin"),
+            budget=float(os.getenv('REDDIT_RATE_BUDGET', DEFAULT_REDDIT_BUDGET)),
+            window_seconds=float(os.getenv('REDDIT_RATE_WINDOW_SECONDS', DEFAULT_REDDIT_WINDOW_SECONDS)),
+            burst=int(os.getenv('REDDIT_RATE_BURST', DEFAULT_REDDIT_BURST))
+        )
+    
+    @contextmanager
+    def _state(self, now: float) -> Iterator[List[float]]:
+        """Lock the shared state and yield it as [remaining, reset_at, next_slot], writing it back on exit."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                data = os.read(self._fd, _BUDGET_STATE.size)
+                state = list(_BUDGET_STATE.unpack(data)) if len(data) == _BUDGET_STATE.size else [0.0, 0.0, 0.0]
+                if now >= state[1]:
+                    # The window has reset, or no process has used the budget yet
+                    state[0] = self.budget
+                    state[1] = now + self.window_seconds
+                yield state
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, _BUDGET_STATE.pack(*state))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+    
+    def reserve(self) -> float:
+        """Take a request from the budget. Returns the seconds to wait before sending it."""
+        now = self._clock()
+        with self._state(now) as state:
+            remaining, reset_at, next_slot = state
+            if remaining >= 1:
+                interval = (reset_at - now) / remaining
+                send_at = max(now, next_slot - (self.burst - 1) * interval)
+                state[2] = max(next_slot, now) + interval
+            else:
+                # Out of requests, wait for the window to reset
+                send_at = max(reset_at, next_slot)
+                state[2] = send_at + self.window_seconds / self.budget
+            state[0] = remaining - 1
+        
+        delay = send_at - now
+        if delay > 0:
+            logger.debug(f"Waiting {delay:.2f}s for a slot in the shared Reddit budget")
+        return max(0.0, delay)
+    
+    def update(self, headers: Any) -> None:
+        """Correct the shared budget from the X-Ratelimit-Remaining and X-Ratelimit-Reset headers of a response."""
+        remaining = _header_float(headers, "X-Ratelimit-Remaining")
+        reset_after = _header_float(headers, "X-Ratelimit-Reset")
+        if remaining is None or reset_after is None:
+            return
+        
+        now = self._clock()
+        with self._state(now) as state:
+            reset_at = now + reset_after
+            if abs(reset_at - state[1]) <= RESET_TOLERANCE:
+                # Same window, requests still in flight are only subtracted from our count
+                state[0] = min(state[0], remaining)
+            else:
+                state[0] = remaining
+                state[1] = reset_at
+        logger.debug(f"Reddit budget: {remaining:.0f} requests remaining, resets in {reset_after:.0f}s")
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Get the current budget as metrics: requests remaining, seconds to the reset, and seconds between requests."""
+        now = self._clock()
+        with self._state(now) as state:
+            remaining, reset_at, _ = state
+        reset_in = max(0.0, reset_at - now)
+        return {
+            "remaining": max(0.0, remaining),
+            "reset_in": reset_in,
+            "interval": reset_in / max(remaining, 1.0)
+        }
+    
+    def close(self) -> None:
+        """Close the state file."""
+        os.close(self._fd)
@@ -0,0 +1,62 @@
+"""Routing table that maps subreddits and flairs to delivery destinations."""
+import json
+import logging
+from typing import Dict, Any, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Matches any subreddit or any flair in a route
+WILDCARD = "*"
+
+# Destination types the pipeline knows how to build
+DESTINATION_TYPES = ("discord", "telegram", "webhook")
+
+class RoutingTable:
+    """Compiled routes from (subreddit, flair) to sets of destination names.
+    
+    Routes are expanded at load time into a dict keyed by the casefolded
+    (subreddit, flair) pair, with "*" as the wildcard. Matching a post is
+    four dict lookups, independent of the number of routes.
+    """
+    
+    def __init__(self, destinations: Dict[str, Dict[str, Any]], routes: List[Dict[str, Any]]):
+        """Validate the destinations and compile the routes into the lookup index."""
+        for name, destination in destinations.items():
+            if destination.get("type") not in DESTINATION_TYPES:
+                raise ValueError(f"Destination {name} has unknown type {destination.get('type')!r}")
+        self.destinations = destinations
+        self._index: Dict[Tuple[str, str], Set[str]] = {}
+        
+        for route in routes:
+            targets = route.get("destinations", [])
+            unknown = [target for target in targets if target not in destinations]
+            if unknown:
+                raise ValueError(f"Route refers to unknown destinations: {', '.join(unknown)}")
+            
+            for subreddit in route.get("subreddits") or [WILDCARD]:
+                for flair in route.get("flairs") or [WILDCARD]:
+                    key = (self._key(subreddit), self._key(flair))
+                    self._index.setdefault(key, set()).update(targets)
+        
+        logger.info(f"Loaded {len(routes)} routes to {len(destinations)} destinations")
+    
+    @staticmethod
+    def _key(value: Any) -> str:
+        """Normalise a subreddit or flair for lookup."""
+        return str(value).strip().casefold() if value is not None else ""
+    
+    @classmethod
+    def from_file(cls, path: str) -> "RoutingTable":
+        """Load a routing table from a JSON file."""
+        with open(path, encoding="utf-8") as config_file:
+            config = json.load(config_file)
+        return cls(config.get("destinations", {}), config.get("routes", []))
+    
+    def route(self, post: Dict[str, Any]) -> Set[str]:
+        """Get the names of all destinations a post should be delivered to."""
+        subreddit = self._key(post.get("subreddit"))
+        flair = self._key(post.get("flair"))
+        matched = set()
+        for key in ((subreddit, flair), (subreddit, WILDCARD), (WILDCARD, flair), (WILDCARD, WILDCARD)):
+            matched |= self._index.get(key, set())
+        return matched
@@ -0,0 +1,55 @@
+"""Run one implementation of I/O-bound logic both synchronously and on asyncio."""
+from functools import wraps
+from typing import Any, Awaitable, Callable, Generator, TypeVar
+
+T = TypeVar("T")
+
+# A step generator yields each I/O call it makes, is sent back the call's result and returns a T
+Steps = Generator[Any, Any, T]
+
+def run_steps(steps: Steps[T]) -> T:
+    """Run a step generator whose calls are synchronous, so each yield is already the result."""
+    try:
+        result = next(steps)
+        while True:
+            result = steps.send(result)
+    except StopIteration as done:
+        return done.value
+
+async def run_steps_async(steps: Steps[T]) -> T:
+    """Run a step generator whose calls are coroutines, awaiting each yield.
+    
+    An exception raised by an awaited call is thrown back into the
+    generator at the yield, just as if the call had raised there.
+    """
+    try:
+        awaitable = next(steps)
+        while True:
+            try:
+                result = await awaitable
+            except Exception as e:
+                awaitable = steps.throw(e)
+            else:
+                awaitable = steps.send(result)
+    except StopIteration as done:
+        return done.value
+
+def sync_steps(func: Callable[..., Steps[T]]) -> Callable[..., T]:
+    """Turn a step generator function into a plain function that runs it.
+    
+    The decorated function returns what the generator returns, so a
+    function annotated `-> Steps[X]` is called as one returning X.
+    """
+    @wraps(func)
+    def run(*args: Any, **kwargs: Any) -> T:
+        return run_steps(func(*args, **kwargs))
+    return run
+
+def async_steps(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Turn a step generator function, or a sync_steps function, into a coroutine function that runs it."""
+    func = getattr(func, '__wrapped__', func)
+    
+    @wraps(func)
+    async def run(*args: Any, **kwargs: Any) -> Any:
+        return await run_steps_async(func(*args, **kwargs))
+    return run
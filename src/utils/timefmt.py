@@ -0,0 +1,66 @@
+"""Post age formatting against one shared "now" per batch."""
+import logging
+import os
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Timezone of the creation time shown next to a post's age when DISPLAY_TIMEZONE is not set
+DEFAULT_DISPLAY_TIMEZONE = "Asia/Kolkata"
+
+# Shown for posts without a creation time
+UNKNOWN_AGE = "Unknown"
+
+class AgeFormatter:
+    """Formats how long ago posts were created, with the creation time in the display timezone.
+    
+    The timezone is resolved once, when the formatter is created. Posts
+    carry their numeric created_utc and are formatted when they are sent,
+    so a batch is rendered against a single clock reading and the age is
+    accurate however long the post waited in a queue.
+    """
+    
+    def __init__(self, timezone_name: Optional[str] = None):
+        """Resolve the display timezone, or DISPLAY_TIMEZONE if no name is given."""
+        self.timezone_name = timezone_name or os.getenv("DISPLAY_TIMEZONE", DEFAULT_DISPLAY_TIMEZONE)
+        try:
+            self.timezone = ZoneInfo(self.timezone_name)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            raise ValueError(f"Unknown DISPLAY_TIMEZONE '{self.timezone_name}'") from e
+    
+    def format(self, created_utc: float, now: Optional[float] = None) -> str:
+        """Format the age of a post created at a UTC timestamp, as of `now` (the current time by default)."""
+        if now is None:
+            now = time.time()
+        minutes_passed = (now - created_utc) / 60
+        created = datetime.fromtimestamp(created_utc, self.timezone).strftime('%Y/%m/%d-%H:%M')
+        
+        if minutes_passed >= 60:
+            return f"{minutes_passed / 60:.2f} hours (created {created})"
+        return f"{minutes_passed:.2f} minutes (created {created})"
+    
+    def render(self, post: Dict[str, Any], now: Optional[float] = None) -> str:
+        """Format the age of a post dict, falling back to a preformatted posted_ago."""
+        created_utc = post.get('created_utc')
+        if created_utc is None:
+            return post.get('posted_ago', UNKNOWN_AGE)
+        return self.format(created_utc, now)
+    
+    def render_batch(self, posts: Iterable[Dict[str, Any]], now: Optional[float] = None) -> List[str]:
+        """Format the ages of a batch of posts, all against the same `now`."""
+        if now is None:
+            now = time.time()
+        return [self.render(post, now) for post in posts]
+
+@lru_cache(maxsize=None)
+def _formatter_for(timezone_name: str) -> AgeFormatter:
+    """Get the shared formatter of a timezone."""
+    return AgeFormatter(timezone_name)
+
+def get_age_formatter() -> AgeFormatter:
+    """Get the shared formatter for DISPLAY_TIMEZONE, created on first use."""
+    return _formatter_for(os.getenv("DISPLAY_TIMEZONE", DEFAULT_DISPLAY_TIMEZONE))
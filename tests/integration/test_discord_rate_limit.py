@@ -0,0 +1,123 @@
+"""Integration tests for Discord rate limit handling against a local stub webhook server."""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.bots.discord import DiscordBot
+
+# Create more verbose output
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    """Stub Discord webhook that replays a scripted list of responses."""
+    
+    # Keep connections alive between requests like Discord does
+    protocol_version = 'HTTP/1.1'
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        self.server.requests.append((time.monotonic(), payload))
+        self.server.connections.add(self.client_address)
+        
+        status, headers, body = self.server.responses.pop(0)
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass
+
+class TestDiscordRateLimit(unittest.TestCase):
+    """Integration tests for the rate limit aware Discord sender."""
+    
+    def setUp(self):
+        """Start a stub webhook server on a free local port."""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubWebhookHandler)
+        self.server.requests = []
+        self.server.responses = []
+        self.server.connections = set()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        
+        os.environ['DISCORD_WEBHOOK_URL'] = f'http://127.0.0.1:{self.server.server_port}/webhook'
+        self.discord_bot = DiscordBot(reddit_service=MagicMock())
+        
+        logger.info("✓ Stub webhook server started")
+    
+    def tearDown(self):
+        """Stop the stub webhook server."""
+        self.server.shutdown()
+        self.server.server_close()
+        
+        logger.info("✓ Stub webhook server stopped")
+    
+    def test_retry_after_429(self):
+        """Test that a 429 is retried after retry_after and the post is delivered."""
+        self.server.responses = [
+            (429, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '0.2'}, {'retry_after': 0.2, 'global': False}),
+            (200, {'X-RateLimit-Remaining': '4', 'X-RateLimit-Reset-After': '2'}, {'id': '1'})
+        ]
+        
+        delivered = self.discord_bot.send_posts([{'id': 'post1', 'title': 'Post 1', 'subreddit': 'python'}])
+        
+        # Verify the post was delivered on the second attempt, after the requested delay
+        self.assertEqual(delivered, ['post1'])
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertGreaterEqual(self.server.requests[1][0] - self.server.requests[0][0], 0.2)
+        
+        logger.info("✓ Rate limited post retried after retry_after")
+    
+    def test_waits_for_bucket_reset(self):
+        """Test that an exhausted bucket delays the next message until Reset-After."""
+        self.server.responses = [
+            (200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '0.3'}, {'id': '1'}),
+            (200, {'X-RateLimit-Remaining': '4', 'X-RateLimit-Reset-After': '2'}, {'id': '2'})
+        ]
+        
+        # Send one embed per message so the two posts need two requests
+        posts = [{'id': f'post{i}', 'title': f'Post {i}', 'subreddit': 'python'} for i in range(2)]
+        with patch('src.bots.discord.MAX_EMBEDS_PER_MESSAGE', 1):
+            delivered = self.discord_bot.send_posts(posts)
+        
+        # Verify both were delivered and the second waited for the bucket to reset
+        self.assertEqual(delivered, ['post0', 'post1'])
+        self.assertGreaterEqual(self.server.requests[1][0] - self.server.requests[0][0], 0.3)
+        
+        logger.info("✓ Second message waited for the bucket reset")
+    
+    def test_reuses_connection(self):
+        """Test that consecutive messages, even from different bots, reuse one kept-alive connection."""
+        self.server.responses = [
+            (200, {'X-RateLimit-Remaining': '4', 'X-RateLimit-Reset-After': '2'}, {'id': str(i)}) for i in range(3)
+        ]
+        other_bot = DiscordBot(reddit_service=MagicMock())
+        
+        # Send three messages one after the other
+        self.discord_bot.send_posts([{'id': 'post0', 'title': 'Post 0', 'subreddit': 'python'}])
+        self.discord_bot.send_posts([{'id': 'post1', 'title': 'Post 1', 'subreddit': 'python'}])
+        other_bot.send_posts([{'id': 'post2', 'title': 'Post 2', 'subreddit': 'python'}])
+        
+        # Verify all three requests arrived over the same client connection
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(self.server.connections), 1)
+        
+        logger.info("✓ Messages reused one connection")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -74,8 +74,10 @@ class TestRedditIntegration(unittest.TestCase):
             elif sub_name == 'programming':
                 mock_subreddit.new.return_value = self.create_mock_subreddit_posts('programming', 3, ['Discussion', 'Question'])
         
-        # Configure the Reddit client to return the appropriate subreddit
-        self.mock_reddit.subreddit.side_effect = lambda name: self.subreddits.get(name, MagicMock())
+        # Configure the Reddit client to answer each r/<name>/new listing request with that subreddit's posts
+        self.mock_reddit.get.side_effect = lambda path, params=None: (
+            self.subreddits[path.split('/')[1]].new.return_value if path.split('/')[1] in self.subreddits else []
+        )
         
         # Initialize the Reddit service
         self.reddit_service = RedditService()
@@ -130,7 +132,7 @@ class TestRedditIntegration(unittest.TestCase):
         posts = self.reddit_service.get_filtered_posts('python')
         
         # Verify the Reddit API was called
-        self.mock_reddit.subreddit.assert_called_with('python')
+        self.mock_reddit.get.assert_called_with('r/python/new', params={'limit': 20})
         
         # Check the number of posts returned (only those with valid flairs)
         # Python should have 3 posts with valid flairs (Discussion, Help)
@@ -153,7 +155,7 @@ class TestRedditIntegration(unittest.TestCase):
         posts = self.reddit_service.get_filtered_posts('programming')
         
         # Verify the Reddit API was called
-        self.mock_reddit.subreddit.assert_called_with('programming')
+        self.mock_reddit.get.assert_called_with('r/programming/new', params={'limit': 20})
         
         # Check the number of posts returned (only those with valid flairs)
         # Programming should have 1 post with valid flairs (Discussion)
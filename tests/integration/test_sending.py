@@ -39,15 +39,17 @@ class TestSendingIntegration(unittest.TestCase):
     def setup_mocks(self):
         """Set up mock objects for external services."""
         # Create patches for external dependencies
-        self.telegram_bot_patch = patch('src.bots.telegram.Bot')
-        self.discord_webhook_patch = patch('src.bots.discord.DiscordWebhook')
-        self.discord_embed_patch = patch('src.bots.discord.DiscordEmbed')
-        self.reddit_patch = patch('src.bots.telegram.RedditService')
+        self.telegram_bot_patch = patch('telegram.Bot')
+        self.discord_webhook_patch = patch('discord_webhook.DiscordWebhook')
+        self.discord_embed_patch = patch('discord_webhook.DiscordEmbed')
+        self.discord_session_patch = patch('src.bots.discord.get_http_session')
+        self.reddit_patch = patch('src.services.async_reddit.AsyncRedditService')
         
         # Start patches
         self.mock_telegram_bot = self.telegram_bot_patch.start()
         self.mock_discord_webhook = self.discord_webhook_patch.start()
         self.mock_discord_embed = self.discord_embed_patch.start()
+        self.mock_discord_session = self.discord_session_patch.start()
         self.mock_reddit = self.reddit_patch.start()
         
         # Configure mock bot instances
@@ -63,7 +65,9 @@ class TestSendingIntegration(unittest.TestCase):
         # Configure mock webhook response
         self.mock_response = MagicMock()
         self.mock_response.status_code = 200
-        self.mock_webhook_instance.execute.return_value = self.mock_response
+        self.mock_session_instance = MagicMock()
+        self.mock_session_instance.post.return_value = self.mock_response
+        self.mock_discord_session.return_value = self.mock_session_instance
         
         # Configure mock Reddit service
         self.mock_reddit_instance = MagicMock()
@@ -101,6 +105,7 @@ class TestSendingIntegration(unittest.TestCase):
         self.telegram_bot_patch.stop()
         self.discord_webhook_patch.stop()
         self.discord_embed_patch.stop()
+        self.discord_session_patch.stop()
         self.reddit_patch.stop()
         
         logger.info("✓ Integration test teardown complete")
@@ -148,18 +153,15 @@ class TestSendingIntegration(unittest.TestCase):
         discord_bot = DiscordBot()
         
         # Call the function
-        discord_bot.create_embed(self.sample_posts[0])
+        embed = discord_bot.create_embed(self.sample_posts[0])
         
-        # Verify DiscordEmbed was initialized with the correct parameters
-        self.mock_discord_embed.assert_called_once_with(
-            title="New Post from r/python [Discussion]",
-            description="Test Post 1",
-            color='03b2f8'
-        )
+        # Verify the embed carries the post's details
+        self.assertEqual(embed['title'], "New Post from r/python [Discussion]")
+        self.assertEqual(embed['description'], "Test Post 1")
         
         # Verify embed fields were added
-        self.mock_embed_instance.add_embed_field.assert_any_call(name="Posted", value="2 hours ago")
-        self.mock_embed_instance.add_embed_field.assert_any_call(name="URL", value="https://reddit.com/r/python/test_post_1")
+        self.assertIn({'name': "Posted", 'value': "2 hours ago", 'inline': True}, embed['fields'])
+        self.assertIn({'name': "URL", 'value': "https://reddit.com/r/python/test_post_1", 'inline': True}, embed['fields'])
         
         logger.info("✓ Successfully created Discord embed")
     
@@ -177,8 +179,8 @@ class TestSendingIntegration(unittest.TestCase):
         # Verify the embed was added
         self.mock_webhook_instance.add_embed.assert_called_once()
         
-        # Verify execute was called
-        self.mock_webhook_instance.execute.assert_called_once()
+        # Verify the message was posted
+        self.mock_session_instance.post.assert_called_once()
         
         logger.info("✓ Successfully sent post to Discord")
     
@@ -196,8 +198,8 @@ class TestSendingIntegration(unittest.TestCase):
         # Verify Discord webhook was instantiated twice (once for each post)
         self.assertEqual(self.mock_discord_webhook.call_count, 2)
         
-        # Verify execute was called for each post
-        self.assertEqual(self.mock_webhook_instance.execute.call_count, 2)
+        # Verify the message was posted for each post
+        self.assertEqual(self.mock_session_instance.post.call_count, 2)
         
         logger.info("✓ Successfully processed and sent all posts to Discord")
     
@@ -208,15 +210,15 @@ class TestSendingIntegration(unittest.TestCase):
         reddit_service.get_all_posts.return_value = [self.sample_posts]
         
         # Initialize both bots with the mocked Reddit service
-        with patch('src.bots.telegram.RedditService', return_value=reddit_service), \
+        with patch('src.services.async_reddit.AsyncRedditService', return_value=reddit_service), \
              patch('src.bots.discord.RedditService', return_value=reddit_service):
             
             # Discord bot test
             discord_bot = DiscordBot()
             discord_bot.process_posts()
             
-            # Verify Discord webhook execution
-            self.assertEqual(self.mock_webhook_instance.execute.call_count, 2)
+            # Verify Discord webhook messages
+            self.assertEqual(self.mock_session_instance.post.call_count, 2)
             
             # Create a mock for asyncio.get_event_loop
             with patch('src.bots.telegram.asyncio.get_event_loop') as mock_get_loop:
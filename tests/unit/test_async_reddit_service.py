@@ -0,0 +1,163 @@
+"""Unit tests for the asyncio Reddit service."""
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import os
+import sys
+import logging
+import asyncio
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.services.async_reddit import AsyncRedditService
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+def make_submission(post_id, created_utc, flair='Discussion'):
+    """Create a mock submission."""
+    return MagicMock(
+        id=post_id, fullname=f't3_{post_id}', created_utc=created_utc, title=f'Title {post_id}',
+        url=f'https://reddit.com/{post_id}', selftext='', link_flair_text=flair
+    )
+
+class TestAsyncRedditService(unittest.TestCase):
+    """Test cases for the asyncio Reddit service."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        # Create patches for external dependencies
+        self.asyncpraw_patch = patch('src.services.async_reddit.asyncpraw')
+        self.mongo_patch = patch('src.services.async_mongodb.AsyncMongoDBService')
+        
+        # Start patches
+        self.mock_asyncpraw = self.asyncpraw_patch.start()
+        self.mock_mongo = self.mongo_patch.start()
+        
+        # Create mock objects
+        self.mock_reddit = MagicMock()
+        self.mock_reddit.close = AsyncMock()
+        self.mock_reddit.get = AsyncMock()
+        self.mock_asyncpraw.Reddit.return_value = self.mock_reddit
+        
+        self.mock_mongo_service = MagicMock()
+        self.mock_mongo_service.get_checkpoint = AsyncMock(return_value=None)
+        self.mock_mongo_service.set_checkpoint = AsyncMock()
+        self.mock_mongo_service.claim_posts = AsyncMock(side_effect=lambda ids, name: ids)
+        self.mock_mongo_service.close = AsyncMock()
+        self.mock_mongo.return_value = self.mock_mongo_service
+        
+        # Setup environment variables for testing
+        os.environ['SUB_NAMES'] = 'python,programming'
+        os.environ['VALID_FLAIRS'] = 'Discussion,Help'
+        
+        # Initialize the service
+        self.reddit_service = AsyncRedditService()
+        
+        print("✓ Setup complete: Created mock asyncpraw and async MongoDB service")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        # Stop patches
+        self.asyncpraw_patch.stop()
+        self.mongo_patch.stop()
+        
+        print("✓ Teardown complete: Stopped all patches")
+    
+    def test_get_filtered_posts(self):
+        """Test fetching, flair filtering, claiming and checkpointing a subreddit."""
+        self.mock_reddit.get.return_value = [make_submission('new', 200.0), make_submission('meta', 150.0, flair='Meta')]
+        
+        # Call the function
+        result = asyncio.run(self.reddit_service.get_filtered_posts('python'))
+        
+        # Verify only the flaired post was claimed and returned
+        self.mock_mongo_service.claim_posts.assert_awaited_once_with(['new'], 'python')
+        self.assertEqual([post['id'] for post in result], ['new'])
+        self.assertEqual(set(result[0]), {'id', 'created_utc', 'title', 'url', 'selftext', 'subreddit', 'flair'})
+        
+        # Verify the checkpoint moved to the newest submission once it was claimed
+        self.mock_mongo_service.set_checkpoint.assert_awaited_once_with('python', 't3_new', 200.0)
+        
+        print("✓ Test get_filtered_posts: New posts fetched and claimed asynchronously")
+    
+    def test_fetch_new_submissions_pages_from_checkpoint(self):
+        """Test that a checkpoint is followed forward with 'before' pages until caught up."""
+        self.mock_mongo_service.get_checkpoint.return_value = {'fullname': 't3_old', 'created_utc': 100.0, 'checked_utc': 0}
+        full_page = [make_submission(f'p{i}', 300.0 - i) for i in range(100)]
+        last_page = [make_submission('newest', 400.0)]
+        self.mock_reddit.get.side_effect = [full_page, last_page]
+        
+        # Call the function
+        result = asyncio.run(self.reddit_service.fetch_new_submissions('python'))
+        
+        # Verify both pages were read, newest first
+        self.assertEqual(len(result), 101)
+        self.assertEqual(result[0].id, 'newest')
+        self.assertEqual(self.mock_reddit.get.call_args_list[1][1]['params'], {'limit': 100, 'before': 't3_p0'})
+        
+        print("✓ Test fetch_new_submissions_pages_from_checkpoint: Checkpoint followed across pages")
+    
+    def test_failed_claim_keeps_checkpoint(self):
+        """Test that the checkpoint stays put when claiming the fetched posts fails."""
+        self.mock_reddit.get.return_value = [make_submission('new', 200.0)]
+        self.mock_mongo_service.claim_posts.side_effect = RuntimeError('MongoDB unavailable')
+        
+        # Call the function
+        result = asyncio.run(self.reddit_service.get_filtered_posts('python'))
+        
+        # Verify nothing was returned and the posts will be fetched again next run
+        self.assertEqual(result, [])
+        self.mock_mongo_service.set_checkpoint.assert_not_awaited()
+        
+        print("✓ Test failed_claim_keeps_checkpoint: Checkpoint kept after a failed claim")
+    
+    def test_seen_cache(self):
+        """Test that the async store sits behind the seen ID cache, so repeat polls skip the claim."""
+        self.mock_reddit.get.return_value = [make_submission('new', 200.0)]
+        
+        async def poll_twice():
+            await self.reddit_service.get_filtered_posts('python')
+            return await self.reddit_service.get_filtered_posts('python')
+        
+        # Verify the second poll was answered from memory
+        self.assertEqual(asyncio.run(poll_twice()), [])
+        self.mock_mongo_service.claim_posts.assert_awaited_once_with(['new'], 'python')
+        
+        print("✓ Test seen_cache: Repeat poll answered from the seen ID cache")
+    
+    def test_get_all_posts_concurrent(self):
+        """Test that subreddits are fetched concurrently on the event loop, bounded by FETCH_WORKERS."""
+        os.environ['SUB_NAMES'] = 'a,b,c,d'
+        self.reddit_service.fetch_workers = 2
+        in_flight = 0
+        peak = 0
+        
+        async def fetch(subreddit_name):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [{'id': subreddit_name}]
+        
+        with patch.object(self.reddit_service, 'get_filtered_posts', side_effect=fetch):
+            result = asyncio.run(self.reddit_service.get_all_posts())
+        
+        # Verify the order of SUB_NAMES was kept and two fetches overlapped
+        self.assertEqual(result, [[{'id': 'a'}], [{'id': 'b'}], [{'id': 'c'}], [{'id': 'd'}]])
+        self.assertEqual(peak, 2)
+        
+        print("✓ Test get_all_posts_concurrent: Subreddits fetched concurrently")
+    
+    def test_close(self):
+        """Test that closing the service closes the Reddit session and MongoDB client."""
+        asyncio.run(self.reddit_service.close())
+        
+        self.mock_reddit.close.assert_awaited_once()
+        self.mock_mongo_service.close.assert_awaited_once()
+        
+        print("✓ Test close: Reddit and MongoDB connections closed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,49 @@
+"""Unit tests for the in-memory caches."""
+import unittest
+import os
+import sys
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.cache import LRUCache
+
+class TestLRUCache(unittest.TestCase):
+    """Test cases for the LRU cache."""
+    
+    def test_get_and_put(self):
+        """Test storing and reading values, with hit and miss counts."""
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        
+        print("✓ Test get_and_put: Values stored and counted")
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = LRUCache(2)
+        cache.put('a')
+        cache.put('b')
+        cache.get('a')
+        cache.put('c')
+        
+        # 'b' was used least recently, 'a' was refreshed by the get
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(len(cache), 2)
+        
+        print("✓ Test evicts_least_recently_used: Oldest entry evicted")
+    
+    def test_invalid_size(self):
+        """Test that a cache must hold at least one entry."""
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+        
+        print("✓ Test invalid_size: Empty cache rejected")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -20,14 +20,16 @@ class TestDiscordBot(unittest.TestCase):
     def setUp(self):
         """Set up test environment before each test."""
         # Create patches for external dependencies
-        self.webhook_patch = patch('src.bots.discord.DiscordWebhook')
-        self.embed_patch = patch('src.bots.discord.DiscordEmbed')
+        self.webhook_patch = patch('discord_webhook.DiscordWebhook')
+        self.embed_patch = patch('discord_webhook.DiscordEmbed')
         self.reddit_patch = patch('src.bots.discord.RedditService')
+        self.session_patch = patch('src.bots.discord.get_http_session')
         
         # Start patches
         self.mock_webhook_class = self.webhook_patch.start()
         self.mock_embed_class = self.embed_patch.start()
         self.mock_reddit_class = self.reddit_patch.start()
+        self.mock_get_session = self.session_patch.start()
         
         # Create mock objects
         self.mock_webhook = MagicMock()
@@ -42,7 +44,10 @@ class TestDiscordBot(unittest.TestCase):
         # Setup mock response for webhook execution
         self.mock_response = MagicMock()
         self.mock_response.status_code = 200
-        self.mock_webhook.execute.return_value = self.mock_response
+        self.mock_response.headers = {}
+        self.mock_session = MagicMock()
+        self.mock_session.post.return_value = self.mock_response
+        self.mock_get_session.return_value = self.mock_session
         
         # Setup environment variables for testing
         os.environ['DISCORD_WEBHOOK_URL'] = 'https://example.com/webhook'
@@ -58,6 +63,7 @@ class TestDiscordBot(unittest.TestCase):
         self.webhook_patch.stop()
         self.embed_patch.stop()
         self.reddit_patch.stop()
+        self.session_patch.stop()
         
         print("✓ Teardown complete: Stopped all patches")
     
@@ -100,22 +106,17 @@ class TestDiscordBot(unittest.TestCase):
         # Call the function
         result = self.discord_bot.create_embed(post)
         
-        # Verify DiscordEmbed was instantiated with the correct parameters
-        self.mock_embed_class.assert_called_once_with(
-            title="New Post from r/test_subreddit [Test Flair]",
-            description="Test Post",
-            color='03b2f8'
-        )
-        
-        # Verify embed fields were added
-        self.mock_embed.add_embed_field.assert_has_calls([
-            call(name="Posted", value="2 hours ago"),
-            call(name="URL", value="https://reddit.com/test"),
-            call(name="Content", value="This is a test post", inline=False)
-        ])
-        
-        # Verify result
-        self.assertEqual(result, self.mock_embed)
+        # Verify the embed carries the post's details
+        self.assertEqual(result, {
+            'title': "New Post from r/test_subreddit [Test Flair]",
+            'description': "Test Post",
+            'color': 0x03b2f8,
+            'fields': [
+                {'name': "Posted", 'value': "2 hours ago", 'inline': True},
+                {'name': "URL", 'value': "https://reddit.com/test", 'inline': True},
+                {'name': "Content", 'value': "This is a test post", 'inline': False}
+            ]
+        })
         
         print("✓ Test create_embed: Discord embed created with correct content")
     
@@ -135,14 +136,10 @@ class TestDiscordBot(unittest.TestCase):
         # Call the function
         result = self.discord_bot.create_embed(post)
         
-        # Verify the embed was created
-        self.mock_embed_class.assert_called_once()
-        
         # Check the content field was truncated
-        add_field_calls = self.mock_embed.add_embed_field.call_args_list
-        content_call = [call for call in add_field_calls if call[1]['name'] == "Content"][0]
-        self.assertLess(len(content_call[1]['value']), 2000)
-        self.assertTrue(content_call[1]['value'].endswith('...'))
+        content_field = [field for field in result['fields'] if field['name'] == "Content"][0]
+        self.assertLess(len(content_field['value']), 2000)
+        self.assertTrue(content_field['value'].endswith('...'))
         
         print("✓ Test create_embed_with_long_text: Long post content correctly truncated")
     
@@ -161,13 +158,9 @@ class TestDiscordBot(unittest.TestCase):
         # Call the function
         result = self.discord_bot.create_embed(post)
         
-        # Verify the embed was created
-        self.mock_embed_class.assert_called_once()
-        
         # Check the content field was not added
-        add_field_calls = self.mock_embed.add_embed_field.call_args_list
-        content_calls = [call for call in add_field_calls if call[1]['name'] == "Content"]
-        self.assertEqual(len(content_calls), 0)
+        content_fields = [field for field in result['fields'] if field['name'] == "Content"]
+        self.assertEqual(len(content_fields), 0)
         
         print("✓ Test create_embed_with_no_text: Empty content field correctly handled")
     
@@ -197,8 +190,10 @@ class TestDiscordBot(unittest.TestCase):
             # Verify the embed was added
             self.mock_webhook.add_embed.assert_called_once_with(self.mock_embed)
             
-            # Verify execute was called
-            self.mock_webhook.execute.assert_called_once()
+            # Verify the message was posted over the shared session
+            self.mock_session.post.assert_called_once_with(
+                'https://example.com/webhook', json=self.mock_webhook.json, timeout=10
+            )
             
             print("✓ Test send_post: Post correctly sent to Discord")
     
@@ -231,11 +226,83 @@ class TestDiscordBot(unittest.TestCase):
             # Verify the embed was added
             self.mock_webhook.add_embed.assert_called_once_with(self.mock_embed)
             
-            # Verify execute was called
-            self.mock_webhook.execute.assert_called_once()
+            # Verify the message was posted over the shared session
+            self.mock_session.post.assert_called_once_with(
+                'https://example.com/webhook', json=self.mock_webhook.json, timeout=10
+            )
             
             print("✓ Test send_post_error: Error response correctly handled")
     
+    def test_send_posts_batches_embeds(self):
+        """Test that posts are packed up to 10 embeds per webhook message."""
+        posts = [{'id': f'post{i}', 'title': f'Post {i}'} for i in range(12)]
+        
+        # Call the function
+        result = self.discord_bot.send_posts(posts)
+        
+        # Verify two webhook messages carried all 12 embeds
+        self.assertEqual(self.mock_session.post.call_count, 2)
+        self.assertEqual(self.mock_webhook.add_embed.call_count, 12)
+        self.assertEqual(result, [f'post{i}' for i in range(12)])
+        
+        print("✓ Test send_posts_batches_embeds: 12 posts sent in 2 webhook messages")
+    
+    def test_pack_batches_respects_embed_size(self):
+        """Test that a batch never exceeds Discord's total embed character limit."""
+        posts = [{'id': f'post{i}'} for i in range(5)]
+        
+        # Each embed is 2500 characters, so only two fit in 6000
+        embed = {'title': 'x' * 2500, 'description': '', 'fields': []}
+        with patch.object(self.discord_bot, 'create_embed', return_value=embed):
+            batches = self.discord_bot.pack_batches(posts)
+        
+        # Verify the posts were split into batches of 2, 2 and 1
+        self.assertEqual([len(batch_posts) for batch_posts, _ in batches], [2, 2, 1])
+        
+        print("✓ Test pack_batches_respects_embed_size: Batches split by total embed size")
+    
+    def test_send_posts_failed_batch(self):
+        """Test that posts in a failed webhook message are not reported as delivered."""
+        posts = [{'id': 'post1'}, {'id': 'post2'}]
+        self.mock_response.status_code = 500
+        
+        # Call the function
+        result = self.discord_bot.send_posts(posts)
+        
+        # Verify nothing was reported as delivered
+        self.assertEqual(result, [])
+        
+        print("✓ Test send_posts_failed_batch: Failed batch reported as not delivered")
+    
+    def test_send_post_retries_after_rate_limit(self):
+        """Test that a 429 response is retried instead of dropping the post."""
+        rate_limited = MagicMock(status_code=429, headers={})
+        rate_limited.json.return_value = {'retry_after': 0.01}
+        self.mock_session.post.side_effect = [rate_limited, self.mock_response]
+        
+        # Call the function
+        result = self.discord_bot.send_post({'id': 'post1', 'title': 'Post 1'})
+        
+        # Verify the message was sent again and delivered
+        self.assertEqual(self.mock_session.post.call_count, 2)
+        self.assertTrue(result)
+        
+        print("✓ Test send_post_retries_after_rate_limit: Rate limited post retried and delivered")
+    
+    def test_session_reused_across_messages(self):
+        """Test that every webhook message of every bot goes over the one shared session."""
+        other_bot = DiscordBot(webhook_url='https://example.com/other')
+        
+        # Send from both bots, one message each
+        self.discord_bot.send_posts([{'id': 'post1'}])
+        other_bot.send_posts([{'id': 'post2'}])
+        
+        # Verify both bots posted through the same session
+        self.assertIs(other_bot.session, self.discord_bot.session)
+        self.assertEqual(self.mock_session.post.call_count, 2)
+        
+        print("✓ Test session_reused_across_messages: Messages shared one HTTP session")
+    
     def test_process_posts_empty(self):
         """Test processing posts when there are none."""
         # Configure the mock to return empty posts
@@ -260,20 +327,19 @@ class TestDiscordBot(unittest.TestCase):
             [{'id': 'post2', 'title': 'Post 2'}, {'id': 'post3', 'title': 'Post 3'}]
         ]
         
-        # Create a patch for the send_post method
-        with patch.object(self.discord_bot, 'send_post') as mock_send_post:
+        # Create a patch for the send_posts method
+        with patch.object(self.discord_bot, 'send_posts') as mock_send_posts:
             # Call the function
             self.discord_bot.process_posts()
             
             # Verify get_all_posts was called
             self.mock_reddit.get_all_posts.assert_called_once()
             
-            # Verify send_post was called for each post
-            self.assertEqual(mock_send_post.call_count, 3)
-            mock_send_post.assert_has_calls([
-                call({'id': 'post1', 'title': 'Post 1'}),
-                call({'id': 'post2', 'title': 'Post 2'}),
-                call({'id': 'post3', 'title': 'Post 3'})
+            # Verify all posts were handed over in one batch call
+            mock_send_posts.assert_called_once_with([
+                {'id': 'post1', 'title': 'Post 1'},
+                {'id': 'post2', 'title': 'Post 2'},
+                {'id': 'post3', 'title': 'Post 3'}
             ])
             
             print("✓ Test process_posts: All posts processed and sent correctly")
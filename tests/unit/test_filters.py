@@ -0,0 +1,128 @@
+"""Unit tests for the post filter engine."""
+import unittest
+from unittest.mock import MagicMock
+import json
+import os
+import sys
+import logging
+import tempfile
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.filters import FilterEngine
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+def submission(post_id, flair=None, title='', selftext=''):
+    """Create a mock submission."""
+    return MagicMock(id=post_id, link_flair_text=flair, title=title, selftext=selftext)
+
+def kept(engine, submissions, subreddit='python'):
+    """Get the IDs of the submissions a filter keeps."""
+    return [post.id for post in engine.filter(submissions, subreddit)]
+
+class TestFilterEngine(unittest.TestCase):
+    """Test cases for the post filter engine."""
+    
+    def test_flairs_ignore_case(self):
+        """Test that VALID_FLAIRS style lists match flairs exactly but ignoring case and spaces."""
+        engine = FilterEngine.from_flairs('Discussion, help')
+        posts = [submission('1', 'discussion'), submission('2', 'HELP'), submission('3', 'Helpful'), submission('4')]
+        
+        self.assertEqual(kept(engine, posts), ['1', '2'])
+        
+        print("✓ Test flairs_ignore_case: Flairs matched exactly, ignoring case")
+    
+    def test_empty_rule_keeps_everything(self):
+        """Test that no flairs and no rule keep every post."""
+        posts = [submission('1', 'Anything'), submission('2')]
+        
+        self.assertEqual(kept(FilterEngine.from_flairs(''), posts), ['1', '2'])
+        self.assertEqual(kept(FilterEngine(), posts), ['1', '2'])
+        
+        print("✓ Test empty_rule_keeps_everything: All posts kept without a rule")
+    
+    def test_prefixes_and_regex(self):
+        """Test flair prefixes and title and selftext patterns."""
+        engine = FilterEngine({'any': [
+            {'flair_prefixes': ['Release']},
+            {'title_regex': [r'^\[news\]', r'\bpep \d+']},
+            {'selftext_regex': 'asyncio'}
+        ]})
+        posts = [
+            submission('1', 'Release 3.13'),
+            submission('2', title='[NEWS] Python 3.13'),
+            submission('3', title='About PEP 703'),
+            submission('4', selftext='Using AsyncIO today'),
+            submission('5', 'Help', title='Old news', selftext='nothing')
+        ]
+        
+        self.assertEqual(kept(engine, posts), ['1', '2', '3', '4'])
+        
+        print("✓ Test prefixes_and_regex: Prefix and pattern conditions matched")
+    
+    def test_keywords_match_whole_words(self):
+        """Test that keywords match whole words in the title or selftext."""
+        engine = FilterEngine({'keywords': ['C++', 'rust']})
+        posts = [
+            submission('1', title='Learning c++ in 2024'),
+            submission('2', selftext='Why Rust?'),
+            submission('3', title='Trusted publishing'),
+            submission('4', title='Crusty old code')
+        ]
+        
+        self.assertEqual(kept(engine, posts), ['1', '2'])
+        
+        print("✓ Test keywords_match_whole_words: Keywords matched as whole words")
+    
+    def test_boolean_combinations(self):
+        """Test that conditions in one rule are combined with and, and any, all and not nest."""
+        engine = FilterEngine({
+            'flairs': ['Help', 'Discussion'],
+            'not': {'any': [{'keywords': ['homework']}, {'title_regex': 'urgent'}]}
+        })
+        posts = [
+            submission('1', 'Help', title='How do generators work?'),
+            submission('2', 'Help', title='Homework: loops'),
+            submission('3', 'Discussion', title='URGENT please'),
+            submission('4', 'Showcase', title='My project')
+        ]
+        
+        self.assertEqual(kept(engine, posts), ['1'])
+        
+        print("✓ Test boolean_combinations: Combined rules evaluated correctly")
+    
+    def test_per_subreddit_rules(self):
+        """Test that a subreddit's own rule replaces the default rule."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as config_file:
+            json.dump({
+                'default': {'flairs': ['Discussion']},
+                'subreddits': {'LearnPython': {'flairs': ['Help']}}
+            }, config_file)
+        
+        try:
+            engine = FilterEngine.from_file(config_file.name)
+        finally:
+            os.unlink(config_file.name)
+        posts = [submission('1', 'Discussion'), submission('2', 'Help')]
+        
+        self.assertEqual(kept(engine, posts, 'python'), ['1'])
+        self.assertEqual(kept(engine, posts, 'learnpython'), ['2'])
+        
+        print("✓ Test per_subreddit_rules: Subreddit rule used instead of the default")
+    
+    def test_invalid_rules(self):
+        """Test that unknown keys and broken patterns are rejected when compiling."""
+        with self.assertRaises(ValueError):
+            FilterEngine({'flair': ['Help']})
+        with self.assertRaises(ValueError):
+            FilterEngine({'title_regex': '['})
+        with self.assertRaises(ValueError):
+            FilterEngine(subreddits={'python': ['Help']})
+        
+        print("✓ Test invalid_rules: ValueError raised for invalid rules")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,33 @@
+"""Unit tests for the shared HTTP session."""
+import unittest
+import os
+import sys
+import logging
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.http import HTTP_POOL_SIZE, get_http_session
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestHttpSession(unittest.TestCase):
+    """Test cases for the shared HTTP session."""
+    
+    def test_get_http_session_is_shared(self):
+        """Test that the process-wide HTTP session is created once."""
+        self.assertIs(get_http_session(), get_http_session())
+        
+        print("✓ Test get_http_session_is_shared: One HTTP session per process")
+    
+    def test_connection_pool(self):
+        """Test that HTTPS connections are pooled per host."""
+        adapter = get_http_session().get_adapter('https://discord.com')
+        
+        self.assertEqual(adapter._pool_maxsize, HTTP_POOL_SIZE)
+        
+        print("✓ Test connection_pool: HTTPS connections kept alive in a pool")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,62 @@
+"""Unit tests for deferred imports and environment loading."""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import logging
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils import env
+from src.utils.lazy import lazy_import
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestLazyImport(unittest.TestCase):
+    """Test cases for lazily imported modules."""
+    
+    def test_imported_on_first_use(self):
+        """Test that the module is imported on first attribute access, not before."""
+        with patch('src.utils.lazy.importlib.import_module', wraps=__import__) as mock_import:
+            module = lazy_import('json')
+            mock_import.assert_not_called()
+            
+            self.assertEqual(module.dumps([1]), '[1]')
+            self.assertEqual(module.loads('[1]'), [1])
+            
+            mock_import.assert_called_once_with('json')
+        
+        print("✓ Test imported_on_first_use: Module imported once when first used")
+    
+    def test_patches_apply(self):
+        """Test that patching the real module also affects the lazy one."""
+        module = lazy_import('json')
+        
+        with patch('json.dumps', return_value='patched'):
+            self.assertEqual(module.dumps([1]), 'patched')
+        
+        print("✓ Test patches_apply: Patched attribute seen through the lazy module")
+    
+    def test_missing_module(self):
+        """Test that a missing module only fails when it is used."""
+        module = lazy_import('module_that_does_not_exist')
+        
+        with self.assertRaises(ImportError):
+            module.anything
+        
+        print("✓ Test missing_module: ImportError raised on first use")
+    
+    def test_load_env_once(self):
+        """Test that the .env file is read only once per process."""
+        with patch.object(env, '_loaded', False), patch('src.utils.env.load_dotenv') as mock_load_dotenv:
+            env.load_env()
+            env.load_env()
+            
+            mock_load_dotenv.assert_called_once()
+        
+        print("✓ Test load_env_once: .env loaded once")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,6 +1,6 @@
 """Unit tests for the MongoDB service."""
 import unittest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock, call, ANY
 import os
 import sys
 import logging
@@ -8,6 +8,8 @@ import logging
 # Configure path to import modules from src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from pymongo.errors import BulkWriteError, OperationFailure
+
 from src.services.mongodb import MongoDBService
 
 # Disable logging during tests
@@ -53,8 +55,13 @@ class TestMongoDBService(unittest.TestCase):
         print("✓ Teardown complete: Stopped all patches")
     
     def test_create_client(self):
-        """Test MongoDB client creation with proper credentials."""
-        # Verify MongoDB client was created with the correct connection string
+        """Test that the MongoDB client connects with proper credentials on first use."""
+        self.mock_pymongo.MongoClient.assert_not_called()
+        
+        self.assertIs(self.mongodb_service.client, self.mock_client)
+        self.assertIs(self.mongodb_service.db, self.mock_db)
+        
+        # Verify MongoDB client was created once with the correct connection string
         self.mock_pymongo.MongoClient.assert_called_once()
         connection_str = self.mock_pymongo.MongoClient.call_args[0][0]
         
@@ -77,7 +84,7 @@ class TestMongoDBService(unittest.TestCase):
         self.mock_db.__getitem__.assert_called_with('test_collection')
         
         # Verify insert_one was called with the correct document
-        self.mock_collection.insert_one.assert_called_once_with({'id': 'test_post_id'})
+        self.mock_collection.insert_one.assert_called_once_with({'id': 'test_post_id', 'seen_at': ANY})
         
         print("✓ Test insert_post: Post ID correctly inserted into collection")
     
@@ -119,6 +126,150 @@ class TestMongoDBService(unittest.TestCase):
         
         print("✓ Test check_post_exists_false: Correctly detected non-existing post")
     
+    def test_filter_unseen(self):
+        """Test filtering a batch of post IDs with a single query."""
+        # Configure the mock to report one of the posts as already stored
+        self.mock_collection.find.return_value = [{'id': 'post2'}]
+        
+        # Call the function
+        result = self.mongodb_service.filter_unseen(['post1', 'post2', 'post3'], 'test_collection')
+        
+        # Verify a single $in query was made
+        self.mock_collection.find.assert_called_once_with(
+            {'id': {'$in': ['post1', 'post2', 'post3']}}, {'id': 1, '_id': 0}
+        )
+        
+        # Verify the unseen IDs are returned in order
+        self.assertEqual(result, ['post1', 'post3'])
+        
+        print("✓ Test filter_unseen: Unseen post IDs found with one query")
+    
+    def test_filter_unseen_empty(self):
+        """Test that an empty batch does not query MongoDB."""
+        self.assertEqual(self.mongodb_service.filter_unseen([], 'test_collection'), [])
+        self.mock_collection.find.assert_not_called()
+        
+        print("✓ Test filter_unseen_empty: No query made for an empty batch")
+    
+    def test_mark_seen_many(self):
+        """Test inserting a batch of post IDs with a single unordered write."""
+        # Call the function
+        self.mongodb_service.mark_seen_many(['post1', 'post2'], 'test_collection')
+        
+        # Verify insert_many was called once with unordered writes
+        self.mock_collection.insert_many.assert_called_once_with(
+            [{'id': 'post1', 'seen_at': ANY}, {'id': 'post2', 'seen_at': ANY}], ordered=False
+        )
+        
+        print("✓ Test mark_seen_many: Post IDs inserted with one write")
+    
+    def test_mark_seen_many_ignores_duplicates(self):
+        """Test that IDs already stored by another run do not raise."""
+        self.mock_collection.insert_many.side_effect = BulkWriteError(
+            {'writeErrors': [{'index': 0, 'code': 11000}], 'nInserted': 1}
+        )
+        
+        # Should not raise
+        self.mongodb_service.mark_seen_many(['post1', 'post2'], 'test_collection')
+        
+        print("✓ Test mark_seen_many_ignores_duplicates: Duplicate key errors tolerated")
+    
+    def test_claim_posts(self):
+        """Test claiming a batch of post IDs with one unordered bulk upsert."""
+        # Configure the mock to report that only the second ID was inserted
+        self.mock_collection.bulk_write.return_value = MagicMock(upserted_ids={1: 'object_id'})
+        
+        # Call the function
+        result = self.mongodb_service.claim_posts(['post1', 'post2', 'post3'], 'test_collection')
+        
+        # Verify a single unordered bulk write with one upsert per ID
+        self.mock_collection.bulk_write.assert_called_once()
+        requests = self.mock_collection.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(self.mock_collection.bulk_write.call_args[1], {'ordered': False})
+        
+        # Verify only the newly inserted ID is returned
+        self.assertEqual(result, ['post2'])
+        
+        print("✓ Test claim_posts: Only newly upserted IDs are claimed")
+    
+    def test_claim_posts_lost_race(self):
+        """Test that IDs lost to a concurrent upsert are not claimed."""
+        self.mock_collection.bulk_write.side_effect = BulkWriteError({
+            'writeErrors': [{'index': 0, 'code': 11000}],
+            'upserted': [{'index': 1, '_id': 'object_id'}]
+        })
+        
+        # Call the function
+        result = self.mongodb_service.claim_posts(['post1', 'post2'], 'test_collection')
+        
+        # Verify the losing ID is skipped
+        self.assertEqual(result, ['post2'])
+        
+        print("✓ Test claim_posts_lost_race: Duplicate key race treated as already claimed")
+    
+    def test_recent_post_ids(self):
+        """Test reading the most recently seen post IDs of a collection."""
+        cursor = self.mock_collection.find.return_value.sort.return_value.limit.return_value
+        cursor.__iter__.return_value = iter([{'id': 'post2'}, {'id': 'post1'}])
+        
+        # Call the function
+        result = self.mongodb_service.recent_post_ids('test_collection', 2)
+        
+        # Verify the newest IDs were read by seen_at
+        self.mock_collection.find.assert_called_once_with({}, {'id': 1, '_id': 0})
+        self.mock_collection.find.return_value.sort.assert_called_once_with('seen_at', self.mock_pymongo.DESCENDING)
+        self.mock_collection.find.return_value.sort.return_value.limit.assert_called_once_with(2)
+        self.assertEqual(result, ['post2', 'post1'])
+        
+        print("✓ Test recent_post_ids: Newest post IDs read by seen_at")
+    
+    def test_checkpoint_round_trip(self):
+        """Test storing and reading a subreddit checkpoint."""
+        self.mock_collection.find_one.return_value = {'subreddit': 'python', 'fullname': 't3_abc', 'created_utc': 100.0}
+        
+        # Store and read the checkpoint
+        self.mongodb_service.set_checkpoint('python', 't3_abc', 100.0)
+        result = self.mongodb_service.get_checkpoint('python')
+        
+        # Verify the checkpoint is upserted and read by subreddit
+        self.mock_db.__getitem__.assert_called_with('_checkpoints')
+        self.mock_collection.update_one.assert_called_once_with(
+            {'subreddit': 'python'},
+            {'$set': {'fullname': 't3_abc', 'created_utc': 100.0, 'checked_utc': ANY}},
+            upsert=True
+        )
+        self.mock_collection.find_one.assert_called_once_with({'subreddit': 'python'}, {'_id': 0})
+        self.assertEqual(result['fullname'], 't3_abc')
+        
+        print("✓ Test checkpoint_round_trip: Checkpoint stored and read back")
+    
+    def test_ensure_indexes_once(self):
+        """Test that the unique and TTL indexes are created once per collection."""
+        self.mongodb_service.check_post_exists('post1', 'test_collection')
+        self.mongodb_service.filter_unseen(['post1'], 'test_collection')
+        
+        # Verify both indexes were created exactly once
+        self.mock_collection.create_index.assert_has_calls([
+            call('id', unique=True),
+            call('seen_at', expireAfterSeconds=30 * 86400)
+        ])
+        self.assertEqual(self.mock_collection.create_index.call_count, 2)
+        
+        print("✓ Test ensure_indexes_once: Indexes created on first use only")
+    
+    def test_ensure_indexes_changed_ttl(self):
+        """Test that a TTL index created with another SEEN_TTL_DAYS is changed in place."""
+        self.mock_collection.create_index.side_effect = [None, OperationFailure('Index options conflict', code=85)]
+        
+        self.mongodb_service.ensure_indexes('test_collection')
+        
+        self.mock_db.command.assert_called_once_with('collMod', 'test_collection', index={
+            'keyPattern': {'seen_at': 1}, 'expireAfterSeconds': 30 * 86400
+        })
+        
+        print("✓ Test ensure_indexes_changed_ttl: TTL index updated with collMod")
+    
     def test_cleanup_collection_under_limit(self):
         """Test cleanup when document count is under the limit."""
         # Configure the mock to return a count under the limit
@@ -186,9 +337,10 @@ class TestMongoDBService(unittest.TestCase):
         # Configure the mock to raise an exception on client creation
         self.mock_pymongo.MongoClient.side_effect = Exception("Connection failed")
         
-        # Attempt to create the service, which should raise the exception
+        # Connecting on first use should raise the exception
+        mongodb_service = MongoDBService()
         with self.assertRaises(Exception) as context:
-            mongodb_service = MongoDBService()
+            mongodb_service.check_post_exists('post1', 'python')
         
         # Verify the exception message
         self.assertEqual(str(context.exception), "Connection failed")
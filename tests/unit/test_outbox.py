@@ -0,0 +1,155 @@
+"""Unit tests for the outbox service."""
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import logging
+from datetime import datetime, timezone
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.services.outbox import OutboxService, PENDING, INFLIGHT, DONE, DEAD
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestOutboxService(unittest.TestCase):
+    """Test cases for the outbox service."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        # Create mock objects
+        self.mock_db = MagicMock()
+        self.mock_collection = MagicMock()
+        self.mock_db.__getitem__.return_value = self.mock_collection
+        
+        # Setup environment variables for testing
+        os.environ['OUTBOX_MAX_ATTEMPTS'] = '3'
+        os.environ['OUTBOX_BACKOFF_SECONDS'] = '10'
+        os.environ['OUTBOX_MAX_BACKOFF_SECONDS'] = '25'
+        
+        # Initialize the service
+        self.outbox = OutboxService(self.mock_db)
+        
+        print("✓ Setup complete: Created outbox on a mock database")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        del os.environ['OUTBOX_MAX_ATTEMPTS']
+        del os.environ['OUTBOX_BACKOFF_SECONDS']
+        del os.environ['OUTBOX_MAX_BACKOFF_SECONDS']
+        
+        print("✓ Teardown complete: Removed outbox settings")
+    
+    def test_ensure_indexes(self):
+        """Test that the claim index and the done_at TTL index are created."""
+        self.mock_collection.create_index.assert_any_call([('sink', 1), ('state', 1), ('next_attempt_at', 1)])
+        self.mock_collection.create_index.assert_any_call('done_at', expireAfterSeconds=7 * 86400)
+        
+        print("✓ Test ensure_indexes: Outbox indexes created")
+    
+    def test_enqueue(self):
+        """Test that posts are upserted once per sink without overwriting queued items."""
+        self.outbox.enqueue('discord', [{'id': 'post1'}, {'id': 'post2'}])
+        
+        # Verify one unordered bulk write of insert-only upserts
+        requests = self.mock_collection.bulk_write.call_args[0][0]
+        self.assertEqual(self.mock_collection.bulk_write.call_args[1], {'ordered': False})
+        self.assertEqual([request._filter for request in requests], [{'_id': 'discord:post1'}, {'_id': 'discord:post2'}])
+        inserted = requests[0]._doc['$setOnInsert']
+        self.assertEqual(inserted['state'], PENDING)
+        self.assertEqual(inserted['post'], {'id': 'post1'})
+        self.assertTrue(all(request._upsert for request in requests))
+        
+        print("✓ Test enqueue: Posts upserted into the outbox")
+    
+    def test_claim(self):
+        """Test that due items are leased with one update and read back by their lease token."""
+        due_cursor = MagicMock()
+        due_cursor.sort.return_value.limit.return_value = [{'_id': 'discord:post1'}, {'_id': 'discord:post2'}]
+        self.mock_collection.find.side_effect = [
+            due_cursor,
+            [{'_id': 'discord:post2', 'lease': 'token'}, {'_id': 'discord:post1', 'lease': 'token'}]
+        ]
+        
+        # Call the function
+        result = self.outbox.claim('discord', limit=5)
+        
+        # Verify the due items were looked up in retry order, up to the limit
+        due = self.mock_collection.find.call_args_list[0][0][0]
+        self.assertEqual(due['sink'], 'discord')
+        self.assertEqual(due['state'], {'$in': [PENDING, INFLIGHT]})
+        due_cursor.sort.assert_called_once_with('next_attempt_at', 1)
+        due_cursor.sort.return_value.limit.assert_called_once_with(5)
+        
+        # Verify the lease update only matches the candidates that are still due
+        query, update = self.mock_collection.update_many.call_args[0]
+        self.assertEqual(query['_id'], {'$in': ['discord:post1', 'discord:post2']})
+        self.assertEqual(query['next_attempt_at'], due['next_attempt_at'])
+        self.assertEqual(update['$set']['state'], INFLIGHT)
+        self.assertGreater(update['$set']['next_attempt_at'], datetime.now(timezone.utc))
+        self.assertEqual(update['$inc'], {'attempts': 1})
+        
+        # Verify the leased items were read back by the token, oldest first
+        self.assertEqual(self.mock_collection.find.call_args_list[1][0][0], {'lease': update['$set']['lease']})
+        self.assertEqual([item['_id'] for item in result], ['discord:post1', 'discord:post2'])
+        
+        print("✓ Test claim: Due items leased to the worker in one update")
+    
+    def test_claim_nothing_due(self):
+        """Test that no lease update is made when nothing is due."""
+        self.mock_collection.find.return_value.sort.return_value.limit.return_value = []
+        
+        result = self.outbox.claim('discord', limit=2)
+        
+        self.assertEqual(result, [])
+        self.mock_collection.find.return_value.sort.return_value.limit.assert_called_once_with(2)
+        self.mock_collection.update_many.assert_not_called()
+        
+        print("✓ Test claim_nothing_due: Empty claim made no update")
+    
+    def test_ack(self):
+        """Test that delivered items are marked done only while the acking claim still holds their lease."""
+        lease = 'token'
+        items = [{'_id': 'discord:post1', 'post_id': 'post1', 'attempts': 1, 'lease': lease}]
+        self.mock_collection.bulk_write.return_value = MagicMock(modified_count=1)
+        
+        self.outbox.ack('discord', items)
+        
+        (request,) = self.mock_collection.bulk_write.call_args[0][0]
+        self.assertEqual(request._filter, {'_id': 'discord:post1', 'state': INFLIGHT, 'lease': lease})
+        self.assertEqual(request._doc['$set']['state'], DONE)
+        self.assertIn('done_at', request._doc['$set'])
+        
+        print("✓ Test ack: Delivered items marked done under their lease")
+    
+    def test_backoff(self):
+        """Test that the retry delay doubles per attempt up to the maximum."""
+        self.assertEqual([self.outbox.backoff(attempts) for attempts in (1, 2, 3)], [10, 20, 25])
+        
+        print("✓ Test backoff: Retry delay grows exponentially and is capped")
+    
+    def test_nack(self):
+        """Test that failed items are retried with backoff and dead-lettered when out of attempts."""
+        lease = 'token'
+        items = [
+            {'_id': 'discord:post1', 'post_id': 'post1', 'attempts': 1, 'lease': lease},
+            {'_id': 'discord:post2', 'post_id': 'post2', 'attempts': 3, 'lease': lease}
+        ]
+        
+        # Call the function
+        before = datetime.now(timezone.utc)
+        self.outbox.nack('discord', items, 'Webhook down')
+        
+        # Verify the retry and the dead letter
+        retry, dead = self.mock_collection.bulk_write.call_args[0][0]
+        self.assertEqual(retry._doc['$set']['state'], PENDING)
+        self.assertGreaterEqual((retry._doc['$set']['next_attempt_at'] - before).total_seconds(), 10)
+        self.assertEqual(dead._filter, {'_id': 'discord:post2', 'state': INFLIGHT, 'lease': lease})
+        self.assertEqual(dead._doc['$set'], {'state': DEAD, 'last_error': 'Webhook down'})
+        
+        print("✓ Test nack: Failed items retried or dead-lettered")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
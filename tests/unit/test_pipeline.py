@@ -0,0 +1,380 @@
+"""Unit tests for the delivery pipeline."""
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import os
+import sys
+import logging
+import asyncio
+import tempfile
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.bots.pipeline import DeliveryPipeline
+from src.bots.sink import SinkCapabilities
+from src.services.sqlite import SQLiteService, SQLiteOutboxService
+from src.utils.routing import RoutingTable
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class FakeOutbox:
+    """In-memory outbox that follows the claim/ack/nack contract of the outbox service."""
+    
+    def __init__(self):
+        self.items = {}
+    
+    def enqueue(self, sink, posts):
+        for post in posts:
+            self.items.setdefault((sink, post['id']), {
+                '_id': f"{sink}:{post['id']}", 'post_id': post['id'], 'post': post, 'state': 'pending', 'attempts': 0
+            })
+    
+    def claim(self, sink, limit=None):
+        claimed = [item for (item_sink, _), item in self.items.items() if item_sink == sink and item['state'] == 'pending']
+        for item in claimed:
+            item['state'] = 'inflight'
+            item['attempts'] += 1
+        return claimed
+    
+    def ack(self, sink, items):
+        for item in items:
+            item['state'] = 'done'
+    
+    def nack(self, sink, items, error=None):
+        for item in items:
+            # Backed off items are not due again within the test
+            item['state'] = 'backoff'
+    
+    def retry_due(self):
+        for item in self.items.values():
+            if item['state'] == 'backoff':
+                item['state'] = 'pending'
+
+class TestDeliveryPipeline(unittest.TestCase):
+    """Test cases for the delivery pipeline."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        # Create patches for external dependencies
+        self.reddit_patch = patch('src.bots.pipeline.RedditService')
+        self.discord_patch = patch('src.bots.pipeline.DiscordBot')
+        self.telegram_patch = patch('src.bots.pipeline.TelegramBot')
+        
+        # Start patches
+        self.mock_reddit_class = self.reddit_patch.start()
+        self.mock_discord_class = self.discord_patch.start()
+        self.mock_telegram_class = self.telegram_patch.start()
+        
+        # Create mock objects
+        self.mock_reddit = MagicMock()
+        self.mock_reddit_class.return_value = self.mock_reddit
+        self.mock_reddit.get_all_posts.return_value = [
+            [{'id': 'post1', 'title': 'Post 1'}],
+            [{'id': 'post2', 'title': 'Post 2'}]
+        ]
+        
+        # Both bots deliver through the async sink interface
+        self.mock_discord = MagicMock()
+        self.mock_discord.capabilities = SinkCapabilities(max_batch_size=10)
+        self.mock_discord.send_batch = AsyncMock(return_value=['post1', 'post2'])
+        self.mock_discord_class.return_value = self.mock_discord
+        
+        self.mock_telegram = MagicMock()
+        self.mock_telegram.capabilities = SinkCapabilities(max_batch_size=10)
+        self.mock_telegram.send_batch = AsyncMock(return_value=['post2'])
+        self.mock_telegram_class.return_value = self.mock_telegram
+        
+        # Setup environment variables for testing
+        os.environ['DISCORD_WEBHOOK_URL'] = 'https://example.com/webhook'
+        os.environ['TELEGRAM_TOKEN'] = 'test_token'
+        os.environ['OUTBOX_ENABLED'] = 'false'
+        
+        print("✓ Setup complete: Created mock Reddit service and bots")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        # Stop patches
+        self.reddit_patch.stop()
+        self.discord_patch.stop()
+        self.telegram_patch.stop()
+        del os.environ['OUTBOX_ENABLED']
+        
+        print("✓ Teardown complete: Stopped all patches")
+    
+    def test_initialization_shares_reddit_service(self):
+        """Test that both bots are built around the one Reddit service."""
+        pipeline = DeliveryPipeline()
+        
+        # Verify a single Reddit service was created and handed to each bot
+        self.mock_reddit_class.assert_called_once()
+        self.mock_discord_class.assert_called_once_with(reddit_service=self.mock_reddit)
+        self.mock_telegram_class.assert_called_once_with(reddit_service=self.mock_reddit)
+        self.assertEqual(set(pipeline.sinks), {'discord', 'telegram'})
+        
+        print("✓ Test initialization_shares_reddit_service: Bots share one Reddit service")
+    
+    def test_initialization_no_sinks(self):
+        """Test initialization when no bot is configured."""
+        del os.environ['DISCORD_WEBHOOK_URL']
+        del os.environ['TELEGRAM_TOKEN']
+        
+        with self.assertRaises(ValueError) as context:
+            DeliveryPipeline()
+        
+        self.assertEqual(str(context.exception), "No delivery sinks are configured")
+        
+        print("✓ Test initialization_no_sinks: Correctly raised exception with no sinks")
+    
+    def test_process_posts_fetches_once(self):
+        """Test that posts are fetched once and fanned out to every sink."""
+        pipeline = DeliveryPipeline()
+        
+        # Call the function
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify a single fetch fed both sinks with the same posts
+        self.mock_reddit.get_all_posts.assert_called_once()
+        expected_posts = [{'id': 'post1', 'title': 'Post 1'}, {'id': 'post2', 'title': 'Post 2'}]
+        self.mock_discord.send_batch.assert_called_once_with(expected_posts)
+        self.mock_telegram.send_batch.assert_awaited_once_with(expected_posts)
+        
+        # Verify the per-sink delivery state
+        self.assertEqual(states['discord'], {'sent': ['post1', 'post2'], 'failed': []})
+        self.assertEqual(states['telegram'], {'sent': ['post2'], 'failed': ['post1']})
+        
+        print("✓ Test process_posts_fetches_once: One fetch delivered to all sinks")
+    
+    def test_process_posts_empty(self):
+        """Test that nothing is sent when there are no new posts."""
+        self.mock_reddit.get_all_posts.return_value = []
+        pipeline = DeliveryPipeline()
+        
+        # Call the function
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify no sink was called
+        self.assertEqual(states, {})
+        self.mock_discord.send_batch.assert_not_called()
+        self.mock_telegram.send_batch.assert_not_called()
+        
+        print("✓ Test process_posts_empty: No posts sent when no posts available")
+    
+    def test_failing_sink_does_not_affect_others(self):
+        """Test that an exception in one sink leaves the other sinks' delivery intact."""
+        self.mock_discord.send_batch.side_effect = Exception("Webhook down")
+        pipeline = DeliveryPipeline()
+        
+        # Call the function
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify Discord is reported as failed while Telegram still delivered
+        self.assertEqual(states['discord'], {'sent': [], 'failed': ['post1', 'post2']})
+        self.assertEqual(states['telegram']['sent'], ['post2'])
+        
+        print("✓ Test failing_sink_does_not_affect_others: Sink failures are isolated")
+    
+    def test_routed_delivery(self):
+        """Test that a routing table builds one sink per destination and delivers only matching posts."""
+        os.environ['PYTHON_WEBHOOK'] = 'https://example.com/python'
+        routing_table = RoutingTable(
+            {
+                'python-discord': {'type': 'discord', 'webhook_url_env': 'PYTHON_WEBHOOK'},
+                'all-telegram': {'type': 'telegram', 'token': 'other_token', 'chat_id': '-100'}
+            },
+            [
+                {'subreddits': ['python'], 'destinations': ['python-discord']},
+                {'destinations': ['all-telegram']}
+            ]
+        )
+        self.mock_reddit.get_all_posts.return_value = [
+            [{'id': 'post1', 'subreddit': 'python'}],
+            [{'id': 'post2', 'subreddit': 'programming'}]
+        ]
+        self.mock_discord.send_batch.return_value = ['post1']
+        self.mock_telegram.send_batch = AsyncMock(return_value=['post1', 'post2'])
+        pipeline = DeliveryPipeline(routing_table=routing_table)
+        del os.environ['PYTHON_WEBHOOK']
+        
+        # Verify the sinks were built from the destinations
+        self.mock_discord_class.assert_called_once_with(reddit_service=self.mock_reddit, webhook_url='https://example.com/python')
+        self.mock_telegram_class.assert_called_once_with(reddit_service=self.mock_reddit, token='other_token', chat_id='-100')
+        
+        # Call the function
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify each destination only received its routed posts from the single fetch
+        self.mock_reddit.get_all_posts.assert_called_once()
+        self.mock_discord.send_batch.assert_called_once_with([{'id': 'post1', 'subreddit': 'python'}])
+        self.assertEqual(states['python-discord']['sent'], ['post1'])
+        self.assertEqual(states['all-telegram']['sent'], ['post1', 'post2'])
+        
+        print("✓ Test routed_delivery: Posts delivered to their routed destinations")
+    
+    def test_process_posts_through_outbox(self):
+        """Test that fetched posts are enqueued, delivered posts acked and failed posts kept for a retry."""
+        outbox = FakeOutbox()
+        pipeline = DeliveryPipeline(outbox=outbox)
+        
+        # Call the function
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify delivery state and the outbox items of each sink
+        self.assertEqual(states['discord'], {'sent': ['post1', 'post2'], 'failed': []})
+        self.assertEqual(states['telegram'], {'sent': ['post2'], 'failed': ['post1']})
+        self.assertEqual(outbox.items[('telegram', 'post2')]['state'], 'done')
+        self.assertEqual(outbox.items[('telegram', 'post1')]['state'], 'backoff')
+        
+        print("✓ Test process_posts_through_outbox: Outbox acked deliveries and kept failures")
+    
+    def test_outbox_opened_before_fetching(self):
+        """Test that the outbox is created before posts are claimed, so a MongoDB error strands none."""
+        os.environ['OUTBOX_ENABLED'] = 'true'
+        with patch('src.bots.pipeline.OutboxService', side_effect=RuntimeError('MongoDB unavailable')):
+            pipeline = DeliveryPipeline()
+            states = asyncio.run(pipeline.process_posts())
+        
+        # Verify nothing was fetched, so nothing was claimed
+        self.assertEqual(states, {})
+        self.mock_reddit.get_all_posts.assert_not_called()
+        
+        print("✓ Test outbox_opened_before_fetching: Outbox error stopped the run before claiming")
+    
+    def test_sqlite_store_outbox(self):
+        """Test that the SQLite dedup store gets an outbox in its own database file."""
+        os.environ['OUTBOX_ENABLED'] = 'true'
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteService(os.path.join(directory, 'dedup.db'))
+            self.mock_reddit.mongo_service.store = store
+            pipeline = DeliveryPipeline()
+            
+            # Verify the posts were queued in SQLite and delivered from there
+            states = asyncio.run(pipeline.process_posts())
+            self.assertIsInstance(pipeline.outbox, SQLiteOutboxService)
+            self.assertEqual(states['discord'], {'sent': ['post1', 'post2'], 'failed': []})
+            self.assertEqual(pipeline.outbox.counts('telegram'), {'done': 1, 'pending': 1})
+            store.close()
+        
+        print("✓ Test sqlite_store_outbox: Posts delivered through the SQLite outbox")
+    
+    def test_failed_enqueue_delivers_directly(self):
+        """Test that claimed posts an outbox can't take are sent directly instead of being dropped."""
+        outbox = FakeOutbox()
+        outbox.enqueue = MagicMock(side_effect=RuntimeError('MongoDB unavailable'))
+        pipeline = DeliveryPipeline(outbox=outbox)
+        
+        # Call the function
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify every sink still got the fetched posts
+        self.assertEqual(states['discord'], {'sent': ['post1', 'post2'], 'failed': []})
+        self.assertEqual(states['telegram'], {'sent': ['post2'], 'failed': ['post1']})
+        self.mock_discord.send_batch.assert_awaited_once()
+        
+        print("✓ Test failed_enqueue_delivers_directly: Posts delivered without the outbox")
+    
+    def test_outbox_retries_failed_posts(self):
+        """Test that a post a sink failed to deliver is sent again on the next run."""
+        outbox = FakeOutbox()
+        pipeline = DeliveryPipeline(outbox=outbox)
+        asyncio.run(pipeline.process_posts())
+        
+        # Nothing new is fetched on the next run, but the failed post is due again
+        self.mock_reddit.get_all_posts.return_value = []
+        self.mock_telegram.send_batch = AsyncMock(return_value=['post1'])
+        outbox.retry_due()
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify only the failed post was retried, and only to the sink that failed it
+        self.mock_telegram.send_batch.assert_awaited_once_with([{'id': 'post1', 'title': 'Post 1'}])
+        self.assertEqual(states, {'telegram': {'sent': ['post1'], 'failed': []}})
+        self.assertEqual(outbox.items[('telegram', 'post1')]['attempts'], 2)
+        
+        print("✓ Test outbox_retries_failed_posts: Failed post delivered on retry")
+    
+    def test_stream_posts_delivers_batches(self):
+        """Test that the daemon loop delivers each non-empty streamed batch."""
+        self.mock_reddit.stream_posts.return_value = iter([
+            [{'id': 'post1'}],
+            [],
+            [{'id': 'post2'}]
+        ])
+        pipeline = DeliveryPipeline()
+        
+        # Run until the stream ends
+        asyncio.run(pipeline.stream_posts())
+        
+        # Verify only the non-empty batches were delivered
+        self.assertEqual(self.mock_discord.send_batch.call_count, 2)
+        self.mock_discord.send_batch.assert_any_call([{'id': 'post1'}])
+        self.mock_discord.send_batch.assert_any_call([{'id': 'post2'}])
+        
+        print("✓ Test stream_posts_delivers_batches: Streamed batches delivered to sinks")
+    
+    def test_stream_posts_reopens_after_error(self):
+        """Test that a failing stream is reopened instead of stopping the daemon."""
+        def broken_stream():
+            raise Exception("Connection reset")
+            yield
+        
+        self.mock_reddit.stream_posts.side_effect = [broken_stream(), iter([[{'id': 'post1'}]])]
+        os.environ['STREAM_RETRY_SECONDS'] = '0'
+        pipeline = DeliveryPipeline()
+        
+        # Run until the reopened stream ends
+        asyncio.run(pipeline.stream_posts())
+        del os.environ['STREAM_RETRY_SECONDS']
+        
+        # Verify the stream was reopened and its posts delivered
+        self.assertEqual(self.mock_reddit.stream_posts.call_count, 2)
+        self.mock_discord.send_batch.assert_called_once_with([{'id': 'post1'}])
+        
+        print("✓ Test stream_posts_reopens_after_error: Stream reopened after a failure")
+    
+    def test_batches_sized_by_capabilities(self):
+        """Test that each sink receives batches no larger than its capabilities allow."""
+        self.mock_telegram.capabilities = SinkCapabilities(max_batch_size=1)
+        pipeline = DeliveryPipeline()
+        
+        # Call the function
+        states = asyncio.run(pipeline.process_posts())
+        
+        # Verify Telegram got one post per call while Discord got both at once
+        self.assertEqual(self.mock_telegram.send_batch.await_count, 2)
+        self.mock_discord.send_batch.assert_awaited_once()
+        self.assertEqual(states['telegram'], {'sent': ['post2'], 'failed': ['post1']})
+        
+        print("✓ Test batches_sized_by_capabilities: Batches split per sink")
+    
+    def test_slow_sink_does_not_delay_others(self):
+        """Test that streamed batches keep reaching a sink while another sink is still busy."""
+        self.mock_reddit.stream_posts.return_value = iter([[{'id': 'post1'}], [{'id': 'post2'}]])
+        telegram_done = asyncio.Event()
+        
+        async def slow_discord(posts):
+            # Discord only finishes once Telegram has received both batches
+            await telegram_done.wait()
+            return [post['id'] for post in posts]
+        
+        async def telegram(posts):
+            if posts == [{'id': 'post2'}]:
+                telegram_done.set()
+            return [post['id'] for post in posts]
+        
+        self.mock_discord.send_batch = AsyncMock(side_effect=slow_discord)
+        self.mock_telegram.send_batch = AsyncMock(side_effect=telegram)
+        pipeline = DeliveryPipeline()
+        
+        # Run until the stream ends; waiting on Discord between batches would never finish
+        async def run():
+            await asyncio.wait_for(pipeline.stream_posts(), timeout=5)
+        asyncio.run(run())
+        
+        # Verify both sinks got both batches
+        self.assertEqual(self.mock_discord.send_batch.await_count, 2)
+        self.assertEqual(self.mock_telegram.send_batch.await_count, 2)
+        
+        print("✓ Test slow_sink_does_not_delay_others: Sinks delivered independently")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+"""Unit tests for the Post record."""
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import logging
+import gc
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.services.post import MAX_EXCERPT_CHARS, Post
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+def make_submission(selftext):
+    """Create a submission with the given body."""
+    return MagicMock(id='abc', title='Title', url='https://redd.it/abc', link_flair_text='Help',
+                     created_utc=100.0, selftext=selftext)
+
+class TestPost(unittest.TestCase):
+    """Test cases for Post."""
+    
+    def test_body_trimmed(self):
+        """Test that only the start of a long body is kept, and excerpts still show it was cut."""
+        submission = make_submission('x' * 5000)
+        
+        post = Post.from_submission(submission, 'python')
+        
+        # Verify the post holds one character past the longest excerpt and not the submission
+        self.assertEqual(len(post.selftext), MAX_EXCERPT_CHARS + 1)
+        self.assertNotIn(submission, gc.get_referents(post))
+        self.assertEqual(post.excerpt(1000), 'x' * 997 + '...')
+        self.assertEqual(post.excerpt(MAX_EXCERPT_CHARS), 'x' * (MAX_EXCERPT_CHARS - 3) + '...')
+        
+        print("✓ Test body_trimmed: Body cut to the longest excerpt")
+    
+    def test_dict_interface(self):
+        """Test that a post reads like the post dicts it replaces."""
+        submission = make_submission('Body')
+        post = Post.from_submission(submission, 'python')
+        
+        self.assertEqual(post['subreddit'], 'python')
+        self.assertEqual(post.get('flair'), 'Help')
+        self.assertEqual(post.get('posted_ago', 'Unknown'), 'Unknown')
+        self.assertEqual(dict(post), {
+            'id': 'abc', 'title': 'Title', 'url': 'https://redd.it/abc', 'selftext': 'Body',
+            'subreddit': 'python', 'flair': 'Help', 'created_utc': 100.0
+        })
+        with self.assertRaises(KeyError):
+            post['posted_ago']
+        
+        print("✓ Test dict_interface: Post usable as a read-only dict")
+    
+    def test_round_trip(self):
+        """Test that a post stored as a dict, like in the outbox, comes back equal."""
+        submission = make_submission('Body')
+        post = Post.from_submission(submission, 'python')
+        
+        restored = Post.coerce(post.to_dict())
+        
+        self.assertEqual(restored, post)
+        self.assertEqual(restored.selftext, 'Body')
+        self.assertIs(Post.coerce(post), post)
+        
+        print("✓ Test round_trip: Post restored from its dict")
+    
+    def test_slots(self):
+        """Test that posts carry no per-instance dict."""
+        post = Post(id='abc')
+        
+        self.assertFalse(hasattr(post, '__dict__'))
+        self.assertEqual(post.selftext, '')
+        
+        print("✓ Test slots: Post has no instance dict")
+
+if __name__ == "__main__":
+    unittest.main()
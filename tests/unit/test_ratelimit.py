@@ -0,0 +1,269 @@
+"""Unit tests for the rate limiters."""
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import os
+import sys
+import logging
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.ratelimit import WebhookRateLimiter, AsyncTokenBucket, SharedRateBudget
+from src.services.async_reddit import AsyncGovernedRequestor
+from src.services.reddit_governor import GovernedRequestor
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class FakeClock:
+    """Clock that only moves when the code under test sleeps."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def time(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+    
+    async def async_sleep(self, seconds):
+        # Concurrent waiters are tracked but do not move the clock
+        self.sleeps.append(seconds)
+
+def make_response(status_code, headers=None, body=None):
+    """Create a mock HTTP response."""
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    if body is None:
+        response.json.side_effect = ValueError("No JSON body")
+    else:
+        response.json.return_value = body
+    return response
+
+class TestWebhookRateLimiter(unittest.TestCase):
+    """Test cases for the Discord webhook rate limiter."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        self.clock = FakeClock()
+        self.limiter = WebhookRateLimiter(clock=self.clock.time, sleep=self.clock.sleep)
+        
+        print("✓ Setup complete: Created rate limiter with a fake clock")
+    
+    def test_no_wait_while_requests_remain(self):
+        """Test that requests go out immediately while the bucket is not empty."""
+        self.limiter.update(make_response(200, {'X-RateLimit-Remaining': '3', 'X-RateLimit-Reset-After': '2'}))
+        
+        self.assertEqual(self.limiter.wait(), 0.0)
+        self.assertEqual(self.clock.sleeps, [])
+        
+        print("✓ Test no_wait_while_requests_remain: No delay with requests remaining")
+    
+    def test_waits_for_reset_when_bucket_empty(self):
+        """Test that an exhausted bucket delays the next request until it resets."""
+        self.limiter.update(make_response(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '1.5'}))
+        
+        self.assertEqual(self.limiter.wait(), 1.5)
+        self.assertEqual(self.limiter.wait(), 0.0)
+        
+        print("✓ Test waits_for_reset_when_bucket_empty: Waited for the bucket to reset")
+    
+    def test_rate_limited_uses_retry_after_body(self):
+        """Test that a 429 schedules the retry from its retry_after body."""
+        retry_after = self.limiter.update(make_response(429, {'X-RateLimit-Reset-After': '9'}, {'retry_after': 0.75}))
+        
+        self.assertEqual(retry_after, 0.75)
+        self.assertEqual(self.limiter.wait(), 0.75)
+        
+        print("✓ Test rate_limited_uses_retry_after_body: Retry scheduled from the 429 body")
+    
+    def test_rate_limited_falls_back_to_headers(self):
+        """Test that a 429 without a JSON body uses the Retry-After header."""
+        retry_after = self.limiter.update(make_response(429, {'Retry-After': '2'}))
+        
+        self.assertEqual(retry_after, 2.0)
+        
+        print("✓ Test rate_limited_falls_back_to_headers: Retry scheduled from headers")
+    
+    def test_missing_headers_do_not_delay(self):
+        """Test that responses without rate limit headers do not delay requests."""
+        self.assertIsNone(self.limiter.update(make_response(204)))
+        self.assertEqual(self.limiter.wait(), 0.0)
+        
+        print("✓ Test missing_headers_do_not_delay: Missing headers ignored")
+
+class TestAsyncTokenBucket(unittest.TestCase):
+    """Test cases for the asyncio token bucket."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        self.clock = FakeClock()
+        self.bucket = AsyncTokenBucket(rate=2, capacity=2, clock=self.clock.time, sleep=self.clock.async_sleep)
+        
+        print("✓ Setup complete: Created token bucket with a fake clock")
+    
+    def test_burst_then_paced(self):
+        """Test that a full bucket allows a burst and then releases callers at its rate."""
+        async def acquire_many():
+            return await asyncio.gather(*(self.bucket.acquire() for _ in range(4)))
+        
+        delays = asyncio.run(acquire_many())
+        
+        # Two tokens are free, the next callers queue 0.5s apart
+        self.assertEqual(delays, [0.0, 0.0, 0.5, 1.0])
+        
+        print("✓ Test burst_then_paced: Burst allowed, then paced at the bucket rate")
+    
+    def test_refills_over_time(self):
+        """Test that tokens are earned back as time passes."""
+        asyncio.run(self.bucket.acquire())
+        asyncio.run(self.bucket.acquire())
+        self.clock.now += 0.5
+        
+        self.assertEqual(asyncio.run(self.bucket.acquire()), 0.0)
+        
+        print("✓ Test refills_over_time: Tokens refilled at the bucket rate")
+    
+    def test_pause(self):
+        """Test that pausing holds back the next acquisition."""
+        self.bucket.pause(3)
+        
+        self.assertEqual(asyncio.run(self.bucket.acquire()), 3.5)
+        
+        print("✓ Test pause: Acquisition delayed by the pause")
+    
+    def test_invalid_rate(self):
+        """Test that a non-positive rate is rejected."""
+        with self.assertRaises(ValueError):
+            AsyncTokenBucket(rate=0)
+        
+        print("✓ Test invalid_rate: Zero rate rejected")
+
+class TestSharedRateBudget(unittest.TestCase):
+    """Test cases for the Reddit budget shared across processes."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        self.clock = FakeClock()
+        self.clock.now = 1000.0
+        self.state_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.state_dir.name, 'budget.bin')
+        self.budget = self.create_budget()
+        
+        print("✓ Setup complete: Created shared budget with a fake clock")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        self.budget.close()
+        self.state_dir.cleanup()
+    
+    def create_budget(self, **kwargs):
+        """Create a budget of 10 requests per 100s on the shared state file."""
+        options = {'budget': 10, 'window_seconds': 100, 'burst': 2, **kwargs}
+        return SharedRateBudget(self.path, clock=self.clock.time, **options)
+    
+    def test_burst_then_spread(self):
+        """Test that a burst goes out at once and later requests are spread over the window."""
+        delays = [self.budget.reserve() for _ in range(3)]
+        
+        # 10 requests left for 100s is one every 10s, the third request waits for its slot
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 10 + 100 / 9 - 100 / 8)
+        
+        print("✓ Test burst_then_spread: Burst allowed, then spread evenly")
+    
+    def test_shared_between_instances(self):
+        """Test that every budget on the same state file sees the others' requests."""
+        other = self.create_budget()
+        try:
+            self.budget.reserve()
+            other.reserve()
+            
+            self.assertEqual(self.budget.snapshot()['remaining'], 8)
+        finally:
+            other.close()
+        
+        print("✓ Test shared_between_instances: Requests counted across instances")
+    
+    def test_update_from_headers(self):
+        """Test that the server's remaining/reset headers correct the budget, keeping the lower count within a window."""
+        self.budget.update({'X-Ratelimit-Remaining': '5.0', 'X-Ratelimit-Reset': '60'})
+        self.budget.update({'X-Ratelimit-Remaining': '7.0', 'X-Ratelimit-Reset': '60'})
+        
+        self.assertEqual(self.budget.snapshot(), {'remaining': 5.0, 'reset_in': 60.0, 'interval': 12.0})
+        
+        print("✓ Test update_from_headers: Budget taken from the rate limit headers")
+    
+    def test_waits_for_reset_when_exhausted(self):
+        """Test that a request waits for the window to reset once the budget is used up."""
+        self.budget.update({'X-Ratelimit-Remaining': '0', 'X-Ratelimit-Reset': '30'})
+        
+        self.assertEqual(self.budget.reserve(), 30.0)
+        
+        print("✓ Test waits_for_reset_when_exhausted: Request held until the window resets")
+    
+    def test_governed_requestor(self):
+        """Test that API requests wait for the budget and report their headers, token requests don't."""
+        response = MagicMock(headers={'X-Ratelimit-Remaining': '4', 'X-Ratelimit-Reset': '50'})
+        with patch('prawcore.Requestor.request', return_value=response) as mock_request:
+            requestor = GovernedRequestor(budget=self.budget, user_agent='test user agent')
+            requestor.request('post', 'https://www.reddit.com/api/v1/access_token')
+            self.assertEqual(self.budget.snapshot()['remaining'], 10)
+            
+            self.assertIs(requestor.request('get', 'https://oauth.reddit.com/r/python/new'), response)
+        
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(self.budget.snapshot()['remaining'], 4)
+        
+        print("✓ Test governed_requestor: API request paced and its headers recorded")
+    
+    def test_async_governed_requestor_awaited(self):
+        """Test the async requestor against asyncprawcore 2.x, which awaits Requestor.request."""
+        response = MagicMock(headers={'X-Ratelimit-Remaining': '4', 'X-Ratelimit-Reset': '50'})
+        
+        async def send():
+            requestor = AsyncGovernedRequestor(budget=self.budget, user_agent='test user agent')
+            await requestor.request('post', 'https://www.reddit.com/api/v1/access_token')
+            self.assertEqual(self.budget.snapshot()['remaining'], 10)
+            return await requestor.request('get', 'https://oauth.reddit.com/r/python/new')
+        
+        with patch('asyncprawcore.Requestor.request', new=AsyncMock(return_value=response)) as mock_request:
+            self.assertIs(asyncio.run(send()), response)
+        
+        self.assertEqual(mock_request.await_count, 2)
+        self.assertEqual(self.budget.snapshot()['remaining'], 4)
+        
+        print("✓ Test async_governed_requestor_awaited: Awaited API request paced and its headers recorded")
+    
+    def test_async_governed_requestor_context(self):
+        """Test the async requestor against later asyncprawcore releases, which enter Requestor.request."""
+        response = MagicMock(headers={'X-Ratelimit-Remaining': '4', 'X-Ratelimit-Reset': '50'})
+        released = []
+        
+        @asynccontextmanager
+        async def request(requestor, *args, **kwargs):
+            yield response
+            released.append(args[1])
+        
+        async def send():
+            requestor = AsyncGovernedRequestor(budget=self.budget, user_agent='test user agent')
+            async with requestor.request('get', 'https://oauth.reddit.com/r/python/new') as received:
+                self.assertEqual(released, [])
+                return received
+        
+        with patch('asyncprawcore.Requestor.request', new=request):
+            self.assertIs(asyncio.run(send()), response)
+        
+        # Verify the headers were recorded and the response released on exit
+        self.assertEqual(self.budget.snapshot()['remaining'], 4)
+        self.assertEqual(released, ['https://oauth.reddit.com/r/python/new'])
+        
+        print("✓ Test async_governed_requestor_context: Entered API request paced and released")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,13 +4,17 @@ from unittest.mock import patch, MagicMock, call
 import os
 import sys
 import logging
-from datetime import datetime
-import pytz
+import threading
+import time
+from datetime import datetime, timezone
+
+import praw
 
 # Configure path to import modules from src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from src.services.reddit import RedditService
+from src.services.reddit_governor import GovernedRequestor
 
 # Disable logging during tests
 logging.disable(logging.CRITICAL)
@@ -22,7 +26,7 @@ class TestRedditService(unittest.TestCase):
         """Set up test environment before each test."""
         # Create patches for external dependencies
         self.praw_patch = patch('src.services.reddit.praw')
-        self.mongo_patch = patch('src.services.reddit.MongoDBService')
+        self.mongo_patch = patch('src.services.mongodb.MongoDBService')
         
         # Start patches
         self.mock_praw = self.praw_patch.start()
@@ -33,11 +37,10 @@ class TestRedditService(unittest.TestCase):
         self.mock_praw.Reddit.return_value = self.mock_reddit
         
         self.mock_mongo_service = MagicMock()
+        self.mock_mongo_service.get_checkpoint.return_value = None
+        self.mock_mongo_service.recent_post_ids.return_value = []
         self.mock_mongo.return_value = self.mock_mongo_service
         
-        # Initialize the service
-        self.reddit_service = RedditService()
-        
         # Setup environment variables for testing
         os.environ['REDDIT_CLIENT_ID'] = 'test_client_id'
         os.environ['REDDIT_CLIENT_SECRET'] = 'test_client_secret'
@@ -45,6 +48,9 @@ class TestRedditService(unittest.TestCase):
         os.environ['SUB_NAMES'] = 'python,programming'
         os.environ['VALID_FLAIRS'] = 'Discussion,Help'
         
+        # Initialize the service
+        self.reddit_service = RedditService()
+        
         print("✓ Setup complete: Created mock Reddit and MongoDB service")
     
     def tearDown(self):
@@ -56,70 +62,63 @@ class TestRedditService(unittest.TestCase):
         print("✓ Teardown complete: Stopped all patches")
     
     def test_create_client(self):
-        """Test Reddit client creation with proper credentials."""
-        # The client is already created in setUp, we just test the calls
+        """Test that the Reddit client is created with proper credentials on first use."""
+        self.mock_praw.Reddit.assert_not_called()
+        
+        self.assertIs(self.reddit_service.reddit, self.mock_reddit)
+        self.assertIs(self.reddit_service.reddit, self.mock_reddit)
         self.mock_praw.Reddit.assert_called_once_with(
             client_id='test_client_id',
             client_secret='test_client_secret',
-            user_agent='test_user_agent'
+            user_agent='test_user_agent',
+            requestor_class=GovernedRequestor,
+            requestor_kwargs={'budget': self.reddit_service.rate_budget}
         )
         
         print("✓ Test create_client: Reddit client created with correct credentials")
     
+    def test_create_client_without_governor(self):
+        """Test that REDDIT_RATE_GOVERNOR=false leaves praw's own requestor in place."""
+        os.environ['REDDIT_RATE_GOVERNOR'] = 'false'
+        try:
+            service = RedditService()
+            self.assertIs(service.reddit, self.mock_reddit)
+        finally:
+            del os.environ['REDDIT_RATE_GOVERNOR']
+        
+        self.assertIsNone(service.rate_budget)
+        self.mock_praw.Reddit.assert_called_once_with(
+            client_id='test_client_id',
+            client_secret='test_client_secret',
+            user_agent='test_user_agent'
+        )
+        
+        print("✓ Test create_client_without_governor: Reddit client created without the shared budget")
+    
     def test_calculate_time_difference_minutes(self):
         """Test time difference calculation for minutes."""
-        # Mock the datetime.now() to return a fixed time
-        with patch('src.services.reddit.datetime') as mock_datetime:
-            # Set fixed now time
-            fixed_now = datetime(2023, 1, 1, 12, 10, 0, tzinfo=pytz.timezone('Asia/Kolkata'))
-            mock_datetime.now.return_value = fixed_now
-            
-            # Use non-mocked datetime for the timestamp (10 minutes ago)
-            post_time = datetime(2023, 1, 1, 12, 0, 0)
-            post_time_utc = post_time.replace(tzinfo=pytz.UTC)
-            timestamp = post_time_utc.timestamp()
-            
-            # Mock the utcfromtimestamp to return our fixed time
-            mock_datetime.utcfromtimestamp.return_value = post_time
-            
-            # Test the function
-            result = self.reddit_service.calculate_time_difference(timestamp)
-            
-            # Verify the result
-            self.assertIn('10.00 minutes', result)
-            
-            print(f"✓ Test calculate_time_difference_minutes: Result '{result}' includes minutes")
+        timestamp = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+        
+        result = self.reddit_service.calculate_time_difference(timestamp, now=timestamp + 600)
+        
+        # Verify the age and the creation time in India Standard Time
+        self.assertEqual(result, '10.00 minutes (created 2023/01/01-17:30)')
+        
+        print(f"✓ Test calculate_time_difference_minutes: Result '{result}' includes minutes")
     
     def test_calculate_time_difference_hours(self):
         """Test time difference calculation for hours."""
-        # Mock the datetime.now() to return a fixed time
-        with patch('src.services.reddit.datetime') as mock_datetime:
-            # Set fixed now time
-            fixed_now = datetime(2023, 1, 1, 14, 0, 0, tzinfo=pytz.timezone('Asia/Kolkata'))
-            mock_datetime.now.return_value = fixed_now
-            
-            # Use non-mocked datetime for the timestamp (2 hours ago)
-            post_time = datetime(2023, 1, 1, 12, 0, 0)
-            post_time_utc = post_time.replace(tzinfo=pytz.UTC)
-            timestamp = post_time_utc.timestamp()
-            
-            # Mock the utcfromtimestamp to return our fixed time
-            mock_datetime.utcfromtimestamp.return_value = post_time
-            
-            # Test the function
-            result = self.reddit_service.calculate_time_difference(timestamp)
-            
-            # Verify the result
-            self.assertIn('2.00 hours', result)
-            
-            print(f"✓ Test calculate_time_difference_hours: Result '{result}' includes hours")
+        timestamp = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+        
+        result = self.reddit_service.calculate_time_difference(timestamp, now=timestamp + 7200)
+        
+        # Verify the result
+        self.assertEqual(result, '2.00 hours (created 2023/01/01-17:30)')
+        
+        print(f"✓ Test calculate_time_difference_hours: Result '{result}' includes hours")
     
     def test_get_filtered_posts(self):
         """Test retrieving filtered posts from a subreddit."""
-        # Mock the subreddit
-        mock_subreddit = MagicMock()
-        self.mock_reddit.subreddit.return_value = mock_subreddit
-        
         # Create mock posts
         mock_post1 = MagicMock(
             id='post1',
@@ -146,16 +145,16 @@ class TestRedditService(unittest.TestCase):
             selftext='Post content 3'
         )
         
-        # Setup mock post existence check
-        self.mock_mongo_service.check_post_exists.side_effect = [False, False, False]
+        # Setup mock claim (no post has been seen yet)
+        self.mock_mongo_service.claim_posts.side_effect = lambda ids, collection: list(ids)
         
         # Setup mock time difference calculation
         with patch.object(
             self.reddit_service, 'calculate_time_difference',
             side_effect=['2 hours ago', '1 hour ago', '0 hours ago']
         ):
-            # Setup the subreddit.new() to return our mock posts
-            mock_subreddit.new.return_value = [mock_post1, mock_post2, mock_post3]
+            # Setup the listing request to return our mock posts
+            self.mock_reddit.get.return_value = [mock_post1, mock_post2, mock_post3]
             
             # Call the function
             result = self.reddit_service.get_filtered_posts('python')
@@ -165,28 +164,271 @@ class TestRedditService(unittest.TestCase):
             self.assertEqual(result[0]['id'], 'post1')
             self.assertEqual(result[1]['id'], 'post2')
             
-            # Verify MongoDB calls
-            self.mock_mongo_service.check_post_exists.assert_has_calls([
-                call('post1', 'python'),
-                call('post2', 'python')
-            ])
-            
-            self.mock_mongo_service.insert_post.assert_has_calls([
-                call('post1', 'python'),
-                call('post2', 'python')
-            ])
+            # Verify MongoDB is claimed once for the whole batch
+            self.mock_mongo_service.claim_posts.assert_called_once_with(['post1', 'post2'], 'python')
+            self.mock_mongo_service.check_post_exists.assert_not_called()
+            self.mock_mongo_service.insert_post.assert_not_called()
             
             print(f"✓ Test get_filtered_posts: Retrieved {len(result)} posts with correct filtering")
     
+    def test_get_filtered_posts_skips_seen(self):
+        """Test that posts already stored in MongoDB are not returned again."""
+        self.mock_reddit.get.return_value = [
+            MagicMock(id='old', link_flair_text='Help', created_utc=0, title='Old', url='u', selftext=''),
+            MagicMock(id='new', link_flair_text='Help', created_utc=0, title='New', url='u', selftext='')
+        ]
+        self.mock_mongo_service.claim_posts.return_value = ['new']
+        
+        with patch.object(self.reddit_service, 'calculate_time_difference', return_value='now'):
+            result = self.reddit_service.get_filtered_posts('python')
+        
+        # Verify only the newly claimed post is returned
+        self.assertEqual([post['id'] for post in result], ['new'])
+        self.mock_mongo_service.claim_posts.assert_called_once_with(['old', 'new'], 'python')
+        
+        print("✓ Test get_filtered_posts_skips_seen: Seen posts filtered with one batch claim")
+    
+    def test_repeated_polls_use_seen_cache(self):
+        """Test that posts already seen by this process are not checked against MongoDB again."""
+        known = MagicMock(id='known', link_flair_text='Help', created_utc=0, title='Known', url='u', selftext='')
+        new = MagicMock(id='new', link_flair_text='Help', created_utc=0, title='New', url='u', selftext='')
+        self.mock_mongo_service.claim_posts.side_effect = lambda ids, collection: list(ids)
+        
+        with patch.object(self.reddit_service, 'calculate_time_difference', return_value='now'):
+            self.mock_reddit.get.return_value = [known]
+            self.reddit_service.get_filtered_posts('python')
+            self.mock_reddit.get.return_value = [new, known]
+            result = self.reddit_service.get_filtered_posts('python')
+        
+        # Verify only the genuinely new post reached MongoDB on the second poll
+        self.assertEqual([post['id'] for post in result], ['new'])
+        self.mock_mongo_service.claim_posts.assert_called_with(['new'], 'python')
+        
+        print("✓ Test repeated_polls_use_seen_cache: Known posts answered from memory")
+    
+    def test_fetch_new_submissions_without_checkpoint(self):
+        """Test the first fetch of a subreddit reads the newest posts in one request."""
+        self.mock_reddit.get.return_value = [
+            MagicMock(fullname='t3_b', created_utc=200),
+            MagicMock(fullname='t3_a', created_utc=100)
+        ]
+        
+        # Call the function
+        result = self.reddit_service.fetch_new_submissions('python')
+        
+        # Verify the newest posts were fetched, the checkpoint waits for the claim
+        self.mock_reddit.get.assert_called_once_with('r/python/new', params={'limit': 20})
+        self.assertEqual(len(result), 2)
+        self.mock_mongo_service.set_checkpoint.assert_not_called()
+        
+        print("✓ Test fetch_new_submissions_without_checkpoint: Newest posts fetched")
+    
+    def test_checkpoint_saved_after_claim(self):
+        """Test that the checkpoint only moves past submissions once they are claimed."""
+        self.mock_reddit.get.return_value = [
+            MagicMock(id='b', fullname='t3_b', created_utc=200, link_flair_text='Help', title='B', url='u', selftext=''),
+            MagicMock(id='a', fullname='t3_a', created_utc=100, link_flair_text='Help', title='A', url='u', selftext='')
+        ]
+        
+        # A failed claim leaves the checkpoint where it was, so the next run refetches the posts
+        self.mock_mongo_service.claim_posts.side_effect = RuntimeError('MongoDB unavailable')
+        self.assertEqual(self.reddit_service.get_filtered_posts('python'), [])
+        self.mock_mongo_service.set_checkpoint.assert_not_called()
+        
+        self.mock_mongo_service.claim_posts.side_effect = lambda ids, collection: list(ids)
+        result = RedditService().get_filtered_posts('python')
+        
+        # Verify the claimed posts were returned and the checkpoint set to the newest one
+        self.assertEqual([post['id'] for post in result], ['b', 'a'])
+        self.mock_mongo_service.set_checkpoint.assert_called_once_with('python', 't3_b', 200)
+        
+        print("✓ Test checkpoint_saved_after_claim: Checkpoint advanced only after the claim")
+    
+    def test_fetch_new_submissions_pages_from_checkpoint(self):
+        """Test that fetching pages forward with 'before' until caught up."""
+        self.mock_mongo_service.get_checkpoint.return_value = {
+            'fullname': 't3_old', 'created_utc': 50, 'checked_utc': time.time()
+        }
+        
+        # A full page of 100 posts followed by a partial page of newer posts
+        first_page = [MagicMock(fullname=f't3_p1_{i}', created_utc=200 - i) for i in range(100)]
+        second_page = [MagicMock(fullname=f't3_p2_{i}', created_utc=300 - i) for i in range(3)]
+        self.mock_reddit.get.side_effect = [first_page, second_page]
+        
+        # Call the function
+        result = self.reddit_service.fetch_new_submissions('python')
+        
+        # Verify paging started at the checkpoint and continued from the newest post of each page
+        self.assertEqual(self.mock_reddit.get.call_args_list, [
+            call('r/python/new', params={'limit': 100, 'before': 't3_old'}),
+            call('r/python/new', params={'limit': 100, 'before': 't3_p1_0'})
+        ])
+        
+        # Verify all new posts are returned newest first
+        self.assertEqual(len(result), 103)
+        self.assertEqual(result[0].fullname, 't3_p2_0')
+        
+        print("✓ Test fetch_new_submissions_pages_from_checkpoint: Paged forward from the checkpoint")
+    
+    def test_quiet_subreddit_single_request(self):
+        """Test through a real praw client that a short page after the checkpoint costs exactly one request."""
+        reddit = praw.Reddit(client_id='test_client_id', client_secret='test_client_secret', user_agent='test_user_agent')
+        self.mock_praw.Reddit.return_value = reddit
+        self.mock_mongo_service.get_checkpoint.return_value = {
+            'fullname': 't3_old', 'created_utc': 50, 'checked_utc': time.time()
+        }
+        self.mock_mongo_service.claim_posts.side_effect = lambda ids, collection: list(ids)
+        
+        # Reddit sets 'after' on the short page, praw's listing generator would follow it with a second request
+        page = {'kind': 'Listing', 'data': {'after': 't3_p1', 'before': None, 'children': [
+            {'kind': 't3', 'data': {'id': 'p1', 'name': 't3_p1', 'created_utc': 300, 'title': 'New',
+                                    'subreddit': 'python', 'link_flair_text': 'Help', 'url': 'u', 'selftext': ''}}
+        ]}}
+        with patch.object(reddit._core, 'request', return_value=page) as mock_request:
+            result = self.reddit_service.get_filtered_posts('python')
+        
+        # Verify one request from the checkpoint, without an 'after' cursor
+        mock_request.assert_called_once()
+        self.assertEqual(mock_request.call_args[1]['path'], 'r/python/new')
+        self.assertEqual(mock_request.call_args[1]['params'], {'limit': 100, 'before': 't3_old'})
+        self.assertEqual([post['id'] for post in result], ['p1'])
+        self.mock_mongo_service.set_checkpoint.assert_called_once_with('python', 't3_p1', 300)
+        
+        print("✓ Test quiet_subreddit_single_request: One request per page from the checkpoint")
+    
+    def test_fetch_new_submissions_caught_up(self):
+        """Test that an empty page after a checkpoint post that is still listed means caught up."""
+        self.mock_mongo_service.get_checkpoint.return_value = {'fullname': 't3_old', 'created_utc': 100}
+        self.mock_reddit.get.side_effect = [[], [MagicMock(fullname='t3_old', removed_by_category=None)]]
+        
+        # Call the function
+        result = self.reddit_service.fetch_new_submissions('python')
+        
+        # Verify the checkpoint post was looked up and nothing else was fetched
+        self.assertEqual(result, [])
+        self.assertEqual(self.mock_reddit.get.call_args_list[1], call('api/info', params={'id': 't3_old'}))
+        self.assertEqual(self.mock_reddit.get.call_count, 2)
+        
+        print("✓ Test fetch_new_submissions_caught_up: Live checkpoint confirmed with one lookup")
+    
+    def test_fetch_new_submissions_stale_checkpoint(self):
+        """Test falling back to timestamps right away when the checkpoint post was removed."""
+        self.mock_mongo_service.get_checkpoint.return_value = {'fullname': 't3_deleted', 'created_utc': 100}
+        removed = MagicMock(fullname='t3_deleted', removed_by_category='deleted')
+        
+        # More posts since the checkpoint than fit on one page
+        first_page = [MagicMock(fullname=f't3_p1_{i}', created_utc=400 - i) for i in range(100)]
+        second_page = [MagicMock(fullname=f't3_p2_{i}', created_utc=150 - i) for i in range(100)]
+        self.mock_reddit.get.side_effect = [[], [removed], first_page, second_page]
+        
+        # Call the function
+        result = self.reddit_service.fetch_new_submissions('python')
+        
+        # Verify paging went back from the newest post until it passed the checkpoint's time
+        self.assertEqual(self.mock_reddit.get.call_args_list[2:], [
+            call('r/python/new', params={'limit': 100}),
+            call('r/python/new', params={'limit': 100, 'after': 't3_p1_99'})
+        ])
+        self.assertEqual(len(result), 150)
+        self.assertEqual(result[-1].created_utc, 101)
+        
+        print("✓ Test fetch_new_submissions_stale_checkpoint: Stale checkpoint recovered without a post limit")
+    
+    def test_stream_posts(self):
+        """Test streaming new posts from a combined multi-subreddit listing."""
+        def submission(post_id, subreddit):
+            return MagicMock(id=post_id, subreddit=subreddit, link_flair_text='Help',
+                             created_utc=0, title=post_id, url='u', selftext='')
+        
+        mock_multi = MagicMock()
+        self.mock_reddit.subreddit.return_value = mock_multi
+        mock_multi.stream.submissions.return_value = iter([
+            submission('post1', 'Python'),
+            submission('post2', 'programming'),
+            None,
+            None,
+            submission('post3', 'python'),
+            None
+        ])
+        self.mock_mongo_service.claim_posts.side_effect = lambda ids, collection: list(ids)
+        
+        with patch.object(self.reddit_service, 'calculate_time_difference', return_value='now'):
+            batches = list(self.reddit_service.stream_posts())
+        
+        # Verify the seen cache was warmed and one combined stream was opened
+        self.mock_mongo_service.recent_post_ids.assert_has_calls([call('python', 1000), call('programming', 1000)])
+        self.mock_reddit.subreddit.assert_called_once_with('python+programming')
+        
+        # Verify a batch is yielded each time the stream catches up
+        self.assertEqual([[post['id'] for post in batch] for batch in batches], [['post1', 'post2'], [], ['post3']])
+        
+        # Verify posts are claimed in their configured subreddit collection
+        self.mock_mongo_service.claim_posts.assert_has_calls([
+            call(['post1'], 'python'),
+            call(['post2'], 'programming'),
+            call(['post3'], 'python')
+        ])
+        
+        print("✓ Test stream_posts: Streamed posts batched and claimed per subreddit")
+    
+    def test_get_all_posts_combined(self):
+        """Test combined fetch mode splits one multireddit listing back per subreddit."""
+        os.environ['FETCH_MODE'] = 'combined'
+        reddit_service = RedditService()
+        del os.environ['FETCH_MODE']
+        
+        def submission(post_id, subreddit):
+            return MagicMock(id=post_id, subreddit=subreddit, link_flair_text='Help', fullname=f't3_{post_id}',
+                             created_utc=100, title=post_id, url='u', selftext='')
+        
+        self.mock_reddit.get.return_value = [
+            submission('post1', 'programming'),
+            submission('post2', 'Python'),
+            submission('post3', 'python')
+        ]
+        self.mock_mongo_service.claim_posts.side_effect = lambda ids, collection: list(ids)
+        
+        with patch.object(reddit_service, 'calculate_time_difference', return_value='now'):
+            result = reddit_service.get_all_posts()
+        
+        # Verify a single combined listing request replaced the per-subreddit ones
+        self.mock_reddit.get.assert_called_once_with('r/python+programming/new', params={'limit': 100})
+        self.mock_mongo_service.set_checkpoint.assert_called_once_with('python+programming', 't3_post1', 100)
+        
+        # Verify posts were split back per subreddit in SUB_NAMES order
+        self.assertEqual([[post['id'] for post in posts] for posts in result], [['post2', 'post3'], ['post1']])
+        self.assertEqual(result[0][0]['subreddit'], 'python')
+        
+        print("✓ Test get_all_posts_combined: One multireddit request split back per subreddit")
+    
+    def test_get_all_posts_combined_chunks(self):
+        """Test combined fetch mode chunks SUB_NAMES into several multireddits."""
+        os.environ['FETCH_MODE'] = 'combined'
+        os.environ['MULTIREDDIT_CHUNK_SIZE'] = '2'
+        os.environ['SUB_NAMES'] = 'a,b,c'
+        reddit_service = RedditService()
+        del os.environ['FETCH_MODE']
+        del os.environ['MULTIREDDIT_CHUNK_SIZE']
+        
+        results = {'a+b': [['a_post'], ['b_post']], 'c': [['c_post']]}
+        with patch.object(reddit_service, 'get_combined_posts', side_effect=lambda names: results['+'.join(names)]):
+            result = reddit_service.get_all_posts()
+        
+        # Verify the chunk results are flattened back into one list per subreddit
+        self.assertEqual(result, [['a_post'], ['b_post'], ['c_post']])
+        
+        print("✓ Test get_all_posts_combined_chunks: Subreddits chunked into multireddit requests")
+    
     def test_get_all_posts(self):
         """Test getting posts from all configured subreddits."""
-        # Mock get_filtered_posts to return predefined results
+        # Mock get_filtered_posts to return predefined results per subreddit
+        results = {
+            'python': [{'id': 'post1', 'subreddit': 'python'}],
+            'programming': [{'id': 'post2', 'subreddit': 'programming'}]
+        }
         with patch.object(
             self.reddit_service, 'get_filtered_posts',
-            side_effect=[
-                [{'id': 'post1', 'subreddit': 'python'}], 
-                [{'id': 'post2', 'subreddit': 'programming'}]
-            ]
+            side_effect=lambda name: results[name]
         ):
             # Call the function
             result = self.reddit_service.get_all_posts()
@@ -196,14 +438,56 @@ class TestRedditService(unittest.TestCase):
             self.assertEqual(len(result[0]), 1)  # One post from first subreddit
             self.assertEqual(len(result[1]), 1)  # One post from second subreddit
             
-            # Check the calls
+            # Check the calls (subreddits are fetched concurrently)
             self.reddit_service.get_filtered_posts.assert_has_calls([
                 call('python'),
                 call('programming')
-            ])
+            ], any_order=True)
             
             print(f"✓ Test get_all_posts: Correctly retrieved posts from all configured subreddits")
     
+    def test_get_all_posts_concurrent(self):
+        """Test that subreddits are fetched in parallel and results keep SUB_NAMES order."""
+        os.environ['SUB_NAMES'] = 'slow,fast'
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def fetch(name):
+            # Both fetches must be in flight at the same time to pass the barrier
+            barrier.wait()
+            if name == 'slow':
+                time.sleep(0.05)
+            return [{'id': f'{name}_post', 'subreddit': name}]
+        
+        with patch.object(self.reddit_service, 'get_filtered_posts', side_effect=fetch):
+            result = self.reddit_service.get_all_posts()
+        
+        # Verify the slow subreddit still comes first
+        self.assertEqual([posts[0]['id'] for posts in result], ['slow_post', 'fast_post'])
+        
+        print("✓ Test get_all_posts_concurrent: Subreddits fetched in parallel with ordered results")
+    
+    def test_client_per_worker_thread(self):
+        """Test that concurrent workers never share a praw client."""
+        os.environ['SUB_NAMES'] = 'a,b'
+        self.mock_praw.Reddit.side_effect = lambda **kwargs: MagicMock()
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def fetch(name):
+            # Both workers hold their client at the same time
+            client = self.reddit_service.reddit
+            barrier.wait()
+            self.assertIs(self.reddit_service.reddit, client)
+            return [client]
+        
+        with patch.object(self.reddit_service, 'get_filtered_posts', side_effect=fetch):
+            result = self.reddit_service.get_all_posts()
+        
+        # Verify each worker built its own client, and the main thread's is separate again
+        self.assertIsNot(result[0][0], result[1][0])
+        self.assertNotIn(self.reddit_service.reddit, [result[0][0], result[1][0]])
+        
+        print("✓ Test client_per_worker_thread: One praw client per worker thread")
+    
     def test_empty_subreddit_names(self):
         """Test behavior when no subreddit names are configured."""
         os.environ['SUB_NAMES'] = ''
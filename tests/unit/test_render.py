@@ -0,0 +1,93 @@
+"""Unit tests for the message renderer."""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import logging
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.bots.render import (
+    DISCORD_EMBED,
+    MAX_DISCORD_CONTENT_CHARS,
+    MAX_SLACK_TEXT_CHARS,
+    MAX_TELEGRAM_TEXT_CHARS,
+    TELEGRAM_HTML,
+    TELEGRAM_MARKDOWN_V2,
+    MessageRenderer,
+    escape_markdown_v2,
+)
+from src.services.post import MAX_EXCERPT_CHARS, Post
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestMessageRenderer(unittest.TestCase):
+    """Test cases for MessageRenderer."""
+    
+    def setUp(self):
+        """Create a renderer and a post with Markdown in its title."""
+        self.renderer = MessageRenderer(maxsize=2)
+        self.post = Post(id='abc', title='Use *args and my_var [v1.2]', url='https://redd.it/abc',
+                         subreddit='python', flair='Help', selftext='a < b & c')
+    
+    def test_markdown_v2_escaped(self):
+        """Test that Markdown characters of the post are escaped, keeping the message's own formatting."""
+        message = self.renderer.render(self.post, TELEGRAM_MARKDOWN_V2, '1.50 minutes')
+        
+        self.assertEqual(message, (
+            "*New Post from r/python* \\[Help\\]\n"
+            "*Title:* Use \\*args and my\\_var \\[v1\\.2\\]\n"
+            "*Posted:* 1\\.50 minutes\n"
+            "*URL:* https://redd\\.it/abc\n\n"
+            "a < b & c"
+        ))
+        
+        print("✓ Test markdown_v2_escaped: MarkdownV2 message escaped")
+    
+    def test_html_escaped(self):
+        """Test that HTML special characters of the post are escaped."""
+        message = self.renderer.render(self.post, TELEGRAM_HTML, '1.50 minutes')
+        
+        self.assertIn("<b>Title:</b> Use *args and my_var [v1.2]\n", message)
+        self.assertTrue(message.endswith("\n\na &lt; b &amp; c"))
+        
+        print("✓ Test html_escaped: HTML message escaped")
+    
+    def test_rendered_once_per_format(self):
+        """Test that a post is rendered once per format and only the age changes between sends."""
+        with patch.object(self.renderer, '_render_template', wraps=self.renderer._render_template) as mock_render:
+            first = self.renderer.render(self.post, DISCORD_EMBED, '1.00 minutes')
+            second = self.renderer.render(self.post, DISCORD_EMBED, '2.00 minutes')
+            self.renderer.render(self.post, TELEGRAM_HTML, '2.00 minutes')
+        
+        self.assertEqual(mock_render.call_count, 2)
+        self.assertEqual(first['fields'][0]['value'], '1.00 minutes')
+        self.assertEqual(second['fields'][0]['value'], '2.00 minutes')
+        self.assertEqual(first['fields'][1:], second['fields'][1:])
+        
+        print("✓ Test rendered_once_per_format: Cached template reused with a fresh age")
+    
+    def test_unknown_format(self):
+        """Test that an unknown output format is rejected."""
+        with self.assertRaises(ValueError):
+            self.renderer.render(self.post, 'irc', '1.00 minutes')
+        
+        print("✓ Test unknown_format: Unknown format rejected")
+    
+    def test_excerpts_fit_kept_body(self):
+        """Test that no format shows more of the body than a post keeps."""
+        for limit in (MAX_DISCORD_CONTENT_CHARS, MAX_TELEGRAM_TEXT_CHARS, MAX_SLACK_TEXT_CHARS):
+            self.assertLessEqual(limit, MAX_EXCERPT_CHARS)
+        
+        print("✓ Test excerpts_fit_kept_body: Every excerpt within the kept body")
+    
+    def test_escape_markdown_v2(self):
+        """Test that every reserved MarkdownV2 character is escaped."""
+        self.assertEqual(escape_markdown_v2('_*[]()~`>#+-=|{}.!\\'), '\\_\\*\\[\\]\\(\\)\\~\\`\\>\\#\\+\\-\\=\\|\\{\\}\\.\\!\\\\')
+        
+        print("✓ Test escape_markdown_v2: Reserved characters escaped")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Unit tests for the routing table."""
+import unittest
+import os
+import sys
+import json
+import logging
+import tempfile
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.routing import RoutingTable
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestRoutingTable(unittest.TestCase):
+    """Test cases for the routing table."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        self.destinations = {
+            'python-discord': {'type': 'discord', 'webhook_url': 'https://example.com/python'},
+            'help-telegram': {'type': 'telegram', 'chat_id': '-100'},
+            'firehose': {'type': 'discord', 'webhook_url': 'https://example.com/all'}
+        }
+        self.routes = [
+            {'subreddits': ['Python'], 'destinations': ['python-discord']},
+            {'flairs': ['Help'], 'destinations': ['help-telegram']},
+            {'subreddits': ['learnpython'], 'flairs': ['Discussion', 'Help'], 'destinations': ['python-discord']},
+            {'destinations': ['firehose']}
+        ]
+        self.table = RoutingTable(self.destinations, self.routes)
+        
+        print("✓ Setup complete: Compiled routing table")
+    
+    def test_route_by_subreddit(self):
+        """Test that a subreddit route matches any flair, case-insensitively."""
+        result = self.table.route({'subreddit': 'python', 'flair': 'Meta'})
+        
+        self.assertEqual(result, {'python-discord', 'firehose'})
+        
+        print("✓ Test route_by_subreddit: Subreddit route matched")
+    
+    def test_route_by_flair(self):
+        """Test that a flair route matches in any subreddit."""
+        result = self.table.route({'subreddit': 'programming', 'flair': 'help'})
+        
+        self.assertEqual(result, {'help-telegram', 'firehose'})
+        
+        print("✓ Test route_by_flair: Flair route matched")
+    
+    def test_route_by_subreddit_and_flair(self):
+        """Test that a route with both subreddits and flairs needs both to match."""
+        self.assertEqual(
+            self.table.route({'subreddit': 'learnpython', 'flair': 'Discussion'}),
+            {'python-discord', 'firehose'}
+        )
+        self.assertEqual(self.table.route({'subreddit': 'learnpython', 'flair': 'Meta'}), {'firehose'})
+        
+        print("✓ Test route_by_subreddit_and_flair: Combined route matched only on both")
+    
+    def test_route_without_flair(self):
+        """Test that posts without a flair only match flair wildcards."""
+        result = self.table.route({'subreddit': 'learnpython', 'flair': None})
+        
+        self.assertEqual(result, {'firehose'})
+        
+        print("✓ Test route_without_flair: Unflaired post matched wildcard routes")
+    
+    def test_unknown_destination(self):
+        """Test that a route to an undefined destination is rejected."""
+        with self.assertRaises(ValueError):
+            RoutingTable(self.destinations, [{'destinations': ['missing']}])
+        
+        print("✓ Test unknown_destination: Undefined destination rejected")
+    
+    def test_unknown_destination_type(self):
+        """Test that a destination of an unknown type is rejected."""
+        with self.assertRaises(ValueError):
+            RoutingTable({'sms': {'type': 'sms'}}, [])
+        
+        print("✓ Test unknown_destination_type: Unknown destination type rejected")
+    
+    def test_from_file(self):
+        """Test loading a routing table from a JSON file."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as config_file:
+            json.dump({'destinations': self.destinations, 'routes': self.routes}, config_file)
+        
+        try:
+            table = RoutingTable.from_file(config_file.name)
+        finally:
+            os.unlink(config_file.name)
+        
+        self.assertEqual(table.route({'subreddit': 'python', 'flair': 'Help'}), set(self.destinations))
+        
+        print("✓ Test from_file: Routing table loaded from JSON")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,113 @@
+"""Unit tests for the seen post ID cache."""
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+import os
+import sys
+import logging
+import asyncio
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.services.seen_cache import SeenCache
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestSeenCache(unittest.TestCase):
+    """Test cases for the seen post ID cache."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        # The store claims whatever it is given, like an empty database
+        self.mock_store = MagicMock()
+        self.mock_store.claim_posts.side_effect = lambda post_ids, collection_name: list(post_ids)
+        self.seen_cache = SeenCache(self.mock_store, size=3)
+        
+        print("✓ Setup complete: Created seen cache over a mock store")
+    
+    def test_claim_posts_only_sends_misses(self):
+        """Test that IDs seen before are answered from memory on the next poll."""
+        first = self.seen_cache.claim_posts(['post1', 'post2'], 'python')
+        second = self.seen_cache.claim_posts(['post1', 'post2', 'post3'], 'python')
+        
+        # Verify the second poll only asked the store about the new ID
+        self.assertEqual(first, ['post1', 'post2'])
+        self.assertEqual(second, ['post3'])
+        self.mock_store.claim_posts.assert_called_with(['post3'], 'python')
+        
+        print("✓ Test claim_posts_only_sends_misses: Only new IDs reached the store")
+    
+    def test_claim_posts_all_cached(self):
+        """Test that a fully cached poll never touches the store."""
+        self.seen_cache.claim_posts(['post1'], 'python')
+        self.mock_store.claim_posts.reset_mock()
+        
+        self.assertEqual(self.seen_cache.claim_posts(['post1'], 'python'), [])
+        self.mock_store.claim_posts.assert_not_called()
+        
+        print("✓ Test claim_posts_all_cached: Cached poll answered from memory")
+    
+    def test_collections_are_separate(self):
+        """Test that each collection has its own cache."""
+        self.seen_cache.claim_posts(['post1'], 'python')
+        
+        self.assertEqual(self.seen_cache.claim_posts(['post1'], 'programming'), ['post1'])
+        
+        print("✓ Test collections_are_separate: Caches kept per collection")
+    
+    def test_warm(self):
+        """Test warming keeps the most recently seen IDs when the store has more than fit."""
+        self.mock_store.recent_post_ids.return_value = ['post4', 'post3', 'post2', 'post1']
+        
+        self.seen_cache.warm(['python'])
+        
+        # Verify the three newest IDs were loaded
+        self.mock_store.recent_post_ids.assert_called_once_with('python', 3)
+        cache = self.seen_cache.cache_for('python')
+        self.assertEqual([post_id in cache for post_id in ['post1', 'post2', 'post3', 'post4']], [False, True, True, True])
+        
+        print("✓ Test warm: Cache warmed with the newest IDs")
+    
+    def test_filter_unseen(self):
+        """Test that IDs the store already has are cached as seen."""
+        self.mock_store.filter_unseen.return_value = ['post2']
+        
+        self.assertEqual(self.seen_cache.filter_unseen(['post1', 'post2'], 'python'), ['post2'])
+        self.assertEqual(self.seen_cache.filter_unseen(['post1'], 'python'), [])
+        self.mock_store.filter_unseen.assert_called_once_with(['post1', 'post2'], 'python')
+        
+        print("✓ Test filter_unseen: Known IDs cached after one lookup")
+    
+    def test_passes_through_other_methods(self):
+        """Test that checkpoints and other store methods are passed through."""
+        self.mock_store.get_checkpoint.return_value = {'fullname': 't3_abc'}
+        
+        self.assertEqual(self.seen_cache.get_checkpoint('python'), {'fullname': 't3_abc'})
+        self.assertIs(self.seen_cache.db, self.mock_store.db)
+        
+        print("✓ Test passes_through_other_methods: Other methods reach the store")
+    
+    def test_async_store(self):
+        """Test that the cache awaits an asynchronous store and still only sends misses."""
+        async_store = MagicMock()
+        async_store.claim_posts = AsyncMock(side_effect=lambda post_ids, collection_name: list(post_ids))
+        seen_cache = SeenCache(async_store, size=3, asynchronous=True)
+        
+        async def poll_twice():
+            first = await seen_cache.claim_posts(['post1', 'post2'], 'python')
+            second = await seen_cache.claim_posts(['post1', 'post2', 'post3'], 'python')
+            return first, second
+        
+        first, second = asyncio.run(poll_twice())
+        
+        # Verify the second poll only awaited the store for the new ID
+        self.assertEqual(first, ['post1', 'post2'])
+        self.assertEqual(second, ['post3'])
+        async_store.claim_posts.assert_awaited_with(['post3'], 'python')
+        self.assertEqual(async_store.claim_posts.await_count, 2)
+        
+        print("✓ Test async_store: Only new IDs awaited on the store")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
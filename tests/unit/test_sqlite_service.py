@@ -0,0 +1,225 @@
+"""Unit tests for the SQLite service."""
+import unittest
+import os
+import sys
+import logging
+import tempfile
+import threading
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.services.sqlite import SQLiteService, SQLiteOutboxService
+from src.services.outbox import PENDING, INFLIGHT, DONE, DEAD
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestSQLiteService(unittest.TestCase):
+    """Test cases for the SQLite service."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'dedup.db')
+        self.sqlite_service = SQLiteService(self.path)
+        
+        print("✓ Setup complete: Created SQLite database in a temporary directory")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        self.sqlite_service.close()
+        self.directory.cleanup()
+        
+        print("✓ Teardown complete: Removed temporary database")
+    
+    def test_wal_mode(self):
+        """Test that the database runs in WAL mode."""
+        journal_mode = self.sqlite_service.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        
+        self.assertEqual(journal_mode, 'wal')
+        
+        print("✓ Test wal_mode: Database uses write-ahead logging")
+    
+    def test_claim_posts(self):
+        """Test that each post ID is claimed once per collection."""
+        first = self.sqlite_service.claim_posts(['post1', 'post2', 'post1'], 'python')
+        second = self.sqlite_service.claim_posts(['post2', 'post3'], 'python')
+        other = self.sqlite_service.claim_posts(['post1'], 'programming')
+        
+        self.assertEqual(first, ['post1', 'post2'])
+        self.assertEqual(second, ['post3'])
+        self.assertEqual(other, ['post1'])
+        self.assertEqual(self.sqlite_service.claim_posts([], 'python'), [])
+        
+        print("✓ Test claim_posts: Post IDs claimed once per collection")
+    
+    def test_claim_posts_across_connections(self):
+        """Test that concurrent claims from separate connections never claim the same ID twice."""
+        services = [SQLiteService(self.path) for _ in range(4)]
+        post_ids = [f'post{i}' for i in range(200)]
+        results = []
+        
+        def claim(service):
+            results.append(service.claim_posts(post_ids, 'python'))
+        
+        threads = [threading.Thread(target=claim, args=(service,)) for service in services]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for service in services:
+            service.close()
+        
+        claimed = [post_id for result in results for post_id in result]
+        self.assertEqual(sorted(claimed), sorted(post_ids))
+        
+        print("✓ Test claim_posts_across_connections: Every ID claimed exactly once")
+    
+    def test_seen_lookups(self):
+        """Test filter_unseen, check_post_exists, insert_post and mark_seen_many."""
+        self.sqlite_service.insert_post('post1', 'python')
+        self.sqlite_service.mark_seen_many(['post2', 'post1'], 'python')
+        
+        self.assertEqual(self.sqlite_service.filter_unseen(['post3', 'post1', 'post2', 'post4'], 'python'), ['post3', 'post4'])
+        self.assertTrue(self.sqlite_service.check_post_exists('post2', 'python'))
+        self.assertFalse(self.sqlite_service.check_post_exists('post2', 'programming'))
+        
+        print("✓ Test seen_lookups: Seen post IDs found")
+    
+    def test_filter_unseen_large_batch(self):
+        """Test that batches larger than one query are split."""
+        post_ids = [f'post{i}' for i in range(1200)]
+        self.sqlite_service.mark_seen_many(post_ids[::2], 'python')
+        
+        self.assertEqual(self.sqlite_service.filter_unseen(post_ids, 'python'), post_ids[1::2])
+        
+        print("✓ Test filter_unseen_large_batch: Large batch checked in chunks")
+    
+    def test_recent_post_ids(self):
+        """Test that the most recently seen post IDs come first."""
+        self.sqlite_service.claim_posts(['old', 'new'], 'python')
+        self.sqlite_service.connection.execute("UPDATE seen SET seen_at = seen_at - 60 WHERE id = 'old'")
+        
+        self.assertEqual(self.sqlite_service.recent_post_ids('python', 10), ['new', 'old'])
+        self.assertEqual(self.sqlite_service.recent_post_ids('python', 1), ['new'])
+        
+        print("✓ Test recent_post_ids: Newest post IDs returned first")
+    
+    def test_purge_expired(self):
+        """Test that post IDs older than SEEN_TTL_DAYS are deleted."""
+        self.sqlite_service.claim_posts(['post1'], 'python')
+        self.sqlite_service.seen_ttl_seconds = -1
+        
+        self.sqlite_service.purge_expired()
+        
+        self.assertFalse(self.sqlite_service.check_post_exists('post1', 'python'))
+        
+        print("✓ Test purge_expired: Expired post IDs deleted")
+    
+    def test_checkpoint(self):
+        """Test storing, reading and replacing a checkpoint, also after reopening."""
+        self.assertIsNone(self.sqlite_service.get_checkpoint('python'))
+        
+        self.sqlite_service.set_checkpoint('python', 't3_abc', 1700000000.0)
+        self.sqlite_service.set_checkpoint('python', 't3_def', 1700000100.0)
+        
+        reopened = SQLiteService(self.path)
+        checkpoint = reopened.get_checkpoint('python')
+        reopened.close()
+        self.assertEqual(checkpoint['fullname'], 't3_def')
+        self.assertEqual(checkpoint['created_utc'], 1700000100.0)
+        self.assertIn('checked_utc', checkpoint)
+        
+        print("✓ Test checkpoint: Checkpoint stored and replaced")
+
+class TestSQLiteOutboxService(unittest.TestCase):
+    """Test cases for the SQLite outbox."""
+    
+    def setUp(self):
+        """Set up test environment before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'dedup.db')
+        self.sqlite_service = SQLiteService(self.path)
+        
+        # Setup environment variables for testing
+        os.environ['OUTBOX_MAX_ATTEMPTS'] = '2'
+        
+        self.outbox = SQLiteOutboxService(self.sqlite_service)
+        
+        print("✓ Setup complete: Created SQLite outbox in a temporary directory")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        del os.environ['OUTBOX_MAX_ATTEMPTS']
+        self.sqlite_service.close()
+        self.directory.cleanup()
+        
+        print("✓ Teardown complete: Removed temporary database")
+    
+    def test_enqueue_and_claim(self):
+        """Test that posts are queued once per sink and leased to one claim at a time."""
+        self.outbox.enqueue('discord', [{'id': 'post1', 'title': 'One'}, {'id': 'post2', 'title': 'Two'}])
+        self.outbox.enqueue('discord', [{'id': 'post1', 'title': 'Changed'}])
+        
+        first = self.outbox.claim('discord', limit=1)
+        second = self.outbox.claim('discord')
+        
+        self.assertEqual([item['post'] for item in first], [{'id': 'post1', 'title': 'One'}])
+        self.assertEqual([item['post_id'] for item in second], ['post2'])
+        self.assertEqual(first[0]['attempts'], 1)
+        self.assertEqual(self.outbox.claim('discord'), [])
+        self.assertEqual(self.outbox.claim('telegram'), [])
+        self.assertEqual(self.outbox.counts('discord'), {INFLIGHT: 2})
+        
+        print("✓ Test enqueue_and_claim: Queued posts leased once")
+    
+    def test_ack_and_nack(self):
+        """Test that delivered items are done, failed ones retried and then dead-lettered."""
+        self.outbox.enqueue('discord', [{'id': 'post1'}, {'id': 'post2'}])
+        items = self.outbox.claim('discord')
+        
+        self.outbox.ack('discord', items[:1])
+        self.outbox.nack('discord', items[1:], 'Webhook down')
+        self.assertEqual(self.outbox.counts('discord'), {DONE: 1, PENDING: 1})
+        
+        # Verify the retry is due only after its backoff, and the last attempt is dead-lettered
+        self.assertEqual(self.outbox.claim('discord'), [])
+        self.sqlite_service.connection.execute("UPDATE outbox SET next_attempt_at = 0")
+        retry = self.outbox.claim('discord')
+        self.outbox.nack('discord', retry, 'Webhook down')
+        self.assertEqual(self.outbox.counts('discord'), {DONE: 1, DEAD: 1})
+        
+        self.assertEqual(self.outbox.requeue_dead('discord'), 1)
+        self.assertEqual([item['post_id'] for item in self.outbox.claim('discord')], ['post2'])
+        
+        print("✓ Test ack_and_nack: Items acked, retried and dead-lettered")
+    
+    def test_expired_lease(self):
+        """Test that an expired lease is claimable again and the old claim can no longer ack it."""
+        self.outbox.enqueue('discord', [{'id': 'post1'}])
+        stale = self.outbox.claim('discord')
+        self.sqlite_service.connection.execute("UPDATE outbox SET next_attempt_at = 0")
+        fresh = self.outbox.claim('discord')
+        
+        self.outbox.ack('discord', stale)
+        self.assertEqual(self.outbox.counts('discord'), {INFLIGHT: 1})
+        self.outbox.ack('discord', fresh)
+        self.assertEqual(self.outbox.counts('discord'), {DONE: 1})
+        
+        print("✓ Test expired_lease: Re-claimed item acked by its new lease only")
+    
+    def test_purge_done(self):
+        """Test that delivered items older than OUTBOX_DONE_TTL_DAYS are deleted."""
+        self.outbox.enqueue('discord', [{'id': 'post1'}])
+        self.outbox.ack('discord', self.outbox.claim('discord'))
+        self.outbox.done_ttl_seconds = -1
+        
+        self.outbox.purge_done()
+        
+        self.assertEqual(self.outbox.counts('discord'), {})
+        
+        print("✓ Test purge_done: Expired deliveries deleted")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,78 @@
+"""Unit tests for the dedup store factory."""
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import logging
+import tempfile
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.services.sqlite import SQLiteService
+from src.services.store import ThreadedStore, create_async_store, create_store
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestStore(unittest.TestCase):
+    """Test cases for choosing the dedup backend."""
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        os.environ.pop('DEDUP_BACKEND', None)
+        os.environ.pop('SQLITE_PATH', None)
+        
+        print("✓ Teardown complete: Cleared backend environment variables")
+    
+    @patch('src.services.mongodb.MongoDBService')
+    def test_default_backend(self, mock_mongo):
+        """Test that MongoDB is used unless another backend is configured."""
+        store = create_store()
+        
+        self.assertIs(store, mock_mongo.return_value)
+        
+        print("✓ Test default_backend: MongoDB store created")
+    
+    @patch('src.services.mongodb.MongoDBService')
+    def test_sqlite_backend(self, mock_mongo):
+        """Test that DEDUP_BACKEND=sqlite opens SQLITE_PATH and not MongoDB."""
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ['DEDUP_BACKEND'] = 'SQLite'
+            os.environ['SQLITE_PATH'] = os.path.join(directory, 'dedup.db')
+            
+            store = create_store()
+            store.close()
+            
+            self.assertIsInstance(store, SQLiteService)
+            self.assertTrue(os.path.exists(os.environ['SQLITE_PATH']))
+            mock_mongo.assert_not_called()
+        
+        print("✓ Test sqlite_backend: SQLite store created")
+    
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        os.environ['DEDUP_BACKEND'] = 'redis'
+        
+        with self.assertRaises(ValueError):
+            create_store()
+        with self.assertRaises(ValueError):
+            create_async_store()
+        
+        print("✓ Test unknown_backend: ValueError raised")
+    
+    def test_threaded_store(self):
+        """Test that the async wrapper awaits the blocking store's methods."""
+        store = MagicMock()
+        store.claim_posts.return_value = ['post1']
+        
+        claimed = asyncio.run(ThreadedStore(store).claim_posts(['post1'], 'python'))
+        
+        self.assertEqual(claimed, ['post1'])
+        store.claim_posts.assert_called_once_with(['post1'], 'python')
+        
+        print("✓ Test threaded_store: Blocking store method awaited")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
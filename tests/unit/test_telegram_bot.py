@@ -1,6 +1,6 @@
 """Unit tests for the Telegram bot."""
 import unittest
-from unittest.mock import patch, MagicMock, AsyncMock, call
+from unittest.mock import patch, MagicMock, AsyncMock, ANY, call
 import os
 import sys
 import logging
@@ -10,6 +10,8 @@ from typing import Dict, Any
 # Configure path to import modules from src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from telegram.error import RetryAfter
+
 from src.bots.telegram import TelegramBot
 
 # Disable logging during tests
@@ -21,8 +23,8 @@ class TestTelegramBot(unittest.TestCase):
     def setUp(self):
         """Set up test environment before each test."""
         # Create patches for external dependencies
-        self.bot_patch = patch('src.bots.telegram.Bot')
-        self.reddit_patch = patch('src.bots.telegram.RedditService')
+        self.bot_patch = patch('telegram.Bot')
+        self.reddit_patch = patch('src.services.async_reddit.AsyncRedditService')
         
         # Start patches
         self.mock_bot_class = self.bot_patch.start()
@@ -33,6 +35,7 @@ class TestTelegramBot(unittest.TestCase):
         self.mock_bot_class.return_value = self.mock_bot
         
         self.mock_reddit = MagicMock()
+        self.mock_reddit.get_all_posts = AsyncMock(return_value=[])
         self.mock_reddit_class.return_value = self.mock_reddit
         
         # Setup environment variables for testing
@@ -54,7 +57,9 @@ class TestTelegramBot(unittest.TestCase):
     
     def test_initialization(self):
         """Test Telegram bot initialization."""
-        # Verify the Bot class was initialized with the correct token
+        # Verify the Bot client is created with the correct token on first use
+        self.mock_bot_class.assert_not_called()
+        self.assertIs(self.telegram_bot.bot, self.mock_bot)
         self.mock_bot_class.assert_called_once_with(token='test_token')
         
         # Verify the chat ID was set correctly
@@ -114,13 +119,13 @@ class TestTelegramBot(unittest.TestCase):
         
         # Check the call parameters
         self.assertEqual(call_args[1]['chat_id'], 'test_chat_id')
-        self.assertIn('test_subreddit', call_args[1]['text'])
+        self.assertIn('test\\_subreddit', call_args[1]['text'])
         self.assertIn('Test Post', call_args[1]['text'])
         self.assertIn('2 hours ago', call_args[1]['text'])
-        self.assertIn('https://reddit.com/test', call_args[1]['text'])
+        self.assertIn('https://reddit\\.com/test', call_args[1]['text'])
         self.assertIn('This is a test post', call_args[1]['text'])
         self.assertIn('Test Flair', call_args[1]['text'])
-        self.assertEqual(call_args[1]['parse_mode'], 'Markdown')
+        self.assertEqual(call_args[1]['parse_mode'], 'MarkdownV2')
         
         print("✓ Test send_post: Post correctly sent to Telegram")
     
@@ -146,10 +151,48 @@ class TestTelegramBot(unittest.TestCase):
         
         # Check the text was truncated
         self.assertLess(len(call_args[1]['text']), 5000)
-        self.assertIn('...', call_args[1]['text'])  # Should include ellipsis
+        self.assertIn('\\.\\.\\.', call_args[1]['text'])  # Should include the escaped ellipsis
         
         print("✓ Test send_post_with_long_text: Long post text correctly truncated")
     
+    async def test_send_post_retry_after(self):
+        """Test that a RetryAfter error pauses the chat and retries the message."""
+        self.mock_bot.send_message.side_effect = [RetryAfter(0), None]
+        
+        # Call the function
+        result = await self.telegram_bot.send_post({'id': 'post1', 'title': 'Post 1'})
+        
+        # Verify the message was sent again and delivered
+        self.assertEqual(self.mock_bot.send_message.call_count, 2)
+        self.assertTrue(result)
+        
+        print("✓ Test send_post_retry_after: Flood controlled message retried")
+    
+    async def test_send_posts_concurrent(self):
+        """Test that posts are sent concurrently, bounded by max_in_flight."""
+        in_flight = 0
+        peak = 0
+        
+        async def send_message(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+        
+        self.mock_bot.send_message.side_effect = send_message
+        self.telegram_bot.max_in_flight = 3
+        posts = [{'id': f'post{i}', 'title': f'Post {i}'} for i in range(5)]
+        
+        # Call the function
+        result = await self.telegram_bot.send_posts(posts)
+        
+        # Verify all posts were delivered with at most three in flight at once
+        self.assertEqual(result, [f'post{i}' for i in range(5)])
+        self.assertEqual(peak, 3)
+        
+        print("✓ Test send_posts_concurrent: Posts sent concurrently within the in-flight limit")
+    
     async def test_process_posts_empty(self):
         """Test processing posts when there are none."""
         # Configure the mock to return empty posts
@@ -175,7 +218,7 @@ class TestTelegramBot(unittest.TestCase):
         ]
         
         # Create a patch for the send_post method
-        with patch.object(self.telegram_bot, 'send_post', new_callable=AsyncMock) as mock_send_post:
+        with patch.object(self.telegram_bot, 'send_post', new_callable=AsyncMock, return_value=True) as mock_send_post:
             # Call the function
             await self.telegram_bot.process_posts()
             
@@ -185,13 +228,38 @@ class TestTelegramBot(unittest.TestCase):
             # Verify send_post was called for each post
             self.assertEqual(mock_send_post.call_count, 3)
             mock_send_post.assert_has_calls([
-                call({'id': 'post1', 'title': 'Post 1'}),
-                call({'id': 'post2', 'title': 'Post 2'}),
-                call({'id': 'post3', 'title': 'Post 3'})
+                call({'id': 'post1', 'title': 'Post 1'}, ANY),
+                call({'id': 'post2', 'title': 'Post 2'}, ANY),
+                call({'id': 'post3', 'title': 'Post 3'}, ANY)
             ])
             
             print("✓ Test process_posts: All posts processed and sent correctly")
     
+    def test_get_all_posts_async_service(self):
+        """Test that posts are awaited from the async Reddit service on the event loop."""
+        self.mock_reddit.get_all_posts.return_value = [[{'id': 'post1'}]]
+        
+        result = asyncio.run(self.telegram_bot.get_all_posts())
+        
+        self.mock_reddit.get_all_posts.assert_awaited_once()
+        self.assertEqual(result, [[{'id': 'post1'}]])
+        
+        print("✓ Test get_all_posts_async_service: Async Reddit service awaited")
+    
+    def test_get_all_posts_sync_service(self):
+        """Test that a shared sync Reddit service is run in a worker thread."""
+        sync_service = MagicMock()
+        sync_service.get_all_posts.return_value = [[{'id': 'post1'}]]
+        telegram_bot = TelegramBot(reddit_service=sync_service)
+        
+        with patch('src.bots.telegram.asyncio.to_thread', new_callable=AsyncMock, return_value=[[{'id': 'post1'}]]) as mock_to_thread:
+            result = asyncio.run(telegram_bot.get_all_posts())
+        
+        mock_to_thread.assert_awaited_once_with(sync_service.get_all_posts)
+        self.assertEqual(result, [[{'id': 'post1'}]])
+        
+        print("✓ Test get_all_posts_sync_service: Sync Reddit service kept off the event loop")
+    
     def test_run(self):
         """Test the run method using an event loop."""
         # Create a patch for asyncio.get_event_loop
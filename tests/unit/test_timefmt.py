@@ -0,0 +1,72 @@
+"""Unit tests for post age formatting."""
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import logging
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.timefmt import AgeFormatter, get_age_formatter
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+# 2023/01/01 12:00 UTC
+CREATED_UTC = 1672574400.0
+
+class TestAgeFormatter(unittest.TestCase):
+    """Test cases for AgeFormatter."""
+    
+    def test_display_timezone(self):
+        """Test that the creation time is shown in the configured timezone."""
+        formatter = AgeFormatter('America/New_York')
+        
+        self.assertEqual(formatter.format(CREATED_UTC, CREATED_UTC + 90), '1.50 minutes (created 2023/01/01-07:00)')
+        
+        print("✓ Test display_timezone: Creation time shown in the display timezone")
+    
+    def test_unknown_timezone(self):
+        """Test that an unknown timezone is rejected when the formatter is created."""
+        with self.assertRaises(ValueError):
+            AgeFormatter('Mars/Olympus_Mons')
+        
+        print("✓ Test unknown_timezone: Unknown timezone rejected")
+    
+    def test_render_batch_uses_one_now(self):
+        """Test that a batch is rendered against a single clock reading."""
+        formatter = AgeFormatter('UTC')
+        posts = [{'created_utc': CREATED_UTC}, {'created_utc': CREATED_UTC - 3600}]
+        
+        with patch('src.utils.timefmt.time.time', side_effect=[CREATED_UTC + 3600, CREATED_UTC + 7200]) as mock_time:
+            ages = formatter.render_batch(posts)
+        
+        mock_time.assert_called_once()
+        self.assertEqual(ages, [
+            '1.00 hours (created 2023/01/01-12:00)',
+            '2.00 hours (created 2023/01/01-11:00)'
+        ])
+        
+        print("✓ Test render_batch_uses_one_now: Batch ages share one now")
+    
+    def test_render_without_created_utc(self):
+        """Test that posts without created_utc fall back to their preformatted age."""
+        formatter = AgeFormatter('UTC')
+        
+        self.assertEqual(formatter.render({'posted_ago': '2 hours ago'}), '2 hours ago')
+        self.assertEqual(formatter.render({}), 'Unknown')
+        
+        print("✓ Test render_without_created_utc: Preformatted age used as fallback")
+    
+    def test_shared_formatter(self):
+        """Test that the formatter for DISPLAY_TIMEZONE is created once and reused."""
+        with patch.dict(os.environ, {'DISPLAY_TIMEZONE': 'Europe/Berlin'}):
+            formatter = get_age_formatter()
+            self.assertIs(get_age_formatter(), formatter)
+            self.assertEqual(formatter.timezone_name, 'Europe/Berlin')
+        
+        print("✓ Test shared_formatter: Formatter reused per timezone")
+
+if __name__ == "__main__":
+    unittest.main()
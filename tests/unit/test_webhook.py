@@ -0,0 +1,91 @@
+"""Unit tests for the generic webhook sink."""
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import logging
+import asyncio
+
+# Configure path to import modules from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.bots.webhook import WebhookSink
+
+# Disable logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestWebhookSink(unittest.TestCase):
+    """Test cases for the webhook sink."""
+    
+    def setUp(self):
+        """Create a sink posting over a mock session."""
+        self.mock_response = MagicMock(status_code=200, headers={})
+        self.mock_session = MagicMock()
+        self.mock_session.post.return_value = self.mock_response
+        os.environ['WEBHOOK_RATE_PER_SECOND'] = '1000'
+        self.sink = WebhookSink(webhook_url='https://hooks.example.com/1', session=self.mock_session)
+        self.post = {'id': 'post1', 'title': 'Fast <code> & you', 'subreddit': 'python', 'flair': 'Help',
+                     'url': 'https://redd.it/post1', 'selftext': 'Body', 'posted_ago': '2 hours ago'}
+        
+        print("✓ Setup complete: Created webhook sink with a mock session")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        del os.environ['WEBHOOK_RATE_PER_SECOND']
+    
+    def test_send_batch_slack_payload(self):
+        """Test that each post is sent as one Slack message with escaped text."""
+        delivered = asyncio.run(self.sink.send_batch([self.post, {**self.post, 'id': 'post2'}]))
+        
+        self.assertEqual(delivered, ['post1', 'post2'])
+        self.assertEqual(self.mock_session.post.call_count, 2)
+        payload = self.mock_session.post.call_args_list[0][1]['json']
+        self.assertEqual(set(payload), {'text'})
+        self.assertIn('*Title:* Fast &lt;code&gt; &amp; you\n', payload['text'])
+        self.assertIn('*Posted:* 2 hours ago\n', payload['text'])
+        
+        print("✓ Test send_batch_slack_payload: Posts sent as Slack messages")
+    
+    def test_json_payload(self):
+        """Test that the json payload format sends the post's fields along with the text."""
+        sink = WebhookSink(webhook_url='https://hooks.example.com/1', payload_format='json', session=self.mock_session)
+        
+        payload = sink.create_payload(self.post)
+        
+        self.assertEqual(payload['id'], 'post1')
+        self.assertEqual(payload['posted_ago'], '2 hours ago')
+        self.assertIn('text', payload)
+        
+        print("✓ Test json_payload: Post fields included in the payload")
+    
+    def test_rate_limited_post_retried(self):
+        """Test that a 429 response is retried after the webhook's Retry-After."""
+        rate_limited = MagicMock(status_code=429, headers={'Retry-After': '0'})
+        self.mock_session.post.side_effect = [rate_limited, self.mock_response]
+        
+        delivered = asyncio.run(self.sink.send_batch([self.post]))
+        
+        self.assertEqual(delivered, ['post1'])
+        self.assertEqual(self.mock_session.post.call_count, 2)
+        
+        print("✓ Test rate_limited_post_retried: Rate limited post retried and delivered")
+    
+    def test_failed_post_not_delivered(self):
+        """Test that an error response leaves the post out of the delivered IDs."""
+        self.mock_response.status_code = 500
+        
+        delivered = asyncio.run(self.sink.send_batch([self.post]))
+        
+        self.assertEqual(delivered, [])
+        
+        print("✓ Test failed_post_not_delivered: Failed post not reported as delivered")
+    
+    def test_unknown_payload_format(self):
+        """Test that an unknown payload format is rejected."""
+        with self.assertRaises(ValueError):
+            WebhookSink(webhook_url='https://hooks.example.com/1', payload_format='xml')
+        
+        print("✓ Test unknown_payload_format: Unknown format rejected")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)